@@ -0,0 +1,65 @@
+"""
+Стоимость проверки ответа (Task.check_answer) для разных типов правил
+
+    python -m benchmarks.bench_answers --checks 100000
+
+БД не нужна: задачи создаются в памяти, правило проверки заполняется так же,
+как при сохранении. Для сравнения измеряется прежняя проверка (strip/lower)
+и сборка правила на каждый вызов без кеша.
+"""
+import argparse
+
+from .utils import setup_django, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from tasks.answers import AnswerMatcher, build_answer_spec
+    from tasks.models import AnswerType, Task
+
+    cases = [
+        ("exact", Task(answer="Ёлка", answer_variants="ель"), "  ЕЛКА "),
+        ("numeric", Task(answer="1/2"), "0,5"),
+        ("numeric ±", Task(answer="3.1416", answer_tolerance=0.001), "3.141"),
+        ("regex", Task(answer=r"x\s*=\s*\d+", answer_type=AnswerType.REGEX), "x = 5"),
+    ]
+    checks = range(args.checks)
+
+    def legacy():
+        expected = "42"
+        for _ in checks:
+            expected.strip().lower() == " 42 ".strip().lower()
+
+    rows = [("legacy strip/lower", round(measure(legacy, repeat=args.repeat), 2), "-")]
+    for name, task, answer in cases:
+        task.prepare_answer()
+
+        def cached():
+            for _ in checks:
+                task.check_answer(answer)
+
+        def uncached():
+            for _ in checks:
+                spec = build_answer_spec(
+                    task.answer, task.answer_type, task.answer_variants, task.answer_tolerance
+                )
+                AnswerMatcher(spec)(answer)
+
+        rows.append((
+            name,
+            round(measure(cached, repeat=args.repeat), 2),
+            round(measure(uncached, repeat=args.repeat), 2),
+        ))
+
+    print(f"{args.checks} проверок, мс (медиана из {args.repeat})")
+    print_table(["rule", "check_answer", "no cache"], rows)
+
+
+if __name__ == "__main__":
+    main()
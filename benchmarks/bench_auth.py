@@ -0,0 +1,87 @@
+"""
+Накладные расходы аутентификации на запрос: JWTAuthentication против кеша снимков
+
+    python -m benchmarks.bench_auth --users 1000 --requests 1000
+
+--requests запросов с токенами случайных пользователей; после аутентификации
+читается рейтинг, как это делает UserSerializer. Для WebSocket сравнивается
+прежняя загрузка пользователя в database_sync_to_async и get_user
+JWTAuthMiddleware с попаданием в кеш.
+"""
+import argparse
+import random
+
+from .utils import setup_django, benchmark_database, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from asgiref.sync import async_to_sync
+    from channels.db import database_sync_to_async
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from pentolymp.middlewares.jwt_auth_middleware import get_user
+    from users.authentication import CachedJWTAuthentication
+    from users.models import Rating
+
+    User = get_user_model()
+
+    with benchmark_database():
+        users = User.objects.bulk_create(
+            User(username=f"user{i}", email=f"user{i}@example.com", password="x")
+            for i in range(args.users)
+        )
+        Rating.objects.bulk_create(Rating(user=user) for user in users)
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        sample = [random.choice(tokens) for _ in range(args.requests)]
+        factory = APIRequestFactory()
+        requests = [factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}") for token in sample]
+
+        def rest(auth):
+            def run():
+                for request in requests:
+                    auth.authenticate(request)[0].rating.score
+            return run
+
+        @database_sync_to_async
+        def load_user(token):
+            return User.objects.get(id=AccessToken(token)["user_id"])
+
+        async def ws_plain():
+            for token in sample:
+                await load_user(token)
+
+        async def ws_cached():
+            for token in sample:
+                await get_user(token)
+
+        rows = [
+            ("REST", rest(JWTAuthentication()), rest(CachedJWTAuthentication())),
+            ("WebSocket", async_to_sync(ws_plain), async_to_sync(ws_cached)),
+        ]
+        print(f"{args.users} пользователей, {args.requests} запросов")
+        print_table(
+            ["path", "plain us/request", "cached us/request"],
+            [
+                (
+                    name,
+                    round(measure(plain, repeat=args.repeat) * 1000 / args.requests, 1),
+                    round(measure(cached, repeat=args.repeat) * 1000 / args.requests, 1),
+                )
+                for name, plain, cached in rows
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Проверки «решена ли задача» по битовой карте против запросов к таблице решений
+
+    python -m benchmarks.bench_bitmaps --tasks 50000 --solves 10000
+
+У пользователя --solves решённых задач. Сравниваются is_solved для одной
+задачи, отметки решённых на странице из 20 задач и подсчёт решённых по
+предметам; карта берётся из кеша процесса (после первого построения).
+"""
+import argparse
+import random
+
+from .utils import setup_django, benchmark_database, measure, print_table
+
+
+def populate(task_count, solve_count, subject_count=5, batch_size=5000):
+    from django.contrib.auth import get_user_model
+    from tasks.models import Difficulty_Level, Subject, Task, Topic
+    from users.models import Solve
+
+    topics = [
+        Topic.objects.create(name="Тема", subject=Subject.objects.create(name=f"Предмет {i}"))
+        for i in range(subject_count)
+    ]
+    for start in range(0, task_count, batch_size):
+        Task.objects.bulk_create(
+            Task(
+                name=f"Задача {i}",
+                description="<p>Условие</p>",
+                answer="1",
+                topic=topics[i % subject_count],
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(start, min(start + batch_size, task_count))
+        )
+    user = get_user_model().objects.create_user(username="solver", email="solver@example.com", password="x")
+    task_ids = list(Task.objects.values_list("id", flat=True))
+    Solve.objects.bulk_create(
+        (Solve(user=user, task_id=task_id) for task_id in random.sample(task_ids, solve_count)),
+        batch_size=batch_size,
+    )
+    return user, task_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--solves", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db.models import Count
+    from tasks.models import Task
+    from tasks.services import count_solved_by_subject, get_solved_bitmap
+    from tasks.services.bitmaps import solved_bitmaps
+    from users.models import Solve
+
+    with benchmark_database():
+        user, task_ids = populate(args.tasks, args.solves)
+        page = list(Task.objects.order_by("?")[:20])
+        checks = random.sample(task_ids, 100)
+
+        def build():
+            solved_bitmaps.clear()
+            get_solved_bitmap(user)
+
+        def query_is_solved():
+            for task_id in checks:
+                Solve.objects.filter(user_id=user.id, task_id=task_id).exists()
+
+        def bitmap_is_solved():
+            for task_id in checks:
+                Task(id=task_id).is_solved(user)
+
+        def query_page():
+            set(Solve.objects.filter(user_id=user.id, task_id__in=[task.id for task in page]).values_list("task_id", flat=True))
+
+        def bitmap_page():
+            Task.get_solved_ids(user, page)
+
+        def query_subjects():
+            dict(
+                Solve.objects.filter(user_id=user.id)
+                .values_list("task__topic__subject_id")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+
+        def bitmap_subjects():
+            count_solved_by_subject(user)
+
+        build_ms = measure(build, repeat=args.repeat)
+        rows = [
+            ("is_solved x100", query_is_solved, bitmap_is_solved),
+            ("page of 20", query_page, bitmap_page),
+            ("counts by subject", query_subjects, bitmap_subjects),
+        ]
+        print(f"{args.tasks} задач, {args.solves} решений; построение карты {build_ms:.2f} мс")
+        print_table(
+            ["operation", "query ms", "bitmap ms"],
+            [
+                (name, round(measure(query, repeat=args.repeat), 3), round(measure(bitmap, repeat=args.repeat), 3))
+                for name, query, bitmap in rows
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Выгрузка матчей в CSV из админки: потоковая против прежней (всё в памяти)
+
+    python -m benchmarks.bench_exports --matches 1000000
+
+Измеряются время до первого байта, полное время и пик памяти Python
+(tracemalloc) при чтении всего ответа.
+"""
+import argparse
+import csv
+import time
+import tracemalloc
+
+from .utils import setup_django, benchmark_database, print_table
+
+
+def populate(match_count, batch_size=10000):
+    from django.contrib.auth import get_user_model
+    from pvp.models import Match, MatchParticipant, MatchResult, MatchStatus
+    from tasks.models import Subject
+
+    User = get_user_model()
+    subject = Subject.objects.create(name="Математика")
+    players = User.objects.bulk_create(
+        User(username=f"player{i}", email=f"player{i}@example.com") for i in range(100)
+    )
+    for start in range(0, match_count, batch_size):
+        matches = Match.objects.bulk_create(
+            Match(
+                subject=subject,
+                status=MatchStatus.FINISHED,
+                result=MatchResult.PLAYER1_WIN,
+                winner=players[i % len(players)],
+                duration_minutes=15,
+                max_tasks=5,
+            )
+            for i in range(start, min(start + batch_size, match_count))
+        )
+        MatchParticipant.objects.bulk_create(
+            MatchParticipant(
+                match=match,
+                user=players[(match.id + number) % len(players)],
+                player_number=number,
+                tasks_solved=number,
+            )
+            for match in matches
+            for number in (1, 2)
+        )
+
+
+def legacy_export():
+    """Прежняя реализация MatchAdmin.export_csv"""
+    from django.http import HttpResponse
+    from pvp.models import Match
+
+    response = HttpResponse(content_type='text/csv')
+    response.write('\ufeff')
+    writer = csv.writer(response)
+    matches = Match.objects.all().select_related('subject', 'winner').prefetch_related('participants__user')
+    for match in matches:
+        participants = list(match.participants.all())
+        player1 = participants[0] if len(participants) > 0 else None
+        player2 = participants[1] if len(participants) > 1 else None
+        writer.writerow([
+            match.id,
+            match.subject.name,
+            match.get_status_display(),
+            match.get_result_display() if match.result else '',
+            match.winner.username if match.winner else '',
+            match.created_at.strftime('%Y-%m-%d %H:%M:%S') if match.created_at else '',
+            match.started_at.strftime('%Y-%m-%d %H:%M:%S') if match.started_at else '',
+            match.finished_at.strftime('%Y-%m-%d %H:%M:%S') if match.finished_at else '',
+            match.duration_minutes,
+            match.max_tasks,
+            player1.user.username if player1 else '',
+            player2.user.username if player2 else '',
+            player1.tasks_solved if player1 else '',
+            player2.tasks_solved if player2 else '',
+            player1.time_taken if player1 else '',
+            player2.time_taken if player2 else '',
+        ])
+    return response
+
+
+def consume(make_response):
+    """(до первого байта мс, всего мс, пик памяти МБ, размер МБ)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = make_response()
+    chunks = iter(response.streaming_content if response.streaming else [response.content])
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - started
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(first_byte * 1000), round(total * 1000), round(peak / 2 ** 20, 1), round(size / 2 ** 20, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib import admin
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+    from pvp.models import Match
+
+    with benchmark_database():
+        populate(args.matches)
+        request = RequestFactory().get("/admin/pvp/match/export-csv/")
+        request.user = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="adminpass123"
+        )
+        model_admin = admin.site._registry[Match]
+
+        rows = [
+            ("streaming", *consume(lambda: model_admin.export_csv(request))),
+            ("legacy", *consume(legacy_export)),
+        ]
+        print(f"{args.matches} матчей")
+        print_table(["export", "first byte ms", "total ms", "peak MB", "size MB"], rows)
+
+
+if __name__ == "__main__":
+    main()
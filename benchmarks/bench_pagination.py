@@ -0,0 +1,90 @@
+"""
+Сравнение задержки глубоких страниц TasksView в режимах page и cursor
+
+    python -m benchmarks.bench_pagination --tasks 500000
+"""
+import argparse
+from urllib.parse import parse_qs, urlparse
+
+from .utils import setup_django, benchmark_database, measure, print_table
+
+
+def populate(task_count, batch_size=10000):
+    from tasks.models import Task, Subject, Topic, Difficulty_Level
+
+    subject = Subject.objects.create(name="Математика")
+    topic = Topic.objects.create(name="Алгебра", subject=subject)
+    levels = [level for level, _ in Difficulty_Level.choices]
+    for start in range(0, task_count, batch_size):
+        Task.objects.bulk_create(
+            Task(
+                name=f"Задача {i}",
+                description=f"<p>Условие задачи {i}</p>",
+                answer=str(i),
+                topic=topic,
+                difficulty_level=levels[i % len(levels)],
+            )
+            for i in range(start, min(start + batch_size, task_count))
+        )
+
+
+def cursor_for_offset(view_class, offset):
+    """Строит курсор, указывающий на позицию offset (как если бы клиент дошёл до неё по ссылкам next)"""
+    from rest_framework.pagination import Cursor
+    from tasks.models import Task
+
+    paginator = view_class.pagination_class.cursor_pagination_class()
+    paginator.base_url = "http://testserver/api/tasks/tasks/"
+    position = Task.objects.order_by("id").values_list("id", flat=True)[offset - 1]
+    url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+    return parse_qs(urlparse(url).query)["cursor"][0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from tasks.views import TasksView
+
+    with benchmark_database():
+        populate(args.tasks)
+        user = get_user_model().objects.create_user(
+            username="bench", email="bench@example.com", password="benchpass123"
+        )
+        factory = APIRequestFactory()
+        view = TasksView.as_view()
+        page_size = 20
+        last_page = args.tasks // page_size
+
+        def call(query):
+            request = factory.get("/api/tasks/tasks/", query)
+            force_authenticate(request, user=user)
+            response = view(request)
+            assert response.status_code == 200, response.status_code
+            response.render()
+
+        rows = []
+        for page in sorted({1, 10, 100, 1000, 10000, last_page}):
+            if page > last_page:
+                continue
+            offset = (page - 1) * page_size
+            page_ms = measure(lambda: call({"page": page}), repeat=args.repeat)
+            if offset:
+                cursor = cursor_for_offset(TasksView, offset)
+                cursor_ms = measure(lambda: call({"cursor": cursor}), repeat=args.repeat)
+            else:
+                cursor_ms = measure(lambda: call({"pagination": "cursor"}), repeat=args.repeat)
+            rows.append((page, offset, f"{page_ms:.2f}", f"{cursor_ms:.2f}"))
+
+        print(f"TasksView, {args.tasks} задач, медиана из {args.repeat} запусков (мс)")
+        print_table(("page", "offset", "page-number", "cursor"), rows)
+
+
+if __name__ == "__main__":
+    main()
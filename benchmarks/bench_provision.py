@@ -0,0 +1,59 @@
+"""
+Регистрация списка участников: create_user по одному против provision_users_csv
+
+    python -m benchmarks.bench_provision --users 5000 --serial 50
+
+Последовательная регистрация (как RegisterSerializer) замеряется на --serial
+пользователях и пересчитывается на весь список; provision_users_csv
+импортирует все --users строк с хешированием в --workers процессах.
+"""
+import argparse
+import time
+from io import StringIO
+
+from .utils import setup_django, benchmark_database, print_table
+
+
+def roster(count, prefix):
+    lines = ["username,email,password"]
+    lines.extend(f"{prefix}{i},{prefix}{i}@example.com,Olymp-2026-{i:05d}" for i in range(count))
+    return StringIO("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--serial", type=int, default=50)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from users.services import provision_users_csv
+
+    User = get_user_model()
+
+    with benchmark_database():
+        started = time.perf_counter()
+        for i in range(args.serial):
+            User.objects.create_user(username=f"serial{i}", email=f"serial{i}@example.com", password=f"Olymp-2026-{i:05d}")
+        serial_s = (time.perf_counter() - started) / args.serial * args.users
+
+        started = time.perf_counter()
+        provisioner = provision_users_csv(roster(args.users, "student"), workers=args.workers)
+        bulk_s = time.perf_counter() - started
+        assert provisioner.created == args.users, provisioner.errors[:5]
+
+        print(f"{args.users} участников")
+        print_table(
+            ["method", "seconds"],
+            [
+                (f"create_user (оценка по {args.serial})", round(serial_s, 1)),
+                ("provision_users_csv", round(bulk_s, 1)),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
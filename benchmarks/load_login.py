@@ -0,0 +1,87 @@
+"""
+Нагрузочный тест входа: логины в секунду против запущенного сервера
+
+    python manage.py provision_users roster.csv
+    python -m benchmarks.load_login roster.csv --url http://127.0.0.1:8000 --concurrency 50 --requests 2000
+
+Участники берутся из того же CSV (username, email, password), что и для
+provision_users. --concurrency потоков отправляют --requests запросов
+POST /api/auth/login/; в итогах — успешные входы в секунду, ответы 503
+(перегрузка пула проверки паролей), прочие ошибки и перцентили задержки.
+"""
+import argparse
+import csv
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import print_table
+
+
+def login(url, email, password, timeout):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - started
+
+
+def percentile(values, share):
+    if not values:
+        return 0
+    return sorted(values)[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("roster")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    with open(args.roster, encoding="utf-8-sig", newline="") as roster:
+        credentials = [(row["email"], row["password"]) for row in csv.DictReader(roster)]
+    url = args.url.rstrip("/") + "/api/auth/login/"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: login(url, *credentials[i % len(credentials)], args.timeout),
+            range(args.requests),
+        ))
+    elapsed = time.perf_counter() - started
+
+    ok = [latency for status, latency in results if status == 200]
+    overloaded = [latency for status, latency in results if status == 503]
+    failed = len(results) - len(ok) - len(overloaded)
+    print(f"{args.requests} запросов, {args.concurrency} потоков, {elapsed:.1f} с")
+    print_table(
+        ["result", "count", "per second", "p50 ms", "p95 ms"],
+        [
+            ("200", len(ok), round(len(ok) / elapsed, 1),
+             round(statistics.median(ok) * 1000 if ok else 0), round(percentile(ok, 0.95) * 1000)),
+            ("503", len(overloaded), round(len(overloaded) / elapsed, 1),
+             round(statistics.median(overloaded) * 1000 if overloaded else 0),
+             round(percentile(overloaded, 0.95) * 1000)),
+            ("other", failed, round(failed / elapsed, 1), "", ""),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Общие помощники для бенчмарков
+
+Бенчмарки запускаются как модули из корня проекта, например:
+
+    python -m benchmarks.bench_pagination --tasks 500000
+
+Каждый бенчмарк создаёт отдельную тестовую БД (как `manage.py test`) на той
+СУБД, что указана в настройках, и удаляет её по завершении.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pentolymp.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5, warmup=1):
+    """Медиана времени выполнения func в миллисекундах"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+    line = "  ".join(f"{{:>{width}}}" for width in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,63 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """ETag из значений, от которых зависит ответ (версий, дат изменения, id пользователя)"""
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def latest(*stamps):
+    """Самая поздняя из дат, None пропускаются"""
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (If-None-Match / If-Modified-Since)
+
+    Представление реализует get_validators() и возвращает (etag, last_modified),
+    посчитанные по дешёвым меткам версий. Проверка выполняется после
+    аутентификации и до обработчика, поэтому на 304 ничего не сериализуется.
+    """
+    etag = None
+    last_modified = None
+
+    def get_validators(self, request, *args, **kwargs):
+        return None, None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        self.etag = quote_etag(etag) if etag else None
+        self.last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request._request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code in (200, 304):
+            if self.etag:
+                response.headers['ETag'] = self.etag
+            if self.last_modified:
+                response.headers['Last-Modified'] = http_date(self.last_modified)
+            patch_vary_headers(response, ['Authorization'])
+        return response
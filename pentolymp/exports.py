@@ -0,0 +1,60 @@
+import csv
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import BadRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(header, rows, bom, rows_per_chunk):
+    writer = csv.writer(_Echo())
+    chunk = ['\ufeff'] if bom else []
+    chunk.append(writer.writerow(header))
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def changelist_queryset(model_admin, request):
+    """
+    Queryset списка объектов в админке с фильтрами и поиском из строки запроса
+
+    Экспорт выгружает ровно то, что отфильтровано в списке: предмет, диапазон
+    дат (created_at__gte / created_at__lt) и т.д.
+    """
+    try:
+        changelist = model_admin.get_changelist_instance(request)
+    except IncorrectLookupParameters:
+        raise BadRequest("Некорректные параметры фильтра")
+    return changelist.get_queryset(request)
+
+
+def streaming_csv_response(name, header, rows, bom=False, rows_per_chunk=500):
+    """
+    CSV-ответ, который формируется по мере отправки
+
+    Args:
+        name: Имя файла без даты и расширения
+        header: Заголовок таблицы
+        rows: Итератор строк, например queryset.values_list(...).iterator()
+        bom: Добавить BOM (для открытия в Excel)
+        rows_per_chunk: Сколько строк CSV отдавать за одну запись в сокет
+    """
+    response = StreamingHttpResponse(
+        _csv_chunks(header, rows, bom, rows_per_chunk), content_type='text/csv; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{name}_{timezone.now().strftime("%Y-%m-%d")}.csv"'
+    return response
@@ -2,19 +2,28 @@ from urllib.parse import parse_qs
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from users.authentication import user_cache
 from users.models import User
 
 
-@database_sync_to_async
-def get_user(token_key):
+async def get_user(token_key):
+    """Пользователь токена; из кеша снимков без перехода в поток БД, если он там есть"""
     try:
         access_token = AccessToken(token_key)
-        user_id = access_token['user_id']
-        return User.objects.get(id=user_id)
-    except (InvalidToken, TokenError, User.DoesNotExist):
+        user_id = access_token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
         return AnonymousUser()
+    jti = access_token.get(api_settings.JTI_CLAIM)
+    user = await user_cache.aget(user_id, jti)
+    if user is None:
+        try:
+            user = await database_sync_to_async(user_cache.load)(user_id, jti)
+        except User.DoesNotExist:
+            return AnonymousUser()
+    return user if user.is_active else AnonymousUser()
 
 
 class JWTAuthMiddleware(BaseMiddleware):
@@ -74,6 +74,8 @@ CORS_ALLOW_ALL_ORIGINS = env.bool("CORS_ALLOW_ALL_ORIGINS", False)
 
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", [])
 
+CORS_EXPOSE_HEADERS = ["ETag", "Last-Modified"]
+
 ROOT_URLCONF = "pentolymp.urls"
 
 TEMPLATES = [
@@ -94,7 +96,7 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": (
@@ -196,6 +198,20 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Файлы, вынесенные из условий задач (встроенные изображения). Ссылки на них
+# сохраняются в HTML условий, поэтому если фронтенд открыт с другого домена,
+# MEDIA_URL задаётся абсолютным: https://api.example.com/media/. Django отдаёт
+# эти файлы только при DEBUG, в продакшене — веб-сервер (см. README)
+MEDIA_URL = env.str("MEDIA_URL", "/media/")
+MEDIA_ROOT = env.str("MEDIA_ROOT", str(BASE_DIR / "media"))
+
+# Пул процессов для проверки паролей при входе: число процессов (0 — по числу
+# ядер), сколько проверок может ждать, прежде чем вход ответит 503, и сколько
+# секунд ждать результата
+PASSWORD_POOL_WORKERS = env.int("PASSWORD_POOL_WORKERS", 0)
+PASSWORD_POOL_QUEUE = env.int("PASSWORD_POOL_QUEUE", 64)
+PASSWORD_POOL_TIMEOUT = env.float("PASSWORD_POOL_TIMEOUT", 10)
+
 # Channels
 ASGI_APPLICATION = 'pentolymp.asgi.application'
 
@@ -216,4 +232,26 @@ CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer"
     }
-}
\ No newline at end of file
+}
+
+# Кеш Django общий для всех процессов: через него воркеры сразу узнают о сбросе
+# закешированных пользователей (users.authentication). Кеш в памяти процесса
+# (CACHE_LOCAL, по умолчанию вместе с DB_IN_MEMORY) годится только для тестов
+# и запуска в одном процессе
+if env.bool("CACHE_LOCAL", env.bool("DB_IN_MEMORY", False)):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env.str("CACHE_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/1"),
+        }
+    }
+# Планировщик фоновых задач pvp (подбор соперников, доли решений для пулов задач,
+# снимок рангов). В manage.py test не запускается: его задачи шли бы в основную
+# БД, а не в тестовую
+SCHEDULER_ENABLED = env.bool("SCHEDULER_ENABLED", sys.argv[1:2] != ["test"])
@@ -15,12 +15,19 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from django_apscheduler.models import DjangoJob, DjangoJobExecution
 
+from tasks.utils import TASK_IMAGES_DIR
+from tasks.views import task_image
+
 
 
 admin.site.site_header = "Админ-панель PentOlymp"
@@ -38,5 +45,12 @@ urlpatterns = [
 
     path("admin/", admin.site.urls),
     path("docs/", SpectacularAPIView.as_view(), name='schema'),
-    path("swagger/", SpectacularSwaggerView.as_view())
+    path("swagger/", SpectacularSwaggerView.as_view()),
 ]
+
+# Без DEBUG файлы MEDIA_ROOT отдаёт веб-сервер (см. README)
+if settings.DEBUG:
+    media_prefix = urlparse(settings.MEDIA_URL).path.lstrip('/')
+    urlpatterns += [
+        path(f"{media_prefix}{TASK_IMAGES_DIR}/<path:path>", task_image, name="task_image"),
+    ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
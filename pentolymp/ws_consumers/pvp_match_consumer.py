@@ -4,15 +4,13 @@ from datetime import timedelta
 from asgiref.sync import sync_to_async, async_to_sync
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from pvp.models import Match, MatchParticipant, MatchTask, MatchStatus, MatchResult
 from pvp.services import MatchScheduler
-from users.models import Rating
-
-
-User = get_user_model()
+from tasks.models import Task
+from tasks.services import record_solve
+from users.models import SolveSource
 
 
 class PvpMatchConsumer(AsyncWebsocketConsumer):
@@ -202,9 +200,7 @@ class PvpMatchConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def set_task_solved(self, task_id):
         try:
-            user = User.objects.get(id=self.user.id)
-            user.solved_tasks.add(task_id)
-            user.save()
+            record_solve(self.user, task_id, SolveSource.PVP)
             return True
         except Exception as e:
             print(e)
@@ -283,6 +279,8 @@ class PvpMatchConsumer(AsyncWebsocketConsumer):
             match_task = MatchTask.objects.filter(
                 match_id=self.match_id,
                 order=participant.current_task_index + 1
+            ).select_related('task').only(
+                'order', 'task__id', *(f'task__{field}' for field in Task.ANSWER_FIELDS)
             ).first()
 
             match = Match.objects.get(id=self.match_id)
@@ -329,10 +327,6 @@ class PvpMatchConsumer(AsyncWebsocketConsumer):
             match.result = MatchResult.TECHNICAL
             match.finished_at = timezone.now()
             match.save()
-            
-            participants = match.participants.all()
-            for participant in participants:
-                Rating.objects.get_or_create(user=participant.user)[0]
             return True
         except:
             return False
@@ -1,10 +1,10 @@
-import csv
 from django.contrib import admin
-from django.http import HttpResponse
+from django.db.models import FilteredRelation, Q
 from django.urls import path
-from django.utils import timezone
 
-from .models import Match, MatchParticipant, MatchTask, PvpSettings, Queue
+from pentolymp.exports import EXPORT_CHUNK_SIZE, changelist_queryset, streaming_csv_response
+
+from .models import Match, MatchParticipant, MatchResult, MatchStatus, MatchTask, PvpSettings, Queue
 
 
 class MatchParticipantInline(admin.TabularInline):
@@ -49,46 +49,50 @@ class MatchAdmin(admin.ModelAdmin):
         return custom_urls + urls
     
     def export_csv(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="matches_statistics" {timezone.now().strftime("%Y-%m-%d")}.csv'
-        response.write('\ufeff')
-        
-        writer = csv.writer(response)
-        writer.writerow([
+        header = [
             'ID матча', 'Предмет', 'Статус', 'Результат', 'Победитель',
             'Дата создания', 'Дата начала', 'Дата окончания', 'Длительность (мин)',
             'Макс. задач', 'Игрок 1', 'Игрок 2',
             'Решено задач (Игрок 1)', 'Решено задач (Игрок 2)',
             'Время (Игрок 1, сек)', 'Время (Игрок 2, сек)'
-        ])
-        
-        matches = Match.objects.all().select_related('subject', 'winner').prefetch_related('participants__user')
-        
-        for match in matches:
-            participants = list(match.participants.all())
-            player1 = participants[0] if len(participants) > 0 else None
-            player2 = participants[1] if len(participants) > 1 else None
-            
-            writer.writerow([
-                match.id,
-                match.subject.name,
-                match.get_status_display(),
-                match.get_result_display() if match.result else '',
-                match.winner.username if match.winner else '',
-                match.created_at.strftime('%Y-%m-%d %H:%M:%S') if match.created_at else '',
-                match.started_at.strftime('%Y-%m-%d %H:%M:%S') if match.started_at else '',
-                match.finished_at.strftime('%Y-%m-%d %H:%M:%S') if match.finished_at else '',
-                match.duration_minutes,
-                match.max_tasks,
-                player1.user.username if player1 else '',
-                player2.user.username if player2 else '',
-                player1.tasks_solved if player1 else '',
-                player2.tasks_solved if player2 else '',
-                player1.time_taken if player1 else '',
-                player2.time_taken if player2 else '',
-            ])
-        
-        return response
+        ]
+        matches = (
+            changelist_queryset(self, request)
+            .annotate(
+                player1=FilteredRelation('participants', condition=Q(participants__player_number=1)),
+                player2=FilteredRelation('participants', condition=Q(participants__player_number=2)),
+            )
+            .order_by('id')
+            .values_list(
+                'id', 'subject__name', 'status', 'result', 'winner__username',
+                'created_at', 'started_at', 'finished_at', 'duration_minutes', 'max_tasks',
+                'player1__user__username', 'player2__user__username',
+                'player1__tasks_solved', 'player2__tasks_solved',
+                'player1__time_taken', 'player2__time_taken',
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return streaming_csv_response('matches_statistics', header, map(self.export_row, matches), bom=True)
+
+    status_labels = dict(MatchStatus.choices)
+    result_labels = dict(MatchResult.choices)
+
+    def export_row(self, values):
+        (match_id, subject, status, result, winner, created_at, started_at, finished_at,
+         duration_minutes, max_tasks, *players) = values
+        return [
+            match_id,
+            subject,
+            self.status_labels.get(status, status),
+            self.result_labels.get(result, result) if result else '',
+            winner or '',
+            created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else '',
+            started_at.strftime('%Y-%m-%d %H:%M:%S') if started_at else '',
+            finished_at.strftime('%Y-%m-%d %H:%M:%S') if finished_at else '',
+            duration_minutes,
+            max_tasks,
+            *('' if value is None else value for value in players),
+        ]
 
 
 @admin.register(PvpSettings)
@@ -109,5 +113,8 @@ class PvpSettingsAdmin(admin.ModelAdmin):
         }),
         ('Настройки задержек', {
             'fields': ('max_rating_diff_for_nodelay', 'min_wait_time')
+        }),
+        ('Сложность задач', {
+            'fields': ('low_rating', 'low_rating_mix', 'high_rating', 'high_rating_mix')
         })
     )
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-17 00:12
+
+import pvp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pvp", "0004_pvpsettings_max_rating_diff_for_nodelay_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pvpsettings",
+            name="high_rating",
+            field=models.IntegerField(default=1400, verbose_name="Высокий рейтинг"),
+        ),
+        migrations.AddField(
+            model_name="pvpsettings",
+            name="high_rating_mix",
+            field=models.CharField(
+                default="10/30/60",
+                help_text="Доли задач Easy/Medium/Hard для игроков со средним рейтингом не ниже высокого; между ними доли плавно меняются",
+                max_length=20,
+                validators=[pvp.models.validate_difficulty_mix],
+                verbose_name="Сложность задач при высоком рейтинге",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pvpsettings",
+            name="low_rating",
+            field=models.IntegerField(default=800, verbose_name="Низкий рейтинг"),
+        ),
+        migrations.AddField(
+            model_name="pvpsettings",
+            name="low_rating_mix",
+            field=models.CharField(
+                default="60/30/10",
+                help_text="Доли задач Easy/Medium/Hard для игроков со средним рейтингом не выше низкого",
+                max_length=20,
+                validators=[pvp.models.validate_difficulty_mix],
+                verbose_name="Сложность задач при низком рейтинге",
+            ),
+        ),
+    ]
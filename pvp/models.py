@@ -1,6 +1,7 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth import get_user_model
-from tasks.models import Subject, Task
+from tasks.models import Difficulty_Level, Subject, Task
 
 
 User = get_user_model()
@@ -86,6 +87,27 @@ class MatchTask(models.Model):
         return f"Задача {self.order} для матча #{self.match.id}"
 
 
+def parse_difficulty_mix(value):
+    """
+    Доли уровней сложности из строки вида "60/30/10" (Easy/Medium/Hard)
+
+    Returns:
+        dict: {уровень: доля от 0 до 1}
+    """
+    try:
+        weights = [int(part) for part in value.split('/')]
+    except (AttributeError, ValueError):
+        raise ValidationError("Укажите три целых числа через /, например 60/30/10")
+    if len(weights) != len(Difficulty_Level.values) or min(weights) < 0 or sum(weights) == 0:
+        raise ValidationError("Укажите три неотрицательных числа через /, например 60/30/10")
+    total = sum(weights)
+    return {level: weight / total for level, weight in zip(Difficulty_Level.values, weights)}
+
+
+def validate_difficulty_mix(value):
+    parse_difficulty_mix(value)
+
+
 class PvpSettings(models.Model):
     name = models.CharField("Название настройки", max_length=50, unique=True)
     duration_minutes = models.IntegerField("Длительность (минуты)", default=15)
@@ -94,6 +116,22 @@ class PvpSettings(models.Model):
     initial_rating = models.IntegerField("Начальный рейтинг", default=1000)
     max_rating_diff_for_nodelay = models.IntegerField("Максимальная разница рейтинга для отсутствия задержек", default=200)
     min_wait_time = models.IntegerField("Минимальное время ожидания (секунды), если задержка", default=10)
+    low_rating = models.IntegerField("Низкий рейтинг", default=800)
+    low_rating_mix = models.CharField(
+        "Сложность задач при низком рейтинге",
+        max_length=20,
+        default="60/30/10",
+        validators=[validate_difficulty_mix],
+        help_text="Доли задач Easy/Medium/Hard для игроков со средним рейтингом не выше низкого",
+    )
+    high_rating = models.IntegerField("Высокий рейтинг", default=1400)
+    high_rating_mix = models.CharField(
+        "Сложность задач при высоком рейтинге",
+        max_length=20,
+        default="10/30/60",
+        validators=[validate_difficulty_mix],
+        help_text="Доли задач Easy/Medium/Hard для игроков со средним рейтингом не ниже высокого; между ними доли плавно меняются",
+    )
     
     is_active = models.BooleanField("Активна", default=True)
     
@@ -101,5 +139,9 @@ class PvpSettings(models.Model):
         verbose_name = "Настройки PvP"
         verbose_name_plural = "Настройки PvP"
     
+    def clean(self):
+        if self.low_rating >= self.high_rating:
+            raise ValidationError({'high_rating': "Высокий рейтинг должен быть больше низкого"})
+    
     def __str__(self):
         return f"{self.name} ({self.duration_minutes}мин, {self.max_tasks}задач)"
\ No newline at end of file
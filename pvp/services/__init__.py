@@ -1,8 +1,14 @@
 from .rating_service import RatingService
 from .scheduler import MatchScheduler
+from .task_pool import SubjectTaskPool, get_task_pool
+from .task_sets import difficulty_mix, generate_task_set
 
 
 __all__ = [
     'RatingService',
-    'MatchScheduler'
+    'MatchScheduler',
+    'SubjectTaskPool',
+    'get_task_pool',
+    'difficulty_mix',
+    'generate_task_set',
 ]
\ No newline at end of file
@@ -5,8 +5,9 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 import logging
 
+from users.services import ensure_ratings, get_rating
 from ..models import Queue, Match, MatchParticipant, MatchTask, PvpSettings
-from tasks.models import Task
+from .task_sets import generate_task_set
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +57,10 @@ def should_create_match(player1, player2, current_time):
     """Проверяет, стоит ли создавать матч между двумя игроками"""
     try:
         settings = PvpSettings.objects.filter(is_active=True).first()
-        rating_diff = abs(player1.user.rating.score - player2.user.rating.score)
+        initial_rating = settings.initial_rating
+        rating_diff = abs(
+            get_rating(player1.user, initial_rating).score - get_rating(player2.user, initial_rating).score
+        )
         
         if rating_diff <= settings.max_rating_diff_for_nodelay:
             return True
@@ -81,12 +85,20 @@ def create_match_for_players(player1, player2):
                 max_tasks=settings.max_tasks if settings else 5
             )
             
-            MatchParticipant.objects.create(match=match, user=player1.user, player_number=1)
-            MatchParticipant.objects.create(match=match, user=player2.user, player_number=2)
+            MatchParticipant.objects.bulk_create([
+                MatchParticipant(match=match, user=player1.user, player_number=1),
+                MatchParticipant(match=match, user=player2.user, player_number=2),
+            ])
             
-            tasks = Task.objects.filter(topic__subject=match.subject).order_by('?')[:match.max_tasks]
-            for i, task in enumerate(tasks, 1):
-                MatchTask.objects.create(match=match, task=task, order=i)
+            # Первое участие в PvP создаёт строки рейтингов
+            ratings = ensure_ratings(
+                [player1.user_id, player2.user_id], (settings or PvpSettings()).initial_rating
+            )
+            ratings = [ratings[player.user_id].score for player in (player1, player2)]
+            task_ids = generate_task_set(match.subject_id, ratings, match.max_tasks, settings)
+            MatchTask.objects.bulk_create(
+                MatchTask(match=match, task_id=task_id, order=i) for i, task_id in enumerate(task_ids, 1)
+            )
             
             return match.id
             
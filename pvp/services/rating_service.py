@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from pvp.models import Match, MatchParticipant, MatchResult, PvpSettings
 from users.models import Rating
+from users.services import ensure_ratings, get_rating
 from decimal import Decimal, getcontext
 
 User = get_user_model()
@@ -78,43 +79,48 @@ class RatingService:
             if len(participants) != 2:
                 return False
             
-            # Получаем текущие рейтинги
-            rating1, _ = Rating.objects.get_or_create(user=participants[0].user)
-            rating2, _ = Rating.objects.get_or_create(user=participants[1].user)
-            
             # Получаем K-фактор из настроек
-            settings = PvpSettings.objects.filter(is_active=True).first()
-            k_factor = settings.k_factor if settings else 32
+            settings = PvpSettings.objects.filter(is_active=True).first() or PvpSettings()
+            k_factor = settings.k_factor
             
-            # Рассчитываем новые рейтинги
-            old_rating1 = rating1.score
-            old_rating2 = rating2.score
+            with transaction.atomic():
+                # Строки рейтингов блокируются до сохранения, чтобы параллельно
+                # завершённые матчи игрока не затёрли изменения друг друга
+                ratings = ensure_ratings(
+                    [participant.user_id for participant in participants], settings.initial_rating, lock=True
+                )
+                rating1 = ratings[participants[0].user_id]
+                rating2 = ratings[participants[1].user_id]
+                
+                # Рассчитываем новые рейтинги
+                old_rating1 = rating1.score
+                old_rating2 = rating2.score
             
-            new_rating1, new_rating2 = RatingService.calculate_elo_rating(
-                old_rating1, old_rating2, match.result, k_factor
-            )
+                new_rating1, new_rating2 = RatingService.calculate_elo_rating(
+                    old_rating1, old_rating2, match.result, k_factor
+                )
             
-            # Обновляем рейтинги
-            rating1.score = new_rating1
-            rating2.score = new_rating2
+                # Обновляем рейтинги
+                rating1.score = new_rating1
+                rating2.score = new_rating2
             
-            # Обновляем статистику
-            rating1.matches_played += 1
-            rating2.matches_played += 1
+                # Обновляем статистику
+                rating1.matches_played += 1
+                rating2.matches_played += 1
             
-            if match.result == 'player1_win':
-                rating1.matches_won += 1
-                rating2.matches_lost += 1
-            elif match.result == 'player2_win':
-                rating1.matches_lost += 1
-                rating2.matches_won += 1
-            elif match.result == 'draw':
-                rating1.matches_drawn += 1
-                rating2.matches_drawn += 1
-            # При technical не обновляем статистику
+                if match.result == 'player1_win':
+                    rating1.matches_won += 1
+                    rating2.matches_lost += 1
+                elif match.result == 'player2_win':
+                    rating1.matches_lost += 1
+                    rating2.matches_won += 1
+                elif match.result == 'draw':
+                    rating1.matches_drawn += 1
+                    rating2.matches_drawn += 1
+                # При technical не обновляем статистику
             
-            rating1.save()
-            rating2.save()
+                rating1.save()
+                rating2.save()
             
             return True
             
@@ -192,7 +198,7 @@ class RatingService:
                 participant = match.participants.get(user=user)
                 
                 # Получаем рейтинг на момент матча
-                rating = Rating.objects.get(user=user)
+                rating = get_rating(user)
                 
                 history.append({
                     'match_id': match.id,
@@ -223,8 +229,8 @@ class RatingService:
             dict: Статистика пользователя
         """
         try:
-            user = User.objects.get(id=user_id)
-            rating, _ = Rating.objects.get_or_create(user=user)
+            user = User.objects.select_related('rating').get(id=user_id)
+            rating = get_rating(user)
             
             # Базовый запрос матчей
             matches_query = Match.objects.filter(
@@ -253,10 +259,9 @@ class RatingService:
             # Рассчитываем средний рейтинг оппонентов
             opponent_ratings = []
             for match in matches_query:
-                opponent_participant = match.participants.exclude(user=user).first()
+                opponent_participant = match.participants.exclude(user=user).select_related('user__rating').first()
                 if opponent_participant:
-                    opponent_rating, _ = Rating.objects.get_or_create(user=opponent_participant.user)
-                    opponent_ratings.append(opponent_rating.score)
+                    opponent_ratings.append(get_rating(opponent_participant.user).score)
             
             avg_opponent_rating = sum(opponent_ratings) / len(opponent_ratings) if opponent_ratings else 0
             
@@ -1,6 +1,7 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from django_apscheduler.jobstores import DjangoJobStore, register_events
 from django_apscheduler.models import DjangoJobExecution
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from datetime import timedelta
@@ -8,6 +9,9 @@ import logging
 import atexit
 
 from .matchmaking import process_waiting_players
+from users.services import refresh_rank_snapshot
+from users.services.ratings import RANK_SNAPSHOT_MAX_AGE
+from .task_pool import POOL_MAX_AGE, refresh_solve_rates
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,9 @@ class MatchScheduler:
                 'misfire_grace_time': 30,
             }
         )
+        # configure() сбрасывает хранилища, поэтому локальное добавляется после него.
+        # Задачи, состояние которых живёт в памяти процесса, не делятся между воркерами
+        self.scheduler.add_jobstore('memory', alias='local')
         
         self.scheduler.add_job(
             process_waiting_players,
@@ -42,6 +49,30 @@ class MatchScheduler:
             replace_existing=True,
         )
         
+        self.scheduler.add_job(
+            refresh_solve_rates,
+            trigger='interval',
+            seconds=POOL_MAX_AGE,
+            id='task_pool_refresh',
+            name='Refresh match task pool solve rates',
+            jobstore='local',
+            replace_existing=True,
+        )
+        
+        self.scheduler.add_job(
+            refresh_rank_snapshot,
+            trigger='interval',
+            seconds=RANK_SNAPSHOT_MAX_AGE,
+            id='rank_snapshot_refresh',
+            name='Refresh leaderboard rank snapshot',
+            jobstore='local',
+            replace_existing=True,
+        )
+        
+        if not settings.SCHEDULER_ENABLED:
+            logger.info("Match scheduler is disabled")
+            return
+        
         self._cleanup_old_jobs()
         register_events(self.scheduler)
         self.scheduler.start()
@@ -0,0 +1,128 @@
+import random
+import threading
+
+from django.db.models import Count
+
+from tasks.models import Difficulty_Level, Task
+from tasks.services import CatalogCache, get_catalog_stamp
+from users.models import Solve
+
+LEVELS = Difficulty_Level.values
+
+# Доли решений меняются без смены версии каталога; планировщик
+# пересчитывает их в фоне раз в POOL_MAX_AGE секунд
+POOL_MAX_AGE = 600
+
+# Уровень задачи сдвигается по доле решивших её среди решавших предмет,
+# если таких игроков не меньше MIN_SUBJECT_SOLVERS
+MIN_SUBJECT_SOLVERS = 20
+EASY_SOLVE_RATE = 0.6
+HARD_SOLVE_RATE = 0.1
+
+
+class SubjectTaskPool:
+    """
+    Задачи предмета для выбора в матч: id и уровни сложности
+
+    Хранит только кортежи id, поэтому выборка не обращается к БД и стоит
+    O(count) независимо от размера банка задач.
+    """
+
+    def __init__(self, task_ids, levels):
+        self.task_ids = tuple(task_ids)
+        self.levels = dict(zip(self.task_ids, levels))
+        by_level = {}
+        for task_id, level in self.levels.items():
+            by_level.setdefault(level, []).append(task_id)
+        self.by_level = {level: tuple(ids) for level, ids in by_level.items()}
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def sample(self, count, level=None, rng=random):
+        """
+        Случайные id задач без повторов
+
+        Args:
+            count: Сколько задач нужно; если задач меньше, возвращаются все
+            level: Уровень сложности; по умолчанию — любые задачи предмета
+        """
+        task_ids = self.task_ids if level is None else self.by_level.get(level, ())
+        return rng.sample(task_ids, min(count, len(task_ids)))
+
+
+def rated_level(level, solved, solvers):
+    """Уровень задачи с поправкой на долю решивших: заметно лёгкие и трудные сдвигаются на шаг"""
+    if solvers < MIN_SUBJECT_SOLVERS or level not in LEVELS:
+        return level
+    index = LEVELS.index(level)
+    rate = solved / solvers
+    if rate >= EASY_SOLVE_RATE:
+        index = max(index - 1, 0)
+    elif rate <= HARD_SOLVE_RATE:
+        index = min(index + 1, len(LEVELS) - 1)
+    return LEVELS[index]
+
+
+class SolveRates:
+    """
+    Число решивших каждую задачу и решавших каждый предмет
+
+    Подсчёт проходит всю таблицу решений, поэтому выполняется не при создании
+    матча, а задачей планировщика (refresh_solve_rates, первый раз — через
+    POOL_MAX_AGE после запуска). До первого подсчёта уровни задач берутся как есть.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.solves = {}
+        self.solvers = {}
+
+    def refresh(self):
+        solves = dict(Solve.objects.values_list('task_id').annotate(total=Count('id')).order_by())
+        solvers = dict(
+            Solve.objects.values_list('task__topic__subject_id')
+            .annotate(total=Count('user_id', distinct=True)).order_by()
+        )
+        with self._lock:
+            self.solves, self.solvers = solves, solvers
+            self.generation += 1
+
+    def snapshot(self):
+        with self._lock:
+            return self.solves, self.solvers
+
+    def clear(self):
+        with self._lock:
+            self.solves, self.solvers = {}, {}
+            self.generation += 1
+
+
+solve_rates = SolveRates()
+
+
+def refresh_solve_rates():
+    """Пересчитывает доли решений задач; пулы пересобираются при следующем обращении"""
+    solve_rates.refresh()
+
+
+def build_task_pools():
+    solves, solvers = solve_rates.snapshot()
+    rows = {}
+    for task_id, subject_id, level in (
+        Task.objects.values_list('id', 'topic__subject_id', 'difficulty_level').order_by('id').iterator()
+    ):
+        task_ids, levels = rows.setdefault(subject_id, ([], []))
+        task_ids.append(task_id)
+        levels.append(rated_level(level, solves.get(task_id, 0), solvers.get(subject_id, 0)))
+    return {subject_id: SubjectTaskPool(task_ids, levels) for subject_id, (task_ids, levels) in rows.items()}
+
+
+task_pools = CatalogCache(build_task_pools)
+
+
+def get_task_pool(subject_id):
+    """Пул задач предмета; пересобирается при изменении каталога и после пересчёта долей решений"""
+    key = (get_catalog_stamp(), solve_rates.generation)
+    return task_pools.get(key).get(subject_id) or SubjectTaskPool((), ())
@@ -0,0 +1,77 @@
+import random
+
+from ..models import PvpSettings, parse_difficulty_mix
+from .task_pool import LEVELS, get_task_pool
+
+
+def difficulty_mix(settings, rating):
+    """
+    Доли уровней сложности для среднего рейтинга игроков
+
+    До settings.low_rating действует low_rating_mix, от settings.high_rating —
+    high_rating_mix, между ними доли меняются линейно.
+    """
+    low = parse_difficulty_mix(settings.low_rating_mix)
+    high = parse_difficulty_mix(settings.high_rating_mix)
+    span = settings.high_rating - settings.low_rating
+    position = (rating - settings.low_rating) / span if span > 0 else float(rating >= settings.high_rating)
+    position = min(max(position, 0), 1)
+    return {level: low[level] * (1 - position) + high[level] * position for level in LEVELS}
+
+
+def split_count(mix, count):
+    """Раскладывает count задач по уровням пропорционально долям (методом наибольшего остатка)"""
+    exact = {level: mix.get(level, 0) * count for level in LEVELS}
+    counts = {level: int(value) for level, value in exact.items()}
+    rest = count - sum(counts.values())
+    by_remainder = sorted(LEVELS, key=lambda level: (exact[level] - counts[level], exact[level]), reverse=True)
+    for level in by_remainder[:rest]:
+        counts[level] += 1
+    return counts
+
+
+def generate_task_set(subject_id, ratings, count, settings=None, rng=random):
+    """
+    Набор задач матча под рейтинг игроков
+
+    Число задач каждого уровня берётся из difficulty_mix для среднего рейтинга,
+    задачи выбираются из пула предмета по уровням (уровень учитывает долю
+    решивших). Если задач какого-то уровня не хватает, недостающие берутся
+    с остальных уровней, начиная с самых востребованных.
+
+    Args:
+        subject_id: Предмет матча
+        ratings: Рейтинги игроков
+        count: Сколько задач нужно
+        settings: PvpSettings; по умолчанию — значения полей по умолчанию
+
+    Returns:
+        list: id задач от лёгких к трудным
+    """
+    settings = settings or PvpSettings()
+    pool = get_task_pool(subject_id)
+    mix = difficulty_mix(settings, sum(ratings) / len(ratings))
+    counts = split_count(mix, count)
+
+    chosen = {level: pool.sample(counts[level], level, rng) for level in LEVELS}
+    shortage = count - sum(len(task_ids) for task_ids in chosen.values())
+    for level in sorted(LEVELS, key=mix.get, reverse=True):
+        if shortage <= 0:
+            break
+        picked = chosen[level]
+        extra = [
+            task_id
+            for task_id in pool.sample(len(picked) + shortage, level, rng)
+            if task_id not in picked
+        ][:shortage]
+        picked.extend(extra)
+        shortage -= len(extra)
+
+    task_ids = [task_id for level in LEVELS for task_id in chosen[level]]
+    if shortage > 0:
+        # Задачи с уровнем вне Difficulty_Level
+        picked = set(task_ids)
+        task_ids.extend([
+            task_id for task_id in pool.sample(len(task_ids) + shortage, rng=rng) if task_id not in picked
+        ][:shortage])
+    return task_ids
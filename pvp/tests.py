@@ -1,4 +1,7 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -6,13 +9,17 @@ from pvp.models import (
     Queue, Match, MatchParticipant, MatchTask, PvpSettings,
     MatchStatus, MatchResult
 )
-from pvp.services import RatingService
+from pvp.services import MatchScheduler, RatingService, difficulty_mix, generate_task_set, get_task_pool
+from pvp.services.matchmaking import create_match_for_players
+from pvp.services.task_pool import MIN_SUBJECT_SOLVERS, rated_level, refresh_solve_rates, solve_rates, task_pools
+from pvp.services.task_sets import split_count
 from pvp.serializers import (
     MatchSerializer, MatchParticipantSerializer, MatchTaskSerializer,
     CreateMatchSerializer, PvpSettingsSerializer, RatingSerializer
 )
 from tasks.models import Subject, Topic, Task, Difficulty_Level
-from users.models import Rating
+from users.models import Rating, Solve
+from users.services import ensure_ratings
 
 User = get_user_model()
 
@@ -681,3 +688,225 @@ class MatchFlowTest(TestCase):
 
         self.assertEqual(rating1.matches_drawn, 1)
         self.assertEqual(rating2.matches_drawn, 1)
+
+
+class MatchmakingTest(TestCase):
+    """Тесты создания матча с выбором задач из пула предмета"""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name='Математика')
+        self.topic = Topic.objects.create(name='Алгебра', subject=self.subject)
+        other_topic = Topic.objects.create(name='Механика', subject=Subject.objects.create(name='Физика'))
+        Task.objects.create(
+            name='Чужая задача', description='Описание', answer='1',
+            topic=other_topic, difficulty_level=Difficulty_Level.EASY,
+        )
+        self.queues = []
+        for number in (1, 2):
+            user = User.objects.create_user(
+                username=f'player{number}', email=f'player{number}@example.com', password='testpass123'
+            )
+            self.queues.append(Queue.objects.create(user=user, subject=self.subject))
+        # Версия каталога откатывается вместе с транзакцией теста
+        task_pools.clear()
+        solve_rates.clear()
+
+    def add_tasks(self, count, level=Difficulty_Level.EASY):
+        return Task.objects.bulk_create(
+            Task(name=f'Задача {i}', description='Описание', answer='1', topic=self.topic, difficulty_level=level)
+            for i in range(count)
+        )
+
+    def create_match(self):
+        queues = Queue.objects.filter(id__in=[queue.id for queue in self.queues]).select_related('user__rating', 'subject')
+        match_id = create_match_for_players(*sorted(queues, key=lambda queue: queue.id))
+        self.assertIsNotNone(match_id)
+        return Match.objects.get(id=match_id)
+
+    def test_match_gets_distinct_subject_tasks(self):
+        """Матч получает max_tasks разных задач своего предмета по порядку"""
+        self.add_tasks(20)
+        match = self.create_match()
+        match_tasks = list(match.match_tasks.order_by('order').select_related('task__topic'))
+        self.assertEqual([match_task.order for match_task in match_tasks], [1, 2, 3, 4, 5])
+        self.assertEqual(len({match_task.task_id for match_task in match_tasks}), 5)
+        self.assertTrue(all(match_task.task.topic.subject_id == self.subject.id for match_task in match_tasks))
+        self.assertEqual(match.participants.count(), 2)
+
+    def test_small_bank_uses_all_tasks(self):
+        """Если задач меньше max_tasks, в матч попадают все"""
+        tasks = self.add_tasks(3)
+        match = self.create_match()
+        self.assertEqual(set(match.match_tasks.values_list('task_id', flat=True)), {task.id for task in tasks})
+
+    def test_pool_is_refreshed_when_catalog_changes(self):
+        """Пул пересобирается после изменения задач"""
+        self.assertEqual(len(get_task_pool(self.subject.id)), 0)
+        self.add_tasks(2)
+        task = Task.objects.create(
+            name='Трудная', description='Описание', answer='1', topic=self.topic, difficulty_level=Difficulty_Level.HARD
+        )
+        pool = get_task_pool(self.subject.id)
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(pool.sample(5, level=Difficulty_Level.HARD), [task.id])
+
+    def test_solve_rates_are_refreshed_in_background(self):
+        """Доли решений применяются к пулу только после пересчёта планировщиком"""
+        task = Task.objects.create(
+            name='Средняя', description='Описание', answer='1', topic=self.topic, difficulty_level=Difficulty_Level.MEDIUM
+        )
+        solvers = User.objects.bulk_create(
+            User(username=f'solver{i}', email=f'solver{i}@example.com', password='x')
+            for i in range(MIN_SUBJECT_SOLVERS)
+        )
+        Solve.objects.bulk_create(Solve(user=user, task=task) for user in solvers)
+        self.assertEqual(get_task_pool(self.subject.id).levels[task.id], Difficulty_Level.MEDIUM)
+        refresh_solve_rates()
+        self.assertEqual(get_task_pool(self.subject.id).levels[task.id], Difficulty_Level.EASY)
+
+    def test_scheduler_is_not_started_in_tests(self):
+        """В тестах планировщик не запускается: его задачи работали бы с основной БД"""
+        scheduler = MatchScheduler().scheduler
+        self.assertFalse(scheduler.running)
+        self.assertIsNotNone(scheduler.get_job('task_pool_refresh'))
+
+    def test_query_count_does_not_depend_on_bank_size(self):
+        """Число запросов на создание матча не зависит от количества задач"""
+        # Рейтинги игроков создаются при первом матче, дальше только читаются
+        ensure_ratings([queue.user_id for queue in self.queues])
+        query_counts = []
+        for count in (10, 200):
+            self.add_tasks(count)
+            Task.objects.first().save()
+            get_task_pool(self.subject.id)
+            with CaptureQueriesContext(connection) as queries:
+                self.create_match()
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+class TaskSetGenerationTest(TestCase):
+    """Тесты подбора сложности задач матча под рейтинг игроков"""
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name='Математика')
+        self.topic = Topic.objects.create(name='Алгебра', subject=self.subject)
+        self.settings = PvpSettings(name='default')
+        task_pools.clear()
+        solve_rates.clear()
+
+    def add_tasks(self, level, count=10):
+        tasks = Task.objects.bulk_create(
+            Task(name=f'{level} {i}', description='Описание', answer='1', topic=self.topic, difficulty_level=level)
+            for i in range(count)
+        )
+        Task.objects.first().save()
+        return tasks
+
+    def levels(self, task_ids):
+        levels = dict(Task.objects.filter(id__in=task_ids).values_list('id', 'difficulty_level'))
+        return [levels[task_id] for task_id in task_ids]
+
+    def test_difficulty_mix_follows_rating(self):
+        """Доли сложности меняются от low_rating_mix к high_rating_mix"""
+        E, M, H = Difficulty_Level.values
+        self.assertAlmostEqual(difficulty_mix(self.settings, 500)[E], 0.6)
+        self.assertAlmostEqual(difficulty_mix(self.settings, 1100)[E], 0.35)
+        self.assertAlmostEqual(difficulty_mix(self.settings, 2000)[H], 0.6)
+        self.assertEqual(split_count(difficulty_mix(self.settings, 500), 5), {E: 3, M: 2, H: 0})
+        self.assertEqual(sum(split_count(difficulty_mix(self.settings, 1234), 7).values()), 7)
+
+    def test_task_set_matches_rating(self):
+        """Новички получают в основном лёгкие задачи, сильные игроки — трудные, от лёгких к трудным"""
+        for level in Difficulty_Level.values:
+            self.add_tasks(level)
+        E, M, H = Difficulty_Level.values
+
+        beginners = generate_task_set(self.subject.id, [700, 750], 5, self.settings)
+        self.assertEqual(self.levels(beginners), [E, E, E, M, M])
+        experts = generate_task_set(self.subject.id, [1500, 1600], 5, self.settings)
+        self.assertEqual(self.levels(experts), [M, M, H, H, H])
+
+    def test_missing_levels_are_filled(self):
+        """Если трудных задач нет, набор добирается задачами других уровней"""
+        self.add_tasks(Difficulty_Level.EASY, count=4)
+        self.add_tasks(Difficulty_Level.MEDIUM, count=1)
+        task_ids = generate_task_set(self.subject.id, [1600, 1600], 5, self.settings)
+        self.assertEqual(len(set(task_ids)), 5)
+
+    def test_solve_rate_adjusts_level(self):
+        """Уровень сдвигается по доле решивших, только если решавших достаточно"""
+        E, M, H = Difficulty_Level.values
+        self.assertEqual(rated_level(M, 15, MIN_SUBJECT_SOLVERS), E)
+        self.assertEqual(rated_level(M, 1, MIN_SUBJECT_SOLVERS), H)
+        self.assertEqual(rated_level(M, 8, MIN_SUBJECT_SOLVERS), M)
+        self.assertEqual(rated_level(E, 20, MIN_SUBJECT_SOLVERS), E)
+        self.assertEqual(rated_level(M, 0, MIN_SUBJECT_SOLVERS - 1), M)
+
+    def test_invalid_mix_is_rejected(self):
+        """Некорректные доли сложности не проходят валидацию"""
+        for value in ('60/40', 'a/b/c', '0/0/0', '-1/50/51'):
+            self.settings.low_rating_mix = value
+            with self.assertRaises(ValidationError):
+                self.settings.full_clean()
+
+
+class MatchExportTest(TestCase):
+    """Тесты потоковой выгрузки матчей в CSV"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123'
+        )
+        self.client.force_login(self.admin)
+        self.user1 = User.objects.create_user(username='player1', email='p1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='player2', email='p2@example.com', password='testpass123')
+        self.math = Subject.objects.create(name='Математика')
+        self.physics = Subject.objects.create(name='Физика')
+
+        self.match = Match.objects.create(
+            subject=self.math, status=MatchStatus.FINISHED,
+            result=MatchResult.PLAYER1_WIN, winner=self.user1
+        )
+        MatchParticipant.objects.create(match=self.match, user=self.user2, player_number=2, tasks_solved=1)
+        MatchParticipant.objects.create(match=self.match, user=self.user1, player_number=1, tasks_solved=3)
+        Match.objects.create(subject=self.physics)
+
+    def export(self, params=''):
+        response = self.client.get('/admin/pvp/match/export-csv/' + params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+
+    def test_export_all_matches(self):
+        """Выгружаются все матчи с игроками по номерам"""
+        lines = self.export()
+        self.assertEqual(len(lines), 3)
+        row = lines[1].split(',')
+        self.assertEqual(row[:5], [str(self.match.id), 'Математика', 'Завершен', 'Победа игрока 1', 'player1'])
+        self.assertEqual(row[10:14], ['player1', 'player2', '3', '1'])
+        self.assertEqual(lines[2].split(',')[10:], ['', '', '', '', '', ''])
+
+    def test_export_uses_list_filters(self):
+        """Фильтры списка (предмет, даты) ограничивают выгрузку"""
+        lines = self.export(f'?subject__id__exact={self.physics.id}')
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Физика', lines[1])
+
+        tomorrow = (timezone.localdate() + timezone.timedelta(days=1)).strftime('%Y-%m-%d')
+        self.assertEqual(len(self.export(f'?created_at__gte={tomorrow}')), 1)
+
+    def test_export_query_count_does_not_depend_on_matches(self):
+        """Выгрузка не делает запросов на каждый матч"""
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.export()
+            return len(queries)
+
+        before = count_queries()
+        for _ in range(5):
+            Match.objects.create(subject=self.math)
+        self.assertEqual(count_queries(), before)
+
@@ -1,22 +1,27 @@
-import csv
-
 from django.contrib import admin
-from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.urls import path
 from django.contrib import messages
-from django.utils import timezone
+
+from pentolymp.exports import EXPORT_CHUNK_SIZE, changelist_queryset, streaming_csv_response
 
 from .forms import CsvImportForm
 from .models import Task, Subject, Topic
+from .services import import_tasks_csv, search_tasks, sync_tasks_csv
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('name', 'topic', 'difficulty_level')
-    list_filter = ('topic', 'difficulty_level')
-    search_fields = ('name', 'description')
+    list_filter = ('topic__subject', 'topic', 'difficulty_level', 'updated_at')
+    search_fields = ('name',)
     change_list_template = 'admin/tasks_task_change_list.html'
+    import_errors_shown = 20
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_tasks(queryset, search_term), False
     
     def get_urls(self):
         urls = super().get_urls()
@@ -36,39 +41,27 @@ class TaskAdmin(admin.ModelAdmin):
                     return redirect(request.path)
                 
                 try:
-                    decoded_file = csv_file.read().decode('utf-8').splitlines()
-                    reader = csv.DictReader(decoded_file)
+                    if form.cleaned_data['sync']:
+                        importer = sync_tasks_csv(
+                            csv_file,
+                            delete_missing=form.cleaned_data['delete_missing'],
+                            dry_run=form.cleaned_data['dry_run'],
+                        )
+                        self.message_sync_result(request, importer)
+                    else:
+                        importer = import_tasks_csv(csv_file)
+                        if importer.created > 0:
+                            messages.success(request, f'Успешно создано {importer.created} задач')
                     
-                    created_count = 0
-                    error_count = 0
-                    
-                    for row in reader:
-                        try:
-                            subject, _ = Subject.objects.get_or_create(
-                                name=row.get('subject', '').strip()
-                            )
-                            topic, _ = Topic.objects.get_or_create(
-                                name=row.get('topic', '').strip(),
-                                defaults={'subject': subject}
-                            )
-                            
-                            Task.objects.create(
-                                name=row.get('name', '').strip(),
-                                description=row.get('description', '').strip(),
-                                answer=row.get('answer', '').strip(),
-                                topic=topic,
-                                difficulty_level=row.get('difficulty_level', 'Medium').strip(),
-                                tip=row.get('tip', '').strip() or None
-                            )
-                            created_count += 1
-                        except Exception as e:
-                            error_count += 1
-                            continue
-                    
-                    if created_count > 0:
-                        messages.success(request, f'Успешно создано {created_count} задач')
-                    if error_count > 0:
-                        messages.warning(request, f'Не удалось создать {error_count} задач')
+                    if importer.errors:
+                        shown = '; '.join(
+                            f'строка {line}: {message}'
+                            for line, message in importer.errors[:self.import_errors_shown]
+                        )
+                        more = len(importer.errors) - self.import_errors_shown
+                        if more > 0:
+                            shown += f' и ещё {more}'
+                        messages.warning(request, f'Не удалось создать {len(importer.errors)} задач: {shown}')
                     
                 except Exception as e:
                     messages.error(request, f'Ошибка при обработке файла: {str(e)}')
@@ -84,26 +77,33 @@ class TaskAdmin(admin.ModelAdmin):
         }
         return render(request, 'admin/csv_import.html', context)
     
+    def message_sync_result(self, request, importer):
+        summary = (
+            f'создано {importer.created}, обновлено {importer.updated}, '
+            f'без изменений {importer.unchanged}, удалено {importer.deleted}'
+        )
+        if importer.dry_run:
+            messages.info(request, f'Проверка синхронизации, ничего не сохранено: {summary}')
+        else:
+            messages.success(request, f'Синхронизация завершена: {summary}')
+        if importer.delete_skipped:
+            messages.warning(request, 'Отсутствующие задачи не удалены, потому что в файле есть ошибки')
+    
     def export_csv(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="tasks" {timezone.now().strftime("%Y-%m-%d")}.csv'
-        
-        writer = csv.writer(response)
-        writer.writerow(['name', 'description', 'answer', 'subject', 'topic', 'difficulty_level', 'tip'])
-        
-        tasks = Task.objects.all()
-        for task in tasks:
-            writer.writerow([
-                task.name,
-                task.description,
-                task.answer,
-                task.topic.subject.name,
-                task.topic.name,
-                task.difficulty_level,
-                task.tip
-            ])
-        
-        return response
+        header = [
+            'external_id', 'name', 'description', 'answer', 'subject', 'topic',
+            'difficulty_level', 'tip', 'answer_type', 'answer_variants', 'answer_tolerance',
+        ]
+        rows = (
+            changelist_queryset(self, request)
+            .order_by('id')
+            .values_list(
+                'external_id', 'name', 'description', 'answer', 'topic__subject__name', 'topic__name',
+                'difficulty_level', 'tip', 'answer_type', 'answer_variants', 'answer_tolerance',
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return streaming_csv_response('tasks', header, rows)
 
     def changelist_view(self, request, extra_context=None):
         extra_context = extra_context or {}
@@ -0,0 +1,135 @@
+"""
+Проверка ответов на задачи
+
+Правило проверки задачи собирается при сохранении (build_answer_spec) и
+хранится в Task.answer_matcher как канонический JSON. По этой строке
+get_matcher() кеширует в памяти готовый объект с нормализованными значениями
+и скомпилированными регулярными выражениями, поэтому на каждую попытку
+остаётся только нормализовать ответ пользователя.
+"""
+import json
+import re
+from fractions import Fraction
+from functools import lru_cache
+
+from .utils import normalize_text
+
+AUTO = 'auto'
+EXACT = 'exact'
+NUMERIC = 'numeric'
+REGEX = 'regex'
+
+MATCHER_CACHE_SIZE = 4096
+# Ограничения на число в ответе: Fraction('1e10000000') считается десятки секунд
+NUMBER_MAX_LENGTH = 64
+NUMBER_MAX_EXPONENT = 100
+_MINUSES = str.maketrans({'−': '-', '–': '-', '—': '-'})
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE]([+-]?\d{1,4}))?')
+
+
+def normalize_answer(answer):
+    """Текст ответа без регистра, ё и лишних пробелов"""
+    return ' '.join(normalize_text(answer).split())
+
+
+def parse_number(answer):
+    """
+    Число из ответа: 0.5, 0,5, 1/2, -3, 1e-3
+
+    Длиннее NUMBER_MAX_LENGTH символов или с порядком больше
+    NUMBER_MAX_EXPONENT ответ числом не считается.
+
+    Returns:
+        Fraction | None: None, если ответ не число
+    """
+    text = (answer or '').strip().translate(_MINUSES).replace(' ', '').replace(',', '.')
+    if not text or len(text) > NUMBER_MAX_LENGTH or text.count('/') > 1:
+        return None
+    parts = text.split('/')
+    for part in parts:
+        match = _NUMBER_RE.fullmatch(part)
+        if match is None or (match.group(1) and abs(int(match.group(1))) > NUMBER_MAX_EXPONENT):
+            return None
+    try:
+        if len(parts) == 2:
+            return Fraction(Fraction(parts[0]), Fraction(parts[1]))
+        return Fraction(text)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def split_variants(answer, variants=''):
+    """Основной ответ и дополнительные варианты (по одному в строке)"""
+    values = [answer or ''] + (variants or '').splitlines()
+    return [value.strip() for value in values if value.strip()]
+
+
+def build_answer_spec(answer, answer_type=AUTO, variants='', tolerance=None):
+    """
+    Каноническое описание правила проверки для хранения в Task.answer_matcher
+
+    auto выбирает numeric, если все варианты ответа — числа, иначе exact.
+    """
+    values = split_variants(answer, variants)
+    if answer_type == AUTO:
+        numeric = bool(values) and all(parse_number(value) is not None for value in values)
+        answer_type = NUMERIC if numeric else EXACT
+
+    if answer_type == NUMERIC:
+        numbers = [parse_number(value) for value in values]
+        spec = {
+            'type': NUMERIC,
+            'values': sorted({str(number) for number in numbers if number is not None}),
+            'tolerance': tolerance or 0,
+        }
+    elif answer_type == REGEX:
+        spec = {'type': REGEX, 'values': values}
+    else:
+        spec = {'type': EXACT, 'values': sorted({normalize_answer(value) for value in values})}
+    return json.dumps(spec, ensure_ascii=False, sort_keys=True)
+
+
+def validate_regex(answer, variants=''):
+    """Сообщение об ошибке первого некорректного выражения или None"""
+    for pattern in split_variants(answer, variants):
+        try:
+            re.compile(pattern)
+        except re.error as error:
+            return f"{pattern}: {error}"
+    return None
+
+
+class AnswerMatcher:
+    """Готовое правило проверки; вызывается с ответом пользователя"""
+
+    def __init__(self, spec):
+        spec = json.loads(spec)
+        self.type = spec['type']
+        if self.type == NUMERIC:
+            self.numbers = [Fraction(value) for value in spec['values']]
+            self.tolerance = Fraction(str(spec['tolerance']))
+        elif self.type == REGEX:
+            self.patterns = []
+            for pattern in spec['values']:
+                try:
+                    self.patterns.append(re.compile(pattern, re.IGNORECASE))
+                except re.error:
+                    continue
+        else:
+            self.values = frozenset(spec['values'])
+
+    def __call__(self, answer):
+        if self.type == NUMERIC:
+            number = parse_number(answer)
+            if number is None:
+                return False
+            return any(abs(number - expected) <= self.tolerance for expected in self.numbers)
+        if self.type == REGEX:
+            answer = (answer or '').strip()
+            return any(pattern.fullmatch(answer) for pattern in self.patterns)
+        return normalize_answer(answer) in self.values
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def get_matcher(spec):
+    return AnswerMatcher(spec)
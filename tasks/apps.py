@@ -5,3 +5,5 @@ class TasksConfig(AppConfig):
     name = "tasks"
     verbose_name = 'Задания'
 
+    def ready(self):
+        from . import signals
@@ -4,5 +4,26 @@ from django import forms
 class CsvImportForm(forms.Form):
     csv_file = forms.FileField(
         label='CSV файл',
-        help_text='Выберите CSV файл с задачами. Файл должен содержать колонки: name, description, answer, subject, topic, difficulty_level, tip'
+        help_text=(
+            'Выберите CSV файл с задачами. Файл должен содержать колонки: name, description, answer, subject, topic, difficulty_level, tip. '
+            'Необязательные колонки: external_id, answer_type, answer_variants, answer_tolerance'
+        )
+    )
+    sync = forms.BooleanField(
+        label='Синхронизировать',
+        required=False,
+        help_text=(
+            'Обновить существующие задачи вместо создания дублей. Задачи сопоставляются '
+            'по external_id, а без него — по предмету, теме и названию'
+        )
+    )
+    delete_missing = forms.BooleanField(
+        label='Удалить отсутствующие',
+        required=False,
+        help_text='При синхронизации удалить задачи предметов из файла, которых нет в файле'
+    )
+    dry_run = forms.BooleanField(
+        label='Только проверить',
+        required=False,
+        help_text='Показать, что изменится при синхронизации, ничего не сохраняя'
     )
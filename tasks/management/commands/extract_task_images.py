@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.services import extract_task_images
+
+
+class Command(BaseCommand):
+    help = "Выносит встроенные base64-изображения из условий задач в файлы MEDIA_ROOT"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = extract_task_images(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Обновлено задач: {total}"))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.services import import_tasks_csv, sync_tasks_csv
+
+
+class Command(BaseCommand):
+    help = "Импортирует задачи из CSV-файла (колонки как в импорте из админки)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--sync', action='store_true',
+            help="Обновлять задачи по external_id или предмету, теме и названию вместо создания дублей",
+        )
+        parser.add_argument(
+            '--delete-missing', action='store_true',
+            help="С --sync удалить задачи предметов из файла, которых нет в файле",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="С --sync только показать итоги, ничего не сохраняя")
+
+    def handle(self, *args, **options):
+        if (options['delete_missing'] or options['dry_run']) and not options['sync']:
+            raise CommandError("--delete-missing и --dry-run работают только с --sync")
+        try:
+            with open(options['path'], 'rb') as csv_file:
+                if options['sync']:
+                    importer = sync_tasks_csv(
+                        csv_file,
+                        batch_size=options['batch_size'],
+                        delete_missing=options['delete_missing'],
+                        dry_run=options['dry_run'],
+                    )
+                else:
+                    importer = import_tasks_csv(csv_file, batch_size=options['batch_size'])
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f"Не удалось прочитать файл: {error}")
+
+        for line, message in importer.errors:
+            self.stderr.write(f"строка {line}: {message}")
+        if not options['sync']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Создано задач: {importer.created}, ошибок: {len(importer.errors)}"
+            ))
+            return
+        if importer.delete_skipped:
+            self.stderr.write("Отсутствующие задачи не удалены, потому что в файле есть ошибки")
+        prefix = "Проверка, ничего не сохранено. " if importer.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Создано: {importer.created}, обновлено: {importer.updated}, "
+            f"без изменений: {importer.unchanged}, удалено: {importer.deleted}, ошибок: {len(importer.errors)}"
+        ))
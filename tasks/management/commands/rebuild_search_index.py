@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.services import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Перестраивает поисковый индекс задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано задач: {total}"))
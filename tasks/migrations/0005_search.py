@@ -0,0 +1,137 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:18
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from tasks.utils import html_to_text, normalize_text, tokenize
+
+SEARCH_INDEX_NAME = "tasks_tasksearchdocument_fts"
+SEARCH_VECTOR = (
+    "(setweight(to_tsvector('russian', \"name\"), 'A')"
+    " || setweight(to_tsvector('russian', \"catalog\"), 'B')"
+    " || setweight(to_tsvector('russian', \"body\"), 'C'))"
+)
+
+
+def create_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX {SEARCH_INDEX_NAME} ON tasks_tasksearchdocument USING GIN ({SEARCH_VECTOR})"
+    )
+
+
+def drop_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+
+
+def index_existing_tasks(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskSearchDocument = apps.get_model("tasks", "TaskSearchDocument")
+    TaskSearchToken = apps.get_model("tasks", "TaskSearchToken")
+    with_tokens = schema_editor.connection.vendor != "postgresql"
+
+    documents = []
+    tokens = []
+    tasks = Task.objects.select_related("topic__subject").order_by("id")
+    for task in tasks.iterator(chunk_size=1000):
+        document = TaskSearchDocument(
+            task_id=task.id,
+            name=normalize_text(task.name),
+            body=normalize_text(html_to_text(task.description)),
+            catalog=normalize_text(f"{task.topic.name} {task.topic.subject.name}"),
+        )
+        documents.append(document)
+        if with_tokens:
+            weights = defaultdict(int)
+            for text, weight in (
+                (document.name, 4),
+                (document.catalog, 2),
+                (document.body, 1),
+            ):
+                for token in set(tokenize(text)):
+                    weights[token[:64]] += weight
+            tokens.extend(
+                TaskSearchToken(task_id=task.id, token=token, weight=weight)
+                for token, weight in weights.items()
+            )
+        if len(documents) >= 1000:
+            TaskSearchDocument.objects.bulk_create(documents)
+            TaskSearchToken.objects.bulk_create(tokens, batch_size=5000)
+            documents, tokens = [], []
+    TaskSearchDocument.objects.bulk_create(documents)
+    TaskSearchToken.objects.bulk_create(tokens, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_tip"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSearchDocument",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="tasks.task",
+                    ),
+                ),
+                ("name", models.TextField(verbose_name="Название")),
+                ("body", models.TextField(blank=True, verbose_name="Текст условия")),
+                (
+                    "catalog",
+                    models.TextField(blank=True, verbose_name="Тема и предмет"),
+                ),
+            ],
+            options={
+                "verbose_name": "Поисковый документ задачи",
+                "verbose_name_plural": "Поисковые документы задач",
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=64, verbose_name="Токен")),
+                ("weight", models.PositiveSmallIntegerField(verbose_name="Вес")),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Поисковый токен задачи",
+                "verbose_name_plural": "Поисковые токены задач",
+                "indexes": [
+                    models.Index(
+                        fields=["token", "task"], name="tasks_tasks_token_d23fdc_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_full_text_index, drop_full_text_index),
+        migrations.RunPython(index_existing_tasks, migrations.RunPython.noop),
+    ]
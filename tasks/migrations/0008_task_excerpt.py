@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:39
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.utils import make_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    CatalogVersion = apps.get_model("tasks", "CatalogVersion")
+
+    batch = []
+    for task in (
+        Task.objects.only("id", "description").order_by("id").iterator(chunk_size=1000)
+    ):
+        task.excerpt = make_excerpt(task.description)
+        task.description_size = len((task.description or "").encode())
+        batch.append(task)
+        if len(batch) >= 1000:
+            Task.objects.bulk_update(batch, ["excerpt", "description_size"])
+            batch = []
+    Task.objects.bulk_update(batch, ["excerpt", "description_size"])
+
+    # Ответ списка задач изменился: сбрасываем ETag'и, построенные по версии каталога
+    CatalogVersion.objects.filter(name="catalog").update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="description_size",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Размер условия, байт"
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="excerpt",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="Краткое условие",
+            ),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:44
+
+from django.db import migrations, models
+
+from tasks.answers import build_answer_spec
+
+
+def fill_answer_matchers(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    fields = ["answer", "answer_type", "answer_variants", "answer_tolerance"]
+    batch = []
+    for task in (
+        Task.objects.only("id", *fields).order_by("id").iterator(chunk_size=1000)
+    ):
+        task.answer_matcher = build_answer_spec(
+            task.answer, task.answer_type, task.answer_variants, task.answer_tolerance
+        )
+        batch.append(task)
+        if len(batch) >= 1000:
+            Task.objects.bulk_update(batch, ["answer_matcher"])
+            batch = []
+    Task.objects.bulk_update(batch, ["answer_matcher"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_excerpt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="answer_matcher",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Правило проверки"
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="answer_tolerance",
+            field=models.FloatField(
+                blank=True,
+                help_text="Для числовых ответов",
+                null=True,
+                verbose_name="Допустимая погрешность",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="answer_type",
+            field=models.CharField(
+                choices=[
+                    ("auto", "Автоматически (число или текст)"),
+                    ("exact", "Текст"),
+                    ("numeric", "Число"),
+                    ("regex", "Регулярное выражение"),
+                ],
+                default="auto",
+                verbose_name="Тип проверки ответа",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="answer_variants",
+            field=models.TextField(
+                blank=True,
+                help_text="По одному в строке",
+                verbose_name="Другие верные ответы",
+            ),
+        ),
+        migrations.RunPython(fill_answer_matchers, migrations.RunPython.noop),
+    ]
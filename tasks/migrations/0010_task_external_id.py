@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_answer_matcher"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="external_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Ключ задачи для синхронизации каталога из CSV",
+                max_length=64,
+                null=True,
+                unique=True,
+                verbose_name="Внешний идентификатор",
+            ),
+        ),
+    ]
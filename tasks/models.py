@@ -1,6 +1,11 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from tinymce import models as tinymce_models
 
+from . import answers
+from .utils import extract_inline_images, make_excerpt
+
 
 class Difficulty_Level(models.TextChoices):
     EASY = "Easy", "Легко"
@@ -8,19 +13,98 @@ class Difficulty_Level(models.TextChoices):
     HARD = "Hard", "Трудно"
 
 
+class AnswerType(models.TextChoices):
+    AUTO = answers.AUTO, "Автоматически (число или текст)"
+    EXACT = answers.EXACT, "Текст"
+    NUMERIC = answers.NUMERIC, "Число"
+    REGEX = answers.REGEX, "Регулярное выражение"
+
+
 class Task(models.Model):
     name = models.CharField("Название", max_length=30)
+    external_id = models.CharField(
+        "Внешний идентификатор",
+        max_length=64,
+        unique=True,
+        blank=True,
+        null=True,
+        help_text="Ключ задачи для синхронизации каталога из CSV",
+    )
     description = tinymce_models.HTMLField("Условие задачи")
     answer = models.CharField("Правильный ответ")
+    answer_type = models.CharField("Тип проверки ответа", choices=AnswerType.choices, default=AnswerType.AUTO)
+    answer_variants = models.TextField("Другие верные ответы", blank=True, help_text="По одному в строке")
+    answer_tolerance = models.FloatField(
+        "Допустимая погрешность", blank=True, null=True, help_text="Для числовых ответов"
+    )
+    answer_matcher = models.TextField("Правило проверки", blank=True, editable=False)
     topic = models.ForeignKey("Topic", on_delete=models.CASCADE, verbose_name="Тема", related_name="tasks")
     difficulty_level = models.CharField("Уровень сложности", choices=Difficulty_Level.choices)
     tip = models.TextField("Подсказка", blank=True, null=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    excerpt = models.CharField("Краткое условие", max_length=255, blank=True, editable=False)
+    description_size = models.PositiveIntegerField("Размер условия, байт", default=0, editable=False)
+
+    ANSWER_FIELDS = ('answer', 'answer_type', 'answer_variants', 'answer_tolerance', 'answer_matcher')
+
+    def save(self, *args, **kwargs):
+        self.prepare_description()
+        self.prepare_answer()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'description' in update_fields:
+                update_fields |= {'excerpt', 'description_size'}
+            if update_fields & set(self.ANSWER_FIELDS):
+                update_fields.add('answer_matcher')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        if self.answer_type == AnswerType.REGEX:
+            error = answers.validate_regex(self.answer, self.answer_variants)
+            if error:
+                raise ValidationError({'answer': f"Некорректное регулярное выражение {error}"})
+
+    def prepare_description(self, image_storage=None):
+        """
+        Выносит встроенные изображения условия в файлы, заполняет краткое
+        условие и размер HTML; нужно вызывать перед bulk_create/bulk_update
+        """
+        self.description = extract_inline_images(self.description, image_storage)
+        self.excerpt = make_excerpt(self.description)
+        self.description_size = len((self.description or '').encode())
+
+    def prepare_answer(self):
+        """Сохраняет правило проверки ответа; нужно вызывать перед bulk_create/bulk_update"""
+        self.answer_matcher = answers.build_answer_spec(
+            self.answer, self.answer_type, self.answer_variants, self.answer_tolerance
+        )
 
     def is_solved(self, user):
-        return user.solved_tasks.filter(id=self.id).exists()
+        from .services.bitmaps import bitmap_contains, get_solved_bitmap
+
+        return bitmap_contains(get_solved_bitmap(user), self.id)
+
+    @staticmethod
+    def get_solved_ids(user, tasks):
+        """Возвращает множество id решённых пользователем задач из tasks (по карте решённых задач)"""
+        from .services.bitmaps import bitmap_contains, get_solved_bitmap
+
+        tasks = list(tasks)
+        if not tasks:
+            return set()
+        bitmap = get_solved_bitmap(user)
+        return {task.id for task in tasks if bitmap_contains(bitmap, task.id)}
     
     def check_answer(self, answer):
-        return self.answer.strip().lower() == answer.strip().lower()
+        """Проверяет ответ по сохранённому правилу (скомпилированное правило кешируется в памяти)"""
+        spec = self.answer_matcher
+        if not spec:
+            spec = answers.build_answer_spec(
+                self.answer, self.answer_type, self.answer_variants, self.answer_tolerance
+            )
+        return answers.get_matcher(spec)(answer)
     
     def __str__(self) -> str:
         return self.name
@@ -32,6 +116,7 @@ class Task(models.Model):
 
 class Subject(models.Model):
     name = models.CharField("Название", max_length=30)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     def get_tasks(self):
         return Task.objects.filter(topic__subject=self)
@@ -47,6 +132,7 @@ class Subject(models.Model):
 class Topic(models.Model):
     name = models.CharField("Название", max_length=30)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, verbose_name="Предмет", related_name="topics")
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     def __str__(self) -> str:
         return self.name
@@ -54,3 +140,41 @@ class Topic(models.Model):
     class Meta:
         verbose_name = "Тема"
         verbose_name_plural = "Темы"
+
+
+class TaskSearchDocument(models.Model):
+    """Плоский текст задачи для полнотекстового поиска (GIN-индекс в PostgreSQL)"""
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, primary_key=True, related_name="search_document")
+    name = models.TextField("Название")
+    body = models.TextField("Текст условия", blank=True)
+    catalog = models.TextField("Тема и предмет", blank=True)
+
+    class Meta:
+        verbose_name = "Поисковый документ задачи"
+        verbose_name_plural = "Поисковые документы задач"
+
+
+class TaskSearchToken(models.Model):
+    """Токены задачи для поиска на СУБД без полнотекстового индекса (SQLite)"""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField("Токен", max_length=64)
+    weight = models.PositiveSmallIntegerField("Вес")
+
+    class Meta:
+        indexes = [models.Index(fields=['token', 'task'])]
+        verbose_name = "Поисковый токен задачи"
+        verbose_name_plural = "Поисковые токены задач"
+
+
+class CatalogVersion(models.Model):
+    """Счётчик версии данных каталога; по нему процессы сбрасывают свои кеши"""
+    name = models.CharField("Название", max_length=50, unique=True)
+    version = models.PositiveBigIntegerField("Версия", default=0)
+    updated_at = models.DateTimeField("Дата изменения", default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.version}"
+
+    class Meta:
+        verbose_name = "Версия каталога"
+        verbose_name_plural = "Версии каталога"
@@ -0,0 +1,68 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class SerializerOrderingCursorPagination(CursorPagination):
+    """Курсорная пагинация по полям `ordering` сериализатора с добором по id"""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(getattr(view.get_serializer_class(), "ordering", None) or [])
+        if "id" not in ordering and "-id" not in ordering:
+            ordering.append("id")
+        return tuple(ordering)
+
+
+class CatalogPagination(PageNumberPagination):
+    """
+    Пагинация списков каталога
+
+    По умолчанию работает как PageNumberPagination. С параметром
+    `pagination=cursor` (или с переданным `cursor`) переключается на курсорный
+    режим: без COUNT(*) и OFFSET, с непрозрачными ссылками next/previous.
+
+    Результаты поиска (`q`, `name`) упорядочены по релевантности, которой нет
+    в ключе курсора, поэтому они всегда листаются по номеру страницы.
+    """
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_pagination_class = SerializerOrderingCursorPagination
+    page_only_query_params = ("q", "name")
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        if any(request.query_params.get(param) for param in self.page_only_query_params):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "cursor — курсорная пагинация без подсчёта общего количества (кроме поиска по q)",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+            {
+                "name": self.cursor_pagination_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(self.cursor_pagination_class.cursor_query_description),
+                "schema": {"type": "string"},
+            },
+        ]
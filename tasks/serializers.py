@@ -15,13 +15,25 @@ class TaskSerializer(serializers.ModelSerializer):
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['is_solved'] = instance.is_solved(self.context['request'].user)
+        solved_ids = self.context.get('solved_ids')
+        if solved_ids is not None:
+            representation['is_solved'] = instance.id in solved_ids
+        else:
+            representation['is_solved'] = instance.is_solved(self.context['request'].user)
         return representation
     
     def check_answer(self, answer):
         return self.instance.check_answer(answer)
 
 
+class TaskListSerializer(TaskSerializer):
+    """Задача в списке: краткое условие вместо полного HTML"""
+
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'excerpt', 'description_size', 'difficulty_level', 'is_solved', 'topic', "subject"]
+
+
 class CheckAnswerSerializer(serializers.Serializer):
     answer = serializers.CharField(required=True)
 
@@ -29,6 +41,30 @@ class CheckAnswerSerializer(serializers.Serializer):
         return task.check_answer(answer)
 
 
+class AnswerItemSerializer(serializers.Serializer):
+    task_id = serializers.IntegerField(min_value=1)
+    answer = serializers.CharField(allow_blank=True, trim_whitespace=False)
+
+
+class BatchAnswerSerializer(serializers.Serializer):
+    MAX_ANSWERS = 100
+
+    answers = serializers.ListField(child=AnswerItemSerializer(), min_length=1, max_length=MAX_ANSWERS)
+
+
+class AnswerResultSerializer(serializers.Serializer):
+    task_id = serializers.IntegerField()
+    is_correct = serializers.BooleanField()
+    error = serializers.CharField(required=False)
+
+
+class SolvedDeltaSerializer(serializers.Serializer):
+    task_ids = serializers.ListField(child=serializers.IntegerField())
+    cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+    reset = serializers.BooleanField()
+
+
 class TopicSerializer(serializers.ModelSerializer):
     ordering = ["name"]
 
@@ -66,4 +102,21 @@ class SubjectStatisticSerializer(serializers.ModelSerializer):
             return round(obj.percentage, 2)
         if obj.tasks_total > 0:
             return round((obj.tasks_solved / obj.tasks_total) * 100, 2)
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+
+class CatalogDifficultySerializer(serializers.Serializer):
+    Easy = serializers.IntegerField()
+    Medium = serializers.IntegerField()
+    Hard = serializers.IntegerField()
+
+
+class CatalogTopicSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    tasks_total = serializers.IntegerField()
+    difficulty = CatalogDifficultySerializer()
+
+
+class CatalogSubjectSerializer(CatalogTopicSerializer):
+    topics = CatalogTopicSerializer(many=True)
@@ -0,0 +1,37 @@
+from .catalog import (
+    CatalogCache,
+    get_catalog_stamp,
+    bump_catalog_version,
+    get_catalog_tree,
+    get_subject_task_counts,
+)
+from .search import index_tasks, rebuild_search_index, search_tasks
+from .images import extract_task_images
+from .importing import TaskCsvImporter, TaskCsvSync, import_tasks_csv, sync_tasks_csv
+from .bitmaps import count_solved_by_subject, get_solved_bitmap, get_subject_statistics
+from .solves import mark_removed_solves, record_solve, record_solves, solved_tasks_delta, touch_solved_tasks
+
+
+__all__ = [
+    'CatalogCache',
+    'get_catalog_stamp',
+    'bump_catalog_version',
+    'get_catalog_tree',
+    'get_subject_task_counts',
+    'index_tasks',
+    'rebuild_search_index',
+    'search_tasks',
+    'extract_task_images',
+    'TaskCsvImporter',
+    'TaskCsvSync',
+    'import_tasks_csv',
+    'sync_tasks_csv',
+    'record_solve',
+    'record_solves',
+    'solved_tasks_delta',
+    'touch_solved_tasks',
+    'mark_removed_solves',
+    'get_solved_bitmap',
+    'count_solved_by_subject',
+    'get_subject_statistics',
+]
@@ -0,0 +1,141 @@
+"""
+Битовые карты решённых задач
+
+Бит с номером task_id установлен, если задача решена. Карта пользователя
+хранится как bytes (проверка одной задачи — O(1)), карты предметов — как int,
+чтобы считать решённые задачи предмета пересечением (a & b).bit_count().
+
+Карты пользователей кешируются в процессе с вытеснением LRU. Запись
+действительна, пока не изменилась отметка User.solved_tasks_updated_at,
+которую ставит любое добавление или удаление решения, поэтому воркеры не
+видят чужих устаревших данных, а запрос к таблице решений нужен только
+после изменений.
+"""
+import threading
+from collections import OrderedDict
+
+from users.models import Solve
+from ..models import Task
+from .catalog import CatalogCache, get_catalog_stamp, get_catalog_tree
+
+SOLVED_BITMAP_CACHE_SIZE = 2048
+
+
+def make_bitmap(ids, base=b''):
+    """Карта с битами ids (и битами base)"""
+    ids = list(ids)
+    if not ids:
+        return bytes(base)
+    bitmap = bytearray(max(len(base), (max(ids) >> 3) + 1))
+    bitmap[:len(base)] = base
+    for value in ids:
+        bitmap[value >> 3] |= 1 << (value & 7)
+    return bytes(bitmap)
+
+
+def bitmap_contains(bitmap, value):
+    index = value >> 3
+    return index < len(bitmap) and bool(bitmap[index] >> (value & 7) & 1)
+
+
+def bitmap_to_int(bitmap):
+    return int.from_bytes(bitmap, 'little')
+
+
+class SolvedBitmapCache:
+    """LRU-кеш карт решённых задач: user_id → (отметка решений, карта)"""
+
+    def __init__(self, maxsize=SOLVED_BITMAP_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user):
+        stamp = user.solved_tasks_updated_at
+        with self._lock:
+            entry = self._entries.get(user.pk)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(user.pk)
+                return entry[1]
+        bitmap = make_bitmap(Solve.objects.filter(user_id=user.pk).values_list('task_id', flat=True))
+        self._store(user.pk, stamp, bitmap)
+        return bitmap
+
+    def add(self, user_id, task_ids, old_stamp, new_stamp):
+        """Дописывает новые решения в карту, если она соответствует old_stamp"""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+        if entry is not None and entry[0] == old_stamp:
+            self._store(user_id, new_stamp, make_bitmap(task_ids, entry[1]))
+
+    def _store(self, user_id, stamp, bitmap):
+        with self._lock:
+            self._entries[user_id] = (stamp, bitmap)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+solved_bitmaps = SolvedBitmapCache()
+
+
+def build_subject_bitmaps():
+    ids = {}
+    for subject_id, task_id in Task.objects.values_list('topic__subject_id', 'id').order_by().iterator():
+        ids.setdefault(subject_id, []).append(task_id)
+    return {subject_id: bitmap_to_int(make_bitmap(task_ids)) for subject_id, task_ids in ids.items()}
+
+
+subject_bitmaps = CatalogCache(build_subject_bitmaps)
+
+
+def get_solved_bitmap(user):
+    """Карта решённых пользователем задач (bytes)"""
+    return solved_bitmaps.get(user)
+
+
+def count_solved_by_subject(user, stamp=None):
+    """
+    Количество решённых задач по предметам: {subject_id: count}
+
+    Args:
+        stamp: Уже прочитанная отметка каталога (см. CatalogCache.get)
+    """
+    solved = bitmap_to_int(get_solved_bitmap(user))
+    return {
+        subject_id: (solved & tasks).bit_count()
+        for subject_id, tasks in subject_bitmaps.get(stamp).items()
+    }
+
+
+def get_subject_statistics(user, stamp=None):
+    """
+    Решённые задачи пользователя по предметам в порядке каталога
+
+    Без запросов к БД, кроме проверки отметки каталога (если stamp не передана)
+    и построения карты пользователя после изменения его решений.
+
+    Returns:
+        list: Словари name, tasks_solved, tasks_total, percentage
+    """
+    if stamp is None:
+        stamp = get_catalog_stamp()
+    solved_counts = count_solved_by_subject(user, stamp)
+    statistics = []
+    for subject in get_catalog_tree(stamp):
+        tasks_solved = solved_counts.get(subject['id'], 0)
+        tasks_total = subject['tasks_total']
+        statistics.append({
+            'name': subject['name'],
+            'tasks_solved': tasks_solved,
+            'tasks_total': tasks_total,
+            'percentage': round(tasks_solved / tasks_total * 100, 2) if tasks_total > 0 else 0.0,
+        })
+    return statistics
@@ -0,0 +1,129 @@
+import threading
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from ..models import CatalogVersion, Difficulty_Level, Subject, Task, Topic
+
+CATALOG_VERSION_NAME = 'catalog'
+
+
+def get_catalog_stamp():
+    """
+    Версия каталога и время её изменения: (version, updated_at или None)
+
+    Ключ для кешей каталога: один счётчик может повториться (например, после
+    отката транзакции), а вместе со временем изменения — нет.
+    """
+    stamp = (
+        CatalogVersion.objects.filter(name=CATALOG_VERSION_NAME)
+        .values_list('version', 'updated_at')
+        .first()
+    )
+    return stamp or (0, None)
+
+
+def bump_catalog_version():
+    """Увеличивает версию каталога; вызывается при любом изменении предметов, тем и задач"""
+    now = timezone.now()
+    versions = CatalogVersion.objects.filter(name=CATALOG_VERSION_NAME)
+    if versions.update(version=F('version') + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            CatalogVersion.objects.create(name=CATALOG_VERSION_NAME, version=1, updated_at=now)
+    except IntegrityError:
+        versions.update(version=F('version') + 1, updated_at=now)
+
+
+class CatalogCache:
+    """
+    Значение, вычисляемое из каталога один раз на процесс
+
+    При каждом обращении сверяет отметку каталога в БД (один запрос по
+    уникальному индексу) и пересобирает значение, только если она изменилась.
+    Так каждый воркер обновляется лениво без внешнего кеша.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._value = None
+
+    def get(self, stamp=None):
+        if stamp is None:
+            stamp = get_catalog_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._value = self._build()
+                    self._stamp = stamp
+        return self._value
+
+    def clear(self):
+        with self._lock:
+            self._stamp = None
+            self._value = None
+
+
+def _empty_difficulty_counts():
+    return {level: 0 for level in Difficulty_Level.values}
+
+
+def build_catalog_tree():
+    """Дерево Предмет → Тема с количеством задач по темам и уровням сложности"""
+    totals = {}
+    counts = {}
+    for topic_id, level, total in (
+        Task.objects.values_list('topic_id', 'difficulty_level')
+        .annotate(total=Count('id'))
+        .order_by()
+    ):
+        totals[topic_id] = totals.get(topic_id, 0) + total
+        difficulty = counts.setdefault(topic_id, _empty_difficulty_counts())
+        if level in difficulty:
+            difficulty[level] = total
+
+    topics_by_subject = {}
+    for topic in Topic.objects.order_by('name', 'id'):
+        topics_by_subject.setdefault(topic.subject_id, []).append({
+            'id': topic.id,
+            'name': topic.name,
+            'tasks_total': totals.get(topic.id, 0),
+            'difficulty': counts.get(topic.id, _empty_difficulty_counts()),
+        })
+
+    tree = []
+    for subject in Subject.objects.order_by('name', 'id'):
+        topics = topics_by_subject.get(subject.id, [])
+        difficulty = _empty_difficulty_counts()
+        for topic in topics:
+            for level, total in topic['difficulty'].items():
+                difficulty[level] += total
+        tree.append({
+            'id': subject.id,
+            'name': subject.name,
+            'tasks_total': sum(topic['tasks_total'] for topic in topics),
+            'difficulty': difficulty,
+            'topics': topics,
+        })
+    return tree
+
+
+catalog_tree = CatalogCache(build_catalog_tree)
+
+subject_task_counts = CatalogCache(
+    lambda: {subject['id']: subject['tasks_total'] for subject in catalog_tree.get()}
+)
+
+
+def get_catalog_tree(stamp=None):
+    """Дерево каталога; stamp — уже прочитанная отметка каталога, чтобы не запрашивать её повторно"""
+    return catalog_tree.get(stamp)
+
+
+def get_subject_task_counts(stamp=None):
+    """Количество задач по предметам: {subject_id: count}"""
+    return subject_task_counts.get(stamp)
@@ -0,0 +1,42 @@
+from django.utils import timezone
+
+from ..models import Task
+from .catalog import bump_catalog_version
+
+
+def extract_task_images(batch_size=500):
+    """
+    Выносит встроенные изображения из условий уже сохранённых задач
+
+    Задачи обрабатываются пачками по id, в память загружаются только задачи
+    с data:-изображениями.
+
+    Returns:
+        int: Количество изменённых задач
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        tasks = list(
+            Task.objects.filter(id__gt=last_id, description__contains='data:image/')
+            .only('id', 'description')
+            .order_by('id')[:batch_size]
+        )
+        if not tasks:
+            break
+        last_id = tasks[-1].id
+
+        changed = []
+        now = timezone.now()
+        for task in tasks:
+            original = task.description
+            task.prepare_description()
+            if task.description != original:
+                task.updated_at = now
+                changed.append(task)
+        Task.objects.bulk_update(changed, ['description', 'excerpt', 'description_size', 'updated_at'])
+        updated += len(changed)
+
+    if updated:
+        bump_catalog_version()
+    return updated
@@ -0,0 +1,294 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import InMemoryStorage, default_storage
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Difficulty_Level, Subject, Task, Topic
+from .catalog import bump_catalog_version
+from .search import index_tasks
+
+TASK_CSV_COLUMNS = ['name', 'description', 'answer', 'subject', 'topic', 'difficulty_level', 'tip']
+
+# Поля, которые синхронизация сравнивает и обновляет у существующих задач
+TASK_SYNC_FIELDS = [
+    'name', 'external_id', 'description', 'excerpt', 'description_size', 'topic', 'difficulty_level', 'tip',
+    *Task.ANSWER_FIELDS,
+]
+_SYNC_ATTNAMES = [Task._meta.get_field(name).attname for name in TASK_SYNC_FIELDS]
+
+
+def _sync_value(value):
+    """Значение поля для сравнения: пустая строка и None (например, у tip) равны"""
+    return None if value == '' else value
+
+
+def _decoded_lines(lines):
+    """Декодирует строки файла из UTF-8 по одной, снимая BOM с первой"""
+    first = True
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+class TaskCsvImporter:
+    """
+    Потоковый импорт задач из CSV
+
+    Файл читается построчно, предметы и темы кешируются в словарях, задачи
+    создаются через bulk_create пачками, каждая пачка — в своей транзакции.
+    Ошибки собираются с номерами строк файла и не прерывают импорт.
+    Колонка external_id (есть в выгрузке export_tasks_csv) не читается:
+    ключи задач ведёт синхронизация (TaskCsvSync).
+
+    Attributes:
+        created: Количество созданных задач
+        errors: Пары (номер строки, сообщение)
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.image_storage = None
+        self.created = 0
+        self.errors = []
+        self._subjects = {subject.name: subject for subject in Subject.objects.all()}
+        self._topics = {(topic.subject_id, topic.name): topic for topic in Topic.objects.all()}
+
+    def run(self, lines):
+        """
+        Args:
+            lines: Итератор строк CSV (bytes или str), например загруженный файл
+
+        Returns:
+            TaskCsvImporter: self
+        """
+        reader = csv.DictReader(_decoded_lines(lines))
+        missing = [column for column in TASK_CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            self.errors.append((1, f"Нет колонок: {', '.join(missing)}"))
+            return self
+
+        batch = []
+        for row in reader:
+            try:
+                batch.append((reader.line_num, self.build_task(row)))
+            except ValidationError as error:
+                self.errors.append((reader.line_num, '; '.join(error.messages)))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+        return self
+
+    def build_task(self, row):
+        def value(column):
+            return (row.get(column) or '').strip()
+
+        subject_name, topic_name = value('subject'), value('topic')
+        if not subject_name or not topic_name:
+            raise ValidationError("Не указаны предмет или тема")
+        max_length = Topic._meta.get_field('name').max_length
+        if len(subject_name) > max_length or len(topic_name) > max_length:
+            raise ValidationError(f"Название предмета или темы длиннее {max_length} символов")
+
+        task = Task(
+            name=value('name'),
+            description=value('description'),
+            answer=value('answer'),
+            difficulty_level=value('difficulty_level') or Difficulty_Level.MEDIUM,
+            tip=value('tip') or None,
+        )
+        if value('answer_type'):
+            task.answer_type = value('answer_type')
+        task.answer_variants = (row.get('answer_variants') or '').strip()
+        if value('answer_tolerance'):
+            try:
+                task.answer_tolerance = float(value('answer_tolerance').replace(',', '.'))
+            except ValueError:
+                raise ValidationError("Некорректная погрешность ответа")
+        task.full_clean(exclude=['topic'], validate_unique=False, validate_constraints=False)
+
+        task.topic = self.get_topic(subject_name, topic_name)
+        task.prepare_description(self.image_storage)
+        task.prepare_answer()
+        return task
+
+    def get_topic(self, subject_name, topic_name):
+        subject = self._subjects.get(subject_name)
+        if subject is None:
+            subject = self._subjects[subject_name] = Subject.objects.create(name=subject_name)
+        topic = self._topics.get((subject.id, topic_name))
+        if topic is None:
+            topic = self._topics[(subject.id, topic_name)] = Topic.objects.create(name=topic_name, subject=subject)
+        return topic
+
+    def flush(self, batch):
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                tasks = Task.objects.bulk_create([task for _, task in batch])
+                index_tasks(tasks)
+        except DatabaseError as error:
+            self.errors.extend((line, f"Ошибка БД при сохранении пачки: {error}") for line, _ in batch)
+            return
+        self.created += len(tasks)
+        bump_catalog_version()
+
+
+class TaskCsvSync(TaskCsvImporter):
+    """
+    Синхронизация каталога задач с CSV по ключу
+
+    Ключ строки — колонка external_id, а без неё — предмет, тема и название.
+    Задача без external_id находится и по названию, так что ранее
+    импортированные задачи получают внешний ключ при первой синхронизации.
+    Каждая пачка строк сверяется с БД одним запросом: новые задачи создаются
+    через bulk_create, изменённые обновляются через bulk_update, совпадающие
+    не трогаются. С delete_missing после прохода удаляются задачи предметов
+    из файла, которых в файле нет (если в файле нет ошибок). С dry_run всё
+    выполняется в транзакции, которая откатывается, — остаются только итоги.
+
+    Attributes:
+        updated: Количество обновлённых задач
+        unchanged: Количество задач без изменений
+        deleted: Количество удалённых задач
+        delete_skipped: Удаление не выполнялось из-за ошибок в файле
+    """
+
+    def __init__(self, batch_size=1000, delete_missing=False, dry_run=False):
+        super().__init__(batch_size=batch_size)
+        self.delete_missing = delete_missing
+        self.dry_run = dry_run
+        if dry_run:
+            # Изображения выносятся в память: ссылки те же, а файлы не пишутся
+            self.image_storage = InMemoryStorage(base_url=default_storage.base_url)
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.delete_skipped = False
+        self._keys = set()
+        self._seen_ids = set()
+        self._subject_ids = set()
+
+    def run(self, lines):
+        with transaction.atomic():
+            super().run(lines)
+            if self.delete_missing:
+                if self.errors:
+                    self.delete_skipped = True
+                else:
+                    self.delete_missing_tasks()
+            if self.dry_run:
+                transaction.set_rollback(True)
+        return self
+
+    @staticmethod
+    def get_key(task):
+        if task.external_id:
+            return ('external_id', task.external_id)
+        return ('name', task.topic_id, task.name)
+
+    def build_task(self, row):
+        task = super().build_task(row)
+        task.external_id = (row.get('external_id') or '').strip() or None
+        max_length = Task._meta.get_field('external_id').max_length
+        if task.external_id and len(task.external_id) > max_length:
+            raise ValidationError(f"external_id длиннее {max_length} символов")
+        key = self.get_key(task)
+        if key in self._keys:
+            raise ValidationError("Повтор ключа задачи в файле")
+        self._keys.add(key)
+        self._subject_ids.add(task.topic.subject_id)
+        return task
+
+    def find_existing(self, tasks):
+        """Существующие задачи пачки: словари по external_id и по (тема, название)"""
+        external_ids = [task.external_id for task in tasks if task.external_id]
+        condition = Q(topic_id__in={task.topic_id for task in tasks}, name__in={task.name for task in tasks})
+        if external_ids:
+            condition |= Q(external_id__in=external_ids)
+        by_external_id = {}
+        by_name = {}
+        for task in Task.objects.filter(condition).only('id', *TASK_SYNC_FIELDS).order_by('id'):
+            if task.external_id:
+                by_external_id[task.external_id] = task
+            by_name.setdefault((task.topic_id, task.name), task)
+        return by_external_id, by_name
+
+    @staticmethod
+    def match(task, by_external_id, by_name):
+        if not task.external_id:
+            return by_name.get((task.topic_id, task.name))
+        current = by_external_id.get(task.external_id)
+        if current is None:
+            current = by_name.get((task.topic_id, task.name))
+            if current is not None and current.external_id:
+                return None
+        return current
+
+    def flush(self, batch):
+        if not batch:
+            return
+        by_external_id, by_name = self.find_existing([task for _, task in batch])
+        to_create, to_update = [], []
+        now = timezone.now()
+        for line, task in batch:
+            current = self.match(task, by_external_id, by_name)
+            if current is None:
+                to_create.append((line, task))
+                continue
+            if current.id in self._seen_ids:
+                self.errors.append((line, "Задача уже сопоставлена другой строке файла"))
+                continue
+            self._seen_ids.add(current.id)
+            task.external_id = task.external_id or current.external_id
+            if all(_sync_value(getattr(task, name)) == _sync_value(getattr(current, name)) for name in _SYNC_ATTNAMES):
+                self.unchanged += 1
+                continue
+            task.pk = current.pk
+            task.updated_at = now
+            to_update.append((line, task))
+
+        super().flush(to_create)
+        self._seen_ids.update(task.pk for _, task in to_create if task.pk)
+        if to_update:
+            self.update_tasks(to_update)
+
+    def update_tasks(self, batch):
+        tasks = [task for _, task in batch]
+        try:
+            with transaction.atomic():
+                Task.objects.bulk_update(tasks, [*TASK_SYNC_FIELDS, 'updated_at'])
+                index_tasks(tasks)
+        except DatabaseError as error:
+            self.errors.extend((line, f"Ошибка БД при сохранении пачки: {error}") for line, _ in batch)
+            return
+        self.updated += len(tasks)
+        bump_catalog_version()
+
+    def delete_missing_tasks(self):
+        missing_ids = [
+            task_id
+            for task_id in Task.objects.filter(topic__subject_id__in=self._subject_ids).values_list('id', flat=True)
+            if task_id not in self._seen_ids
+        ]
+        for start in range(0, len(missing_ids), self.batch_size):
+            _, deleted = Task.objects.filter(id__in=missing_ids[start:start + self.batch_size]).delete()
+            self.deleted += deleted.get(Task._meta.label, 0)
+
+
+def import_tasks_csv(lines, batch_size=1000):
+    """Импортирует задачи из CSV (см. TaskCsvImporter), возвращает импортёр с итогами"""
+    return TaskCsvImporter(batch_size=batch_size).run(lines)
+
+
+def sync_tasks_csv(lines, batch_size=1000, delete_missing=False, dry_run=False):
+    """Синхронизирует каталог задач с CSV (см. TaskCsvSync), возвращает итоги"""
+    return TaskCsvSync(batch_size=batch_size, delete_missing=delete_missing, dry_run=dry_run).run(lines)
@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from ..models import Task, TaskSearchDocument, TaskSearchToken
+from ..utils import html_to_text, normalize_text, tokenize
+
+SEARCH_CONFIG = 'russian'
+MAX_QUERY_TERMS = 8
+
+# Вес слова в ранжировании: название > тема/предмет > условие
+NAME_WEIGHT = 4
+CATALOG_WEIGHT = 2
+BODY_WEIGHT = 1
+
+
+def search_vector_sql(table=None):
+    """SQL tsvector документа; индекс в миграции построен по этому же выражению"""
+    prefix = f'"{table}".' if table else ''
+    return (
+        f"(setweight(to_tsvector('{SEARCH_CONFIG}', {prefix}\"name\"), 'A')"
+        f" || setweight(to_tsvector('{SEARCH_CONFIG}', {prefix}\"catalog\"), 'B')"
+        f" || setweight(to_tsvector('{SEARCH_CONFIG}', {prefix}\"body\"), 'C'))"
+    )
+
+
+def build_search_document(task):
+    """Поля поискового документа для задачи с загруженными topic и topic.subject"""
+    return {
+        'name': normalize_text(task.name),
+        'body': normalize_text(html_to_text(task.description)),
+        'catalog': normalize_text(f"{task.topic.name} {task.topic.subject.name}"),
+    }
+
+
+def build_search_tokens(document):
+    weights = defaultdict(int)
+    for field, weight in (('name', NAME_WEIGHT), ('catalog', CATALOG_WEIGHT), ('body', BODY_WEIGHT)):
+        for token in set(tokenize(document[field])):
+            weights[token[:64]] += weight
+    return weights
+
+
+def uses_full_text_index():
+    return connection.vendor == 'postgresql'
+
+
+def index_tasks(tasks, batch_size=1000):
+    """
+    Обновляет поисковый индекс для задач
+
+    Args:
+        tasks: Задачи или их id
+        batch_size: Сколько задач индексировать за один проход
+    """
+    task_ids = [getattr(task, 'pk', task) for task in tasks]
+    for start in range(0, len(task_ids), batch_size):
+        _index_batch(task_ids[start:start + batch_size])
+
+
+def _index_batch(task_ids):
+    tasks = (
+        Task.objects.filter(id__in=task_ids)
+        .select_related('topic__subject')
+        .only('id', 'name', 'description', 'topic__name', 'topic__subject__name')
+    )
+    documents = []
+    tokens = []
+    for task in tasks:
+        document = build_search_document(task)
+        documents.append(TaskSearchDocument(task_id=task.id, **document))
+        if not uses_full_text_index():
+            tokens.extend(
+                TaskSearchToken(task_id=task.id, token=token, weight=weight)
+                for token, weight in build_search_tokens(document).items()
+            )
+
+    with transaction.atomic():
+        TaskSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['task'],
+            update_fields=['name', 'body', 'catalog'],
+        )
+        if not uses_full_text_index():
+            TaskSearchToken.objects.filter(task_id__in=task_ids).delete()
+            TaskSearchToken.objects.bulk_create(tokens, batch_size=5000)
+
+
+def rebuild_search_index(batch_size=1000):
+    """Переиндексирует все задачи, возвращает их количество"""
+    TaskSearchDocument.objects.exclude(task__in=Task.objects.all()).delete()
+    task_ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+    index_tasks(task_ids, batch_size=batch_size)
+    return len(task_ids)
+
+
+def search_tasks(queryset, query):
+    """
+    Фильтрует задачи по поисковому запросу и упорядочивает по релевантности
+
+    Ищет по названию, тексту условия, теме и предмету. Каждое слово запроса
+    сопоставляется как префикс, должны найтись все слова.
+
+    Returns:
+        QuerySet: Задачи с аннотацией search_rank
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none()
+    if uses_full_text_index():
+        return _search_full_text(queryset, terms)
+    return _search_tokens(queryset, terms)
+
+
+def _search_full_text(queryset, terms):
+    vector = search_vector_sql(TaskSearchDocument._meta.db_table)
+    tsquery = ' & '.join(f"{term}:*" for term in terms)
+    return (
+        queryset
+        .filter(search_document__isnull=False)
+        .filter(RawSQL(
+            f"{vector} @@ to_tsquery('{SEARCH_CONFIG}', %s)", [tsquery], output_field=BooleanField()
+        ))
+        .annotate(search_rank=RawSQL(
+            f"ts_rank({vector}, to_tsquery('{SEARCH_CONFIG}', %s))", [tsquery], output_field=FloatField()
+        ))
+        .order_by('-search_rank', 'id')
+    )
+
+
+def _token_prefix(term):
+    # Диапазон вместо token__startswith: LIKE в SQLite не использует индекс по token
+    return Q(token__gte=term, token__lt=term + '\uffff')
+
+
+def _search_tokens(queryset, terms):
+    matched = Q()
+    for term in terms:
+        queryset = queryset.filter(
+            id__in=TaskSearchToken.objects.filter(_token_prefix(term)).values('task_id')
+        )
+        matched |= _token_prefix(term)
+
+    rank = (
+        TaskSearchToken.objects
+        .filter(matched, task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    return (
+        queryset
+        .annotate(search_rank=Coalesce(Subquery(rank), 0, output_field=FloatField()))
+        .order_by('-search_rank', 'id')
+    )
@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from users.authentication import invalidate_users
+from users.models import Solve, SolveSource
+from .bitmaps import solved_bitmaps
+
+User = get_user_model()
+
+
+def touch_solved_tasks(user_ids, removed=False):
+    """
+    Отмечает время изменения решённых задач пользователей одним UPDATE
+
+    Отметка входит в валидаторы ответов с is_solved и статистикой, поэтому
+    снимки пользователей в кеше аутентификации сбрасываются.
+
+    Args:
+        removed: Решения удалялись: клиенты с курсором solved_tasks_delta получат полный список
+
+    Returns:
+        datetime | None: Поставленная отметка
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return None
+    now = timezone.now()
+    stamps = {'solved_tasks_updated_at': now}
+    if removed:
+        stamps['solved_tasks_removed_at'] = now
+    User.objects.filter(pk__in=user_ids).update(**stamps)
+    invalidate_users(user_ids)
+    return now
+
+
+def mark_removed_solves(solves):
+    """
+    Отмечает удаление решений у их пользователей; вызывается до удаления
+
+    У Solve нет обработчиков удаления, поэтому каскадное удаление остаётся
+    быстрым (без загрузки строк), а отметка ставится одним UPDATE.
+
+    Args:
+        solves: QuerySet удаляемых решений
+    """
+    return touch_solved_tasks(solves.values_list('user_id', flat=True).distinct(), removed=True)
+
+
+def _insert_solves(user_id, task_ids, source):
+    meta = Solve._meta
+    quote = connection.ops.quote_name
+    user_column = meta.get_field('user').column
+    task_column = meta.get_field('task').column
+    columns = ', '.join(
+        quote(meta.get_field(name).column) for name in ('user', 'task', 'solved_at', 'source')
+    )
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(task_ids))
+    solved_at = timezone.now()
+    params = [value for task_id in task_ids for value in (user_id, task_id, solved_at, source)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(meta.db_table)} ({columns})"
+            f" VALUES {values}"
+            f" ON CONFLICT ({quote(user_column)}, {quote(task_column)}) DO NOTHING"
+            f" RETURNING {quote(task_column)}",
+            params,
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def record_solves(user, task_ids, source=SolveSource.PRACTICE):
+    """
+    Записывает решения задач пользователем одним INSERT
+
+    Вставка идемпотентна (INSERT ... ON CONFLICT DO NOTHING): уже решённые
+    задачи пропускаются. Отметка времени обновляется в той же транзакции;
+    пользователь не пересохраняется. Закешированная карта решённых задач
+    дополняется без запроса к БД.
+
+    Returns:
+        set: id задач, решённых впервые
+    """
+    task_ids = sorted(set(task_ids))
+    if not task_ids:
+        return set()
+    with transaction.atomic():
+        created = _insert_solves(user.pk, task_ids, source)
+        if created:
+            old_stamp = user.solved_tasks_updated_at
+            user.solved_tasks_updated_at = touch_solved_tasks([user.pk])
+            solved_bitmaps.add(user.pk, created, old_stamp, user.solved_tasks_updated_at)
+    return created
+
+
+def record_solve(user, task_id, source=SolveSource.PRACTICE):
+    """
+    Записывает решение одной задачи (см. record_solves)
+
+    Returns:
+        bool: True, если задача решена впервые
+    """
+    return bool(record_solves(user, [task_id], source))
+
+
+SOLVED_SYNC_LIMIT = 5000
+
+# Решения последних секунд могут ещё коммититься не в порядке solved_at,
+# поэтому курсор не заходит в это окно: такие задачи придут повторно
+SOLVED_SYNC_LAG = timedelta(seconds=10)
+
+
+def _to_micros(value):
+    return int(value.timestamp() * 1_000_000)
+
+
+def _from_micros(value):
+    return datetime.fromtimestamp(int(value) / 1_000_000, tz=dt_timezone.utc)
+
+
+def encode_solved_cursor(solved_at, solve_id, issued_at):
+    payload = json.dumps([_to_micros(solved_at), solve_id, _to_micros(issued_at)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_solved_cursor(cursor):
+    """
+    Returns:
+        tuple: (solved_at, id последнего решения, время выдачи курсора)
+
+    Raises:
+        ValueError: Курсор повреждён
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        solved_at, solve_id, issued_at = json.loads(payload)
+        return _from_micros(solved_at), int(solve_id), _from_micros(issued_at)
+    except (binascii.Error, TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("Некорректный курсор")
+
+
+def solved_tasks_delta(user, cursor=None, limit=SOLVED_SYNC_LIMIT):
+    """
+    Решённые пользователем задачи, добавленные после курсора
+
+    Решения читаются по индексу (user, solved_at) в порядке (solved_at, id),
+    так что синхронизация стоит O(изменений). Без курсора, а также если после
+    выдачи курсора у пользователя удаляли решения, возвращается полный список
+    с reset=True — клиент заменяет свой набор, а не дополняет его.
+
+    Returns:
+        dict: task_ids, cursor, has_more, reset
+    """
+    now = timezone.now()
+    issued_at = now - SOLVED_SYNC_LAG
+    position = None
+    if cursor:
+        solved_at, solve_id, cursor_issued_at = decode_solved_cursor(cursor)
+        removed_at = user.solved_tasks_removed_at
+        if removed_at is None or removed_at < cursor_issued_at:
+            position = (solved_at, solve_id)
+    reset = position is None
+
+    solves = Solve.objects.filter(user_id=user.pk)
+    if position is not None:
+        solves = solves.filter(Q(solved_at__gt=position[0]) | Q(solved_at=position[0], id__gt=position[1]))
+    rows = list(solves.order_by('solved_at', 'id').values_list('solved_at', 'id', 'task_id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if rows:
+        position = rows[-1][:2]
+    horizon = (issued_at, 0)
+    if position is None or position > horizon:
+        position = horizon
+    return {
+        'task_ids': [task_id for _, _, task_id in rows],
+        'cursor': encode_solved_cursor(*position, issued_at),
+        'has_more': has_more,
+        'reset': reset,
+    }
+
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Task, Topic, Subject
+from .services import bump_catalog_version, index_tasks, mark_removed_solves, touch_solved_tasks
+
+User = get_user_model()
+Solved = User.solved_tasks.through
+
+
+def _existing_solves(instance, reverse, pk_set):
+    if reverse:
+        solves = Solved.objects.filter(task_id=instance.pk)
+        if pk_set is not None:
+            solves = solves.filter(user_id__in=pk_set)
+    else:
+        solves = Solved.objects.filter(user_id=instance.pk)
+        if pk_set is not None:
+            solves = solves.filter(task_id__in=pk_set)
+    return list(solves.values_list('user_id', 'task_id'))
+
+
+def _touch_solved_tasks(instance, reverse, user_ids, removed=False):
+    now = touch_solved_tasks(user_ids, removed=removed)
+    if now and not reverse:
+        # Иначе последующий user.save() затрёт отметку старым значением
+        instance.solved_tasks_updated_at = now
+
+
+@receiver(m2m_changed, sender=Solved)
+def touch_changed_solves(sender, instance, action, reverse, pk_set, **kwargs):
+    """Ставит отметку изменения решённых задач при изменении User.solved_tasks"""
+    if action == 'post_add' and pk_set:
+        _touch_solved_tasks(instance, reverse, pk_set if reverse else [instance.pk])
+    elif action in ('pre_remove', 'pre_clear'):
+        instance._removed_solves = _existing_solves(instance, reverse, pk_set)
+    elif action in ('post_remove', 'post_clear'):
+        removed = getattr(instance, '_removed_solves', [])
+        _touch_solved_tasks(instance, reverse, (user_id for user_id, _ in removed), removed=True)
+        instance._removed_solves = []
+
+
+@receiver(pre_delete, sender=Task)
+def mark_task_solves_removed(sender, instance, **kwargs):
+    """Отмечает удаление решений задачи у решивших её пользователей"""
+    mark_removed_solves(Solved.objects.filter(task_id=instance.pk))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def update_catalog_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_catalog_version()
+
+
+@receiver(post_save, sender=Task)
+def update_task_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_tasks([instance])
+
+
+@receiver(post_save, sender=Topic)
+def update_topic_search_index(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        index_tasks(Task.objects.filter(topic=instance).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Subject)
+def update_subject_search_index(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        index_tasks(Task.objects.filter(topic__subject=instance).values_list('id', flat=True))
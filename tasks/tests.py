@@ -1,18 +1,40 @@
-from django.test import TestCase
+import base64
+import csv
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from .models import Task, Subject, Topic, Difficulty_Level
+from .models import (
+    Task, Subject, Topic, Difficulty_Level, AnswerType,
+    CatalogVersion, TaskSearchDocument, TaskSearchToken,
+)
+from .services import (
+    count_solved_by_subject, get_solved_bitmap, import_tasks_csv, record_solve, solved_tasks_delta, sync_tasks_csv,
+)
+from .services.bitmaps import SolvedBitmapCache, bitmap_contains, make_bitmap, solved_bitmaps
 from .serializers import (
     TaskSerializer,
     CheckAnswerSerializer,
     SubjectSerializer,
     TopicSerializer,
     TipSerializer,
+    BatchAnswerSerializer,
 )
+from .views import task_image
 
 User = get_user_model()
 
@@ -151,6 +173,72 @@ class TaskModelTest(TestCase):
         self.assertFalse(task.check_answer("43"))
         self.assertFalse(task.check_answer(""))
 
+    def make_task(self, answer, **fields):
+        return Task.objects.create(
+            name="Задача",
+            description="Условие",
+            answer=answer,
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+            **fields,
+        )
+
+    def test_check_answer_numeric_forms(self):
+        """Числовой ответ принимается в виде дроби, десятичной точки или запятой."""
+        task = self.make_task("1/2")
+        for answer in ("0.5", "0,5", "1/2", " 2/4 ", ".5"):
+            self.assertTrue(task.check_answer(answer), answer)
+        self.assertFalse(task.check_answer("0.51"))
+        self.assertFalse(task.check_answer("половина"))
+
+    def test_check_answer_huge_numbers(self):
+        """Числа с огромным порядком или слишком длинные не разбираются и сразу отклоняются."""
+        task = self.make_task("100")
+        self.assertTrue(task.check_answer("1e2"))
+        for answer in ("1e2000000", "1e-10000000", "1/1e10000000", "1" * 100, "1_0_0"):
+            self.assertFalse(task.check_answer(answer), answer)
+
+    def test_check_answer_numeric_tolerance(self):
+        """Погрешность задаётся полем answer_tolerance."""
+        task = self.make_task("3.1416", answer_tolerance=0.001)
+        self.assertTrue(task.check_answer("3,141"))
+        self.assertFalse(task.check_answer("3.14"))
+
+    def test_check_answer_text_variants(self):
+        """Текстовый ответ сравнивается без регистра, ё и лишних пробелов, с вариантами."""
+        task = self.make_task("Ёлка", answer_variants="ель\nхвойное  дерево")
+        for answer in ("елка", "ЁЛКА ", "Ель", "хвойное дерево"):
+            self.assertTrue(task.check_answer(answer), answer)
+        self.assertFalse(task.check_answer("сосна"))
+
+    def test_check_answer_regex(self):
+        """Регулярное выражение должно совпасть с ответом целиком."""
+        task = self.make_task(r"x\s*=\s*\d+", answer_type=AnswerType.REGEX)
+        self.assertTrue(task.check_answer("X = 5"))
+        self.assertFalse(task.check_answer("x = 5, y = 3"))
+
+    def test_invalid_regex_fails_validation(self):
+        """Некорректное регулярное выражение не проходит full_clean."""
+        task = Task(
+            name="Задача",
+            description="Условие",
+            answer="(",
+            answer_type=AnswerType.REGEX,
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+        )
+        with self.assertRaises(ValidationError):
+            task.full_clean()
+
+    def test_answer_matcher_is_rebuilt_on_partial_save(self):
+        """Правило проверки пересчитывается при save(update_fields=["answer"])."""
+        task = self.make_task("42")
+        task.answer = "43"
+        task.save(update_fields=["answer"])
+        task = Task.objects.get(pk=task.pk)
+        self.assertTrue(task.check_answer("43"))
+        self.assertFalse(task.check_answer("42"))
+
     def test_is_solved_false_when_not_solved(self):
         """is_solved возвращает False, если пользователь не решил задачу."""
         task = Task.objects.create(
@@ -187,6 +275,356 @@ class TaskModelTest(TestCase):
         self.topic.delete()
         self.assertFalse(Task.objects.filter(id=task_id).exists())
 
+    def test_excerpt_is_filled_on_save(self):
+        """При сохранении задачи вычисляются краткое условие и размер HTML."""
+        task = Task.objects.create(
+            name="Задача",
+            description="<p>Решите&nbsp;<b>уравнение</b></p>" + "<p>x</p>" * 300,
+            answer="1",
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+        )
+        self.assertTrue(task.excerpt.startswith("Решите уравнение x"))
+        self.assertTrue(task.excerpt.endswith("…"))
+        self.assertLessEqual(len(task.excerpt), 200)
+        self.assertEqual(task.description_size, len(task.description.encode()))
+
+        task.description = "<p>Короткое</p>"
+        task.save(update_fields=["description"])
+        task.refresh_from_db()
+        self.assertEqual(task.excerpt, "Короткое")
+
+
+class TaskInlineImagesTest(TestCase):
+    """Тесты выноса встроенных base64-изображений из условий задач."""
+
+    PNG = base64.b64encode(b"\x89PNG\r\n\x1a\nfake-image").decode()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.subject = Subject.objects.create(name="Математика")
+        self.topic = Topic.objects.create(name="Алгебра", subject=self.subject)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def make_task(self, description):
+        return Task.objects.create(
+            name="Задача",
+            description=description,
+            answer="1",
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+        )
+
+    def test_image_is_extracted_on_save(self):
+        """При сохранении data:-изображение заменяется ссылкой на файл."""
+        task = self.make_task(f'<p>Рисунок</p><img src="data:image/png;base64,{self.PNG}">')
+        self.assertNotIn("data:image", task.description)
+        self.assertIn('src="/media/task_images/', task.description)
+        self.assertEqual(task.description_size, len(task.description.encode()))
+
+    def test_identical_images_are_stored_once(self):
+        """Одинаковые картинки разных задач хранятся в одном файле."""
+        html = f'<img src="data:image/png;base64,{self.PNG}">'
+        first = self.make_task(html)
+        second = self.make_task(html + html)
+        self.assertEqual(first.description * 2, second.description)
+        files = [path for path in Path(self.media_root).rglob("*") if path.is_file()]
+        self.assertEqual(len(files), 1)
+        self.assertEqual(files[0].read_bytes(), base64.b64decode(self.PNG))
+
+    def test_invalid_base64_is_left_as_is(self):
+        """Некорректный base64 не ломает сохранение задачи."""
+        html = '<img src="data:image/png;base64,@@@">'
+        self.assertEqual(self.make_task(html).description, html)
+
+    def test_svg_is_left_inline(self):
+        """SVG не выносится в файл: с нашего домена он мог бы выполнять скрипты."""
+        html = f'<img src="data:image/svg+xml;base64,{base64.b64encode(b"<svg/>").decode()}">'
+        self.assertEqual(self.make_task(html).description, html)
+        self.assertFalse([path for path in Path(self.media_root).rglob("*") if path.is_file()])
+
+    def test_image_view(self):
+        """Файл изображения при DEBUG отдаётся с долгим кешем и запретом скриптов."""
+        task = self.make_task(f'<img src="data:image/png;base64,{self.PNG}">')
+        url = task.description.split('"')[1]
+        response = task_image(RequestFactory().get(url), url.split("/task_images/", 1)[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), base64.b64decode(self.PNG))
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("sandbox", response["Content-Security-Policy"])
+
+    def test_sync_dry_run_writes_no_files(self):
+        """Dry run синхронизации не пишет файлы, но сравнивает те же ссылки."""
+        out = StringIO()
+        csv.writer(out).writerows([
+            ["external_id", "name", "description", "answer", "subject", "topic", "difficulty_level", "tip"],
+            ["m-1", "Задача", f'<img src="data:image/png;base64,{self.PNG}">', "1", "Математика", "Алгебра", "Easy", ""],
+        ])
+        preview = sync_tasks_csv(StringIO(out.getvalue()), dry_run=True)
+        self.assertEqual(preview.created, 1)
+        self.assertFalse([path for path in Path(self.media_root).rglob("*") if path.is_file()])
+
+        sync_tasks_csv(StringIO(out.getvalue()))
+        self.assertEqual(sync_tasks_csv(StringIO(out.getvalue()), dry_run=True).unchanged, 1)
+
+    def test_command_migrates_existing_tasks(self):
+        """Команда extract_task_images обрабатывает уже сохранённые задачи."""
+        task = self.make_task("<p>Условие</p>")
+        html = f'<p>Условие</p><img src="data:image/png;base64,{self.PNG}">'
+        Task.objects.filter(pk=task.pk).update(description=html)
+
+        out = StringIO()
+        call_command("extract_task_images", "--batch-size", "1", stdout=out)
+
+        task.refresh_from_db()
+        self.assertIn("Обновлено задач: 1", out.getvalue())
+        self.assertNotIn("data:image", task.description)
+        self.assertEqual(task.description_size, len(task.description.encode()))
+
+
+class TaskCsvImportTest(TestCase):
+    """Тесты потокового импорта задач из CSV."""
+
+    HEADER = "name,description,answer,subject,topic,difficulty_level,tip\n"
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Математика")
+        self.topic = Topic.objects.create(name="Алгебра", subject=self.subject)
+
+    def import_csv(self, text, **kwargs):
+        return import_tasks_csv(StringIO(self.HEADER + text), **kwargs)
+
+    def test_import_creates_tasks_in_batches(self):
+        """Задачи создаются пачками, предметы и темы переиспользуются."""
+        rows = "".join(f"Задача {i},<p>Условие {i}</p>,{i},Математика,Алгебра,Easy,\n" for i in range(5))
+        rows += 'Новая,"<p>Много\nстрок</p>",1/2,Физика,Механика,Hard,Подсказка\n'
+        importer = self.import_csv(rows, batch_size=2)
+
+        self.assertEqual(importer.created, 6)
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(Topic.objects.filter(name="Алгебра").count(), 1)
+        task = Task.objects.get(name="Новая")
+        self.assertEqual(task.topic.subject.name, "Физика")
+        self.assertEqual(task.excerpt, "Много строк")
+        self.assertTrue(task.check_answer("0,5"))
+        self.assertTrue(TaskSearchDocument.objects.filter(task=task).exists())
+
+    def test_errors_are_reported_with_line_numbers(self):
+        """Ошибочные строки пропускаются и возвращаются с номерами строк."""
+        rows = (
+            "Задача,<p>Условие</p>,1,Математика,Алгебра,Easy,\n"
+            ",<p>Без названия</p>,1,Математика,Алгебра,Easy,\n"
+            "Задача,<p>Условие</p>,1,Математика,Алгебра,Impossible,\n"
+            "Задача,<p>Условие</p>,1,,Алгебра,Easy,\n"
+        )
+        importer = self.import_csv(rows)
+        self.assertEqual(importer.created, 1)
+        self.assertEqual([line for line, _ in importer.errors], [3, 4, 5])
+        self.assertFalse(Subject.objects.filter(name="").exists())
+
+    def test_missing_columns(self):
+        """Файл без обязательных колонок не импортируется."""
+        importer = import_tasks_csv(StringIO("name,answer\nЗадача,1\n"))
+        self.assertEqual(importer.created, 0)
+        self.assertIn("description", importer.errors[0][1])
+
+    def test_import_command(self):
+        """Команда import_tasks читает файл с BOM и печатает ошибки."""
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as csv_file:
+            csv_file.write(("\ufeff" + self.HEADER + "Задача,<p>Условие</p>,1,Математика,Алгебра,Easy,\n").encode())
+        self.addCleanup(Path(csv_file.name).unlink)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_tasks", csv_file.name, stdout=out, stderr=err)
+        self.assertIn("Создано задач: 1, ошибок: 0", out.getvalue())
+        self.assertEqual(err.getvalue(), "")
+
+
+class TaskCsvSyncTest(TestCase):
+    """Тесты синхронизации каталога задач с CSV."""
+
+    HEADER = "external_id,name,description,answer,subject,topic,difficulty_level,tip\n"
+
+    def setUp(self):
+        self.subject = Subject.objects.create(name="Математика")
+        self.algebra = Topic.objects.create(name="Алгебра", subject=self.subject)
+        self.geometry = Topic.objects.create(name="Геометрия", subject=self.subject)
+
+    def sync(self, rows, **kwargs):
+        return sync_tasks_csv(StringIO(self.HEADER + rows), **kwargs)
+
+    def test_resync_does_not_duplicate(self):
+        """Повторная синхронизация того же файла ничего не меняет."""
+        rows = (
+            "m-1,Задача 1,<p>Условие</p>,1,Математика,Алгебра,Easy,\n"
+            ",Задача 2,<p>Условие</p>,2,Математика,Геометрия,Easy,\n"
+        )
+        first = self.sync(rows)
+        self.assertEqual((first.created, first.updated, first.unchanged), (2, 0, 0))
+
+        # Предметы, темы, транзакция и один запрос сверки на пачку
+        with self.assertNumQueries(5):
+            second = self.sync(rows)
+        self.assertEqual((second.created, second.updated, second.unchanged), (0, 0, 2))
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_updates_changed_tasks(self):
+        """Задача находится по названию, получает external_id и затем обновляется по нему."""
+        user = User.objects.create_user(username="user", email="user@example.com", password="testpass123")
+        task = Task.objects.create(
+            name="Задача 1", description="<p>Старое</p>", answer="1",
+            topic=self.algebra, difficulty_level=Difficulty_Level.EASY,
+        )
+        user.solved_tasks.add(task)
+
+        importer = self.sync("m-1,Задача 1,<p>Новое условие</p>,1/2,Математика,Алгебра,Hard,\n")
+        self.assertEqual((importer.created, importer.updated), (0, 1))
+        task.refresh_from_db()
+        self.assertEqual(task.external_id, "m-1")
+        self.assertEqual(task.excerpt, "Новое условие")
+        self.assertEqual(task.difficulty_level, Difficulty_Level.HARD)
+        self.assertTrue(task.check_answer("0,5"))
+
+        importer = self.sync("m-1,Задача 2,<p>Новое условие</p>,1/2,Математика,Геометрия,Hard,\n")
+        self.assertEqual((importer.created, importer.updated), (0, 1))
+        task.refresh_from_db()
+        self.assertEqual((task.name, task.topic), ("Задача 2", self.geometry))
+        self.assertTrue(user.solved_tasks.filter(pk=task.pk).exists())
+        self.assertTrue(TaskSearchDocument.objects.filter(task=task, name="задача 2").exists())
+
+    def test_empty_tip_is_unchanged(self):
+        """Пустая подсказка в файле совпадает с пустой строкой в БД."""
+        Task.objects.create(
+            name="Задача 1", external_id="m-1", description="<p>Условие</p>", answer="1", tip="",
+            topic=self.algebra, difficulty_level=Difficulty_Level.EASY,
+        )
+        importer = self.sync("m-1,Задача 1,<p>Условие</p>,1,Математика,Алгебра,Easy,\n")
+        self.assertEqual((importer.updated, importer.unchanged), (0, 1))
+
+    def test_duplicate_keys_are_errors(self):
+        """Повтор ключа в файле — ошибка строки."""
+        importer = self.sync(
+            "m-1,Задача 1,<p>Условие</p>,1,Математика,Алгебра,Easy,\n"
+            "m-1,Задача 2,<p>Условие</p>,1,Математика,Алгебра,Easy,\n"
+        )
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(importer.errors, [(3, "Повтор ключа задачи в файле")])
+
+    def test_delete_missing_and_dry_run(self):
+        """Dry run ничего не сохраняет, delete_missing удаляет задачи предметов из файла."""
+        for name in ("Старая", "Оставшаяся"):
+            Task.objects.create(
+                name=name, description="<p>Условие</p>", answer="1",
+                topic=self.algebra, difficulty_level=Difficulty_Level.EASY,
+            )
+        physics = Topic.objects.create(name="Механика", subject=Subject.objects.create(name="Физика"))
+        other = Task.objects.create(
+            name="Другой предмет", description="<p>Условие</p>", answer="1",
+            topic=physics, difficulty_level=Difficulty_Level.EASY,
+        )
+        rows = (
+            ",Оставшаяся,<p>Условие</p>,1,Математика,Алгебра,Easy,\n"
+            ",Новая,<p>Условие</p>,1,Математика,Новая тема,Easy,\n"
+        )
+
+        preview = self.sync(rows, delete_missing=True, dry_run=True)
+        self.assertEqual((preview.created, preview.unchanged, preview.deleted), (1, 1, 1))
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertFalse(Topic.objects.filter(name="Новая тема").exists())
+
+        importer = self.sync(rows, delete_missing=True)
+        self.assertEqual((importer.created, importer.unchanged, importer.deleted), (1, 1, 1))
+        self.assertEqual(
+            set(Task.objects.values_list("name", flat=True)),
+            {"Оставшаяся", "Новая", other.name},
+        )
+
+    def test_errors_skip_deletion(self):
+        """При ошибках в файле отсутствующие задачи не удаляются."""
+        Task.objects.create(
+            name="Старая", description="<p>Условие</p>", answer="1",
+            topic=self.algebra, difficulty_level=Difficulty_Level.EASY,
+        )
+        importer = self.sync(",Новая,<p>Условие</p>,1,Математика,Алгебра,Impossible,\n", delete_missing=True)
+        self.assertTrue(importer.delete_skipped)
+        self.assertEqual(importer.deleted, 0)
+        self.assertTrue(Task.objects.filter(name="Старая").exists())
+
+    def test_sync_command_dry_run(self):
+        """Команда import_tasks --sync --dry-run печатает итоги и ничего не сохраняет."""
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as csv_file:
+            csv_file.write((self.HEADER + "m-1,Задача,<p>Условие</p>,1,Математика,Алгебра,Easy,\n").encode())
+        self.addCleanup(Path(csv_file.name).unlink)
+
+        out = StringIO()
+        call_command("import_tasks", csv_file.name, "--sync", "--dry-run", stdout=out)
+        self.assertIn("Создано: 1, обновлено: 0", out.getvalue())
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskExportTest(TestCase):
+    """Тесты потоковой выгрузки задач в CSV."""
+
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="adminpass123",
+        )
+        self.client.force_login(admin)
+        for subject_name, topic_name in (("Математика", "Алгебра"), ("Физика", "Механика")):
+            subject = Subject.objects.create(name=subject_name)
+            topic = Topic.objects.create(name=topic_name, subject=subject)
+            Task.objects.create(
+                name=f"Задача {topic_name}",
+                description="<p>Условие, с запятой</p>",
+                answer="1/2",
+                topic=topic,
+                difficulty_level=Difficulty_Level.EASY,
+            )
+
+    def export(self, params=""):
+        response = self.client.get(reverse("admin:tasks_task_export_csv") + params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_round_trips_through_import(self):
+        """Выгрузка читается импортом обратно."""
+        content = self.export()
+        self.assertEqual(len(content.splitlines()), 3)
+        Task.objects.all().delete()
+        importer = import_tasks_csv(StringIO(content))
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(importer.created, 2)
+        self.assertTrue(Task.objects.get(name="Задача Алгебра").check_answer("0.5"))
+
+    def test_plain_import_ignores_external_id(self):
+        """Обычный импорт выгрузки с external_id создаёт копии без ключей, а не падает на уникальности."""
+        Task.objects.update(external_id=None)
+        Task.objects.filter(name="Задача Алгебра").update(external_id="m-1")
+        importer = import_tasks_csv(StringIO(self.export()))
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(Task.objects.filter(external_id="m-1").count(), 1)
+
+    def test_export_uses_list_filters(self):
+        """Фильтр списка по предмету ограничивает выгрузку."""
+        physics = Subject.objects.get(name="Физика")
+        content = self.export(f"?topic__subject__id__exact={physics.id}")
+        self.assertEqual(len(content.splitlines()), 2)
+        self.assertIn("Механика", content)
+
+    def test_invalid_filter_returns_400(self):
+        """Некорректный фильтр возвращает 400."""
+        response = self.client.get(reverse("admin:tasks_task_export_csv") + "?updated_at__gte=вчера")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 # --- Сериализаторы ---
 
@@ -424,6 +862,245 @@ class TasksViewAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data["results"]), 1)
 
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        """Число запросов на страницу не растёт с количеством задач."""
+        self.client.force_authenticate(user=self.user)
+        self.user.solved_tasks.add(self.task)
+        url = reverse("tasks")
+
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        for i in range(15):
+            task = Task.objects.create(
+                name=f"Задача {i}",
+                description="Условие",
+                answer="1",
+                topic=self.topic,
+                difficulty_level=Difficulty_Level.MEDIUM,
+            )
+            if i % 2:
+                self.user.solved_tasks.add(task)
+
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 16)
+        self.assertEqual(
+            sum(item["is_solved"] for item in response.data["results"]), 8
+        )
+        self.assertEqual(len(large_page), len(small_page))
+
+    def test_list_returns_excerpt_instead_of_description(self):
+        """Список по умолчанию отдаёт краткое условие и не читает полный HTML."""
+        self.task.description = "<p>" + "очень длинное условие " * 100 + "</p>"
+        self.task.save()
+        self.client.force_authenticate(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("tasks"))
+        item = response.data["results"][0]
+        self.assertNotIn("description", item)
+        self.assertTrue(item["excerpt"].startswith("очень длинное условие"))
+        self.assertLessEqual(len(item["excerpt"]), 200)
+        self.assertEqual(item["description_size"], len(self.task.description.encode()))
+        self.assertFalse(any('"description"' in query["sql"] for query in queries))
+
+    def test_list_full_returns_description(self):
+        """С параметром full=1 список отдаёт полное условие."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("tasks") + "?full=1")
+        self.assertEqual(response.data["results"][0]["description"], "Условие")
+
+
+class TasksViewIdsTest(TestCase):
+    """Тесты получения задач по списку id (параметр ids)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        subject = Subject.objects.create(name="Математика")
+        topic = Topic.objects.create(name="Алгебра", subject=subject)
+        self.tasks = [
+            Task.objects.create(
+                name=f"Задача {i}",
+                description=f"<p>Условие {i}</p>",
+                answer=str(i),
+                topic=topic,
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(4)
+        ]
+        self.user.solved_tasks.add(self.tasks[1])
+        self.client.force_authenticate(user=self.user)
+
+    def get_ids(self, ids):
+        return self.client.get(reverse("tasks"), {"ids": ids})
+
+    def test_returns_tasks_in_requested_order(self):
+        """Задачи возвращаются полными, в порядке ids, с is_solved."""
+        ids = [self.tasks[2].id, self.tasks[0].id, self.tasks[1].id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_ids(",".join(map(str, ids)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], ids)
+        self.assertEqual([item["is_solved"] for item in response.data], [False, False, True])
+        self.assertEqual(response.data[0]["description"], "<p>Условие 2</p>")
+        task_queries = [query for query in queries if 'FROM "tasks_task"' in query["sql"]]
+        self.assertEqual(len(task_queries), 1)
+
+    def test_missing_and_duplicate_ids_are_skipped(self):
+        """Несуществующие и повторные id пропускаются."""
+        response = self.get_ids(f"{self.tasks[3].id},99999,{self.tasks[3].id}")
+        self.assertEqual([item["id"] for item in response.data], [self.tasks[3].id])
+
+    def test_invalid_ids_return_400(self):
+        """Нечисловые id и слишком длинный список возвращают 400."""
+        self.assertEqual(self.get_ids("1,abc").status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = ",".join(str(i) for i in range(1, 102))
+        self.assertEqual(self.get_ids(too_many).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskSearchTest(TestCase):
+    """Тесты поиска задач (параметр q)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.subject = Subject.objects.create(name="Физика")
+        self.topic = Topic.objects.create(name="Механика", subject=self.subject)
+        self.by_name = Task.objects.create(
+            name="Скорость поезда",
+            description="<p>Найдите время</p>",
+            answer="1",
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+        )
+        self.by_body = Task.objects.create(
+            name="Движение",
+            description="<p>Поезд&nbsp;едет со <b>скоростью</b> 60 км/ч</p>",
+            answer="2",
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.MEDIUM,
+        )
+        self.other = Task.objects.create(
+            name="Сила тока",
+            description="<p>Цепь</p>",
+            answer="3",
+            topic=Topic.objects.create(name="Электричество", subject=self.subject),
+            difficulty_level=Difficulty_Level.EASY,
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse("tasks"), {"q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_search_ranks_name_above_description(self):
+        """Совпадение в названии ранжируется выше совпадения в условии."""
+        self.assertEqual(self.search("скорость поезд"), [self.by_name.id, self.by_body.id])
+
+    def test_search_by_topic_name(self):
+        """Поиск находит задачи по названию темы."""
+        self.assertEqual(self.search("электричество"), [self.other.id])
+
+    def test_search_requires_all_terms(self):
+        """В результат попадают только задачи со всеми словами запроса."""
+        self.assertEqual(self.search("поезд цепь"), [])
+
+    def test_search_index_follows_task_update(self):
+        """Индекс обновляется при сохранении задачи."""
+        self.other.description = "<p>Ток в проводнике</p>"
+        self.other.save()
+        self.assertEqual(self.search("проводник"), [self.other.id])
+        self.assertEqual(self.search("цепь"), [])
+
+    def test_search_index_follows_topic_rename(self):
+        """Переименование темы переиндексирует её задачи."""
+        self.topic.name = "Кинематика"
+        self.topic.save()
+        self.assertEqual(len(self.search("кинематика")), 2)
+
+    def test_search_ignores_cursor_mode(self):
+        """Результаты поиска листаются по страницам в порядке релевантности и с курсорным режимом."""
+        response = self.client.get(reverse("tasks"), {"q": "скорость поезд", "pagination": "cursor"})
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.by_name.id, self.by_body.id])
+
+    def test_rebuild_search_index_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        TaskSearchToken.objects.all().delete()
+        TaskSearchDocument.objects.all().delete()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.search("сила"), [self.other.id])
+
+
+class TasksViewCursorPaginationTest(TestCase):
+    """Тесты курсорного режима пагинации списка задач."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        subject = Subject.objects.create(name="Математика")
+        topic = Topic.objects.create(name="Алгебра", subject=subject)
+        Task.objects.bulk_create(
+            Task(
+                name=f"Задача {i}",
+                description="Условие",
+                answer="1",
+                topic=topic,
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(25)
+        )
+
+    def test_page_number_is_default(self):
+        """Без параметров используется пагинация по номеру страницы."""
+        response = self.client.get(reverse("tasks"))
+        self.assertEqual(response.data["count"], 25)
+
+    def test_cursor_mode_walks_all_tasks_without_count(self):
+        """Курсорный режим отдаёт все задачи по порядку id и не считает COUNT."""
+        response = self.client.get(reverse("tasks") + "?pagination=cursor")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+
+        ids = [item["id"] for item in response.data["results"]]
+        next_url = response.data["next"]
+        self.assertIsNotNone(next_url)
+        response = self.client.get(next_url)
+        ids += [item["id"] for item in response.data["results"]]
+
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+        self.assertEqual(ids, sorted(Task.objects.values_list("id", flat=True)))
+
+    def test_cursor_mode_for_subjects(self):
+        """Курсорный режим доступен и для списка предметов."""
+        Subject.objects.create(name="Физика")
+        response = self.client.get(reverse("subjects") + "?pagination=cursor")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            [item["name"] for item in response.data["results"]],
+            ["Математика", "Физика"],
+        )
+
 
 class TaskViewAPITest(TestCase):
     """Тесты для API одной задачи и проверки ответа (TaskView)."""
@@ -496,6 +1173,31 @@ class TaskViewAPITest(TestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.solved_tasks.filter(id=self.task.id).exists())
 
+    def test_post_correct_answer_twice_counts_once(self):
+        """Повторный верный ответ не создаёт второе решение и не меняет статистику."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("task", kwargs={"pk": self.task.id})
+        self.client.post(url, {"answer": "42"}, format="json")
+        response = self.client.post(url, {"answer": "42"}, format="json")
+        self.assertTrue(response.data["is_correct"])
+        self.assertEqual(User.solved_tasks.through.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(count_solved_by_subject(User.objects.get(pk=self.user.pk))[self.subject.id], 1)
+
+    def test_post_correct_answer_does_not_resave_user(self):
+        """Запись решения не пересохраняет пользователя целиком."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("task", kwargs={"pk": self.task.id})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"answer": "42"}, format="json")
+        user_updates = [
+            query["sql"] for query in queries
+            if query["sql"].startswith('UPDATE "users_user"')
+        ]
+        self.assertEqual(len(user_updates), 1)
+        self.assertNotIn('"password"', user_updates[0])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.solved_tasks_updated_at)
+
     def test_post_check_answer_incorrect(self):
         """Проверка неверного ответа возвращает is_correct: false."""
         self.client.force_authenticate(user=self.user)
@@ -525,6 +1227,394 @@ class TaskViewAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class BatchAnswerViewAPITest(TestCase):
+    """Тесты пакетной проверки ответов (BatchAnswerView)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.subject = Subject.objects.create(name="Математика")
+        self.topic = Topic.objects.create(name="Алгебра", subject=self.subject)
+        self.tasks = [
+            Task.objects.create(
+                name=f"Задача {i}",
+                description="Условие",
+                answer=str(i),
+                topic=self.topic,
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(5)
+        ]
+        self.url = reverse("answers_batch")
+        self.client.force_authenticate(user=self.user)
+
+    def test_requires_authentication(self):
+        """Пакетная проверка требует авторизации."""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {"answers": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_results_in_request_order(self):
+        """Результаты возвращаются по каждому ответу в порядке запроса."""
+        answers = [
+            {"task_id": self.tasks[0].id, "answer": "0"},
+            {"task_id": self.tasks[1].id, "answer": "неверно"},
+            {"task_id": 99999, "answer": "1"},
+            {"task_id": self.tasks[2].id, "answer": "2,0"},
+        ]
+        response = self.client.post(self.url, {"answers": answers}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([item["task_id"] for item in results], [item["task_id"] for item in answers])
+        self.assertEqual([item["is_correct"] for item in results], [True, False, False, True])
+        self.assertIn("error", results[2])
+        self.assertEqual(
+            set(self.user.solved_tasks.values_list("id", flat=True)),
+            {self.tasks[0].id, self.tasks[2].id},
+        )
+        self.assertEqual(count_solved_by_subject(User.objects.get(pk=self.user.pk))[self.subject.id], 2)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        """Число запросов не растёт с количеством ответов в пакете."""
+        def submit(tasks):
+            answers = [{"task_id": task.id, "answer": task.answer} for task in tasks]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, {"answers": answers}, format="json")
+            return len(queries)
+
+        submit(self.tasks[:1])
+        self.assertEqual(submit(self.tasks[1:2]), submit(self.tasks[2:]))
+
+    def test_already_solved_tasks_are_not_counted_twice(self):
+        """Повторная отправка верных ответов не меняет статистику."""
+        answers = [{"task_id": task.id, "answer": task.answer} for task in self.tasks]
+        self.client.post(self.url, {"answers": answers}, format="json")
+        response = self.client.post(self.url, {"answers": answers}, format="json")
+        self.assertTrue(all(item["is_correct"] for item in response.data["results"]))
+        self.assertEqual(count_solved_by_subject(User.objects.get(pk=self.user.pk))[self.subject.id], 5)
+
+    def test_batch_size_is_limited(self):
+        """Слишком большой или пустой пакет отклоняется."""
+        answers = [{"task_id": 1, "answer": "1"}] * (BatchAnswerSerializer.MAX_ANSWERS + 1)
+        response = self.client.post(self.url, {"answers": answers}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {"answers": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SolvedBitmapTest(TestCase):
+    """Тесты кеша битовых карт решённых задач."""
+
+    def setUp(self):
+        solved_bitmaps.clear()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.subjects = [Subject.objects.create(name=name) for name in ("Математика", "Физика")]
+        self.tasks = [
+            Task.objects.create(
+                name=f"Задача {i}",
+                description="Условие",
+                answer=str(i),
+                topic=Topic.objects.get_or_create(name="Тема", subject=self.subjects[i % 2])[0],
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(6)
+        ]
+
+    def test_make_bitmap(self):
+        """Карта хранит ровно переданные id."""
+        bitmap = make_bitmap([1, 9, 200], base=make_bitmap([3]))
+        self.assertEqual([value for value in range(300) if bitmap_contains(bitmap, value)], [1, 3, 9, 200])
+        self.assertFalse(bitmap_contains(b"", 5))
+
+    def test_cached_until_solves_change(self):
+        """Карта читается из БД один раз и перестраивается после изменения решений."""
+        self.user.solved_tasks.add(self.tasks[0])
+        with self.assertNumQueries(1):
+            get_solved_bitmap(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.tasks[0].is_solved(self.user))
+            self.assertFalse(self.tasks[1].is_solved(self.user))
+
+        self.user.solved_tasks.remove(self.tasks[0])
+        self.assertFalse(self.tasks[0].is_solved(self.user))
+
+    def test_record_solve_updates_cached_bitmap(self):
+        """Новое решение дописывается в закешированную карту без чтения таблицы решений."""
+        get_solved_bitmap(self.user)
+        record_solve(self.user, self.tasks[2].id)
+        with self.assertNumQueries(0):
+            self.assertEqual(Task.get_solved_ids(self.user, self.tasks), {self.tasks[2].id})
+
+    def test_counts_by_subject(self):
+        """Решённые задачи считаются по предметам пересечением карт."""
+        for task in self.tasks[:3]:
+            record_solve(self.user, task.id)
+        self.assertEqual(
+            count_solved_by_subject(self.user),
+            {self.subjects[0].id: 2, self.subjects[1].id: 1},
+        )
+
+    def test_lru_eviction(self):
+        """Кеш хранит не больше maxsize пользователей."""
+        cache = SolvedBitmapCache(maxsize=2)
+        users = [self.user] + [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="testpass123")
+            for i in range(2)
+        ]
+        for user in users:
+            cache.get(user)
+        self.assertEqual(len(cache), 2)
+        with self.assertNumQueries(1):
+            cache.get(self.user)
+
+
+class SolvedTasksViewAPITest(TestCase):
+    """Тесты синхронизации решённых задач по курсору (SolvedTasksView)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        topic = Topic.objects.create(name="Алгебра", subject=Subject.objects.create(name="Математика"))
+        self.tasks = [
+            Task.objects.create(
+                name=f"Задача {i}",
+                description="Условие",
+                answer=str(i),
+                topic=topic,
+                difficulty_level=Difficulty_Level.EASY,
+            )
+            for i in range(5)
+        ]
+        self.url = reverse("solved")
+        self.client.force_authenticate(user=self.user)
+
+    def solve(self, task, minutes_ago=60):
+        solved_at = timezone.now() - timedelta(minutes=minutes_ago)
+        self.user.solved_tasks.add(task, through_defaults={"solved_at": solved_at})
+
+    def sync(self, cursor=None):
+        response = self.client.get(self.url, {"since": cursor} if cursor else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_requires_authentication(self):
+        """Синхронизация требует авторизации."""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_returns_only_new_solves(self):
+        """Без курсора — все решения, с курсором — только новые."""
+        self.solve(self.tasks[0], minutes_ago=90)
+        self.solve(self.tasks[1])
+        first = self.sync()
+        self.assertEqual(first["task_ids"], [self.tasks[0].id, self.tasks[1].id])
+        self.assertTrue(first["reset"])
+        self.assertFalse(first["has_more"])
+
+        self.solve(self.tasks[2], minutes_ago=30)
+        with self.assertNumQueries(1):
+            second = self.sync(first["cursor"])
+        self.assertEqual(second["task_ids"], [self.tasks[2].id])
+        self.assertFalse(second["reset"])
+
+        self.assertEqual(self.sync(second["cursor"])["task_ids"], [])
+
+    def test_recent_solves_are_repeated(self):
+        """Решения последних секунд приходят повторно, пока не выйдут из окна."""
+        self.solve(self.tasks[0], minutes_ago=0)
+        first = self.sync()
+        self.assertEqual(self.sync(first["cursor"])["task_ids"], [self.tasks[0].id])
+
+    def test_removed_solve_resets(self):
+        """После удаления решения клиент получает полный список заново."""
+        for task in self.tasks[:3]:
+            self.solve(task)
+        cursor = self.sync()["cursor"]
+        self.user.solved_tasks.remove(self.tasks[1])
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+
+        data = self.sync(cursor)
+        self.assertTrue(data["reset"])
+        self.assertEqual(data["task_ids"], [self.tasks[0].id, self.tasks[2].id])
+
+    def test_deleted_task_resets(self):
+        """Удаление решённой задачи сбрасывает курсор решивших её пользователей."""
+        for task in self.tasks[:2]:
+            self.solve(task)
+        cursor = self.sync()["cursor"]
+        self.tasks[0].delete()
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+
+        data = self.sync(cursor)
+        self.assertTrue(data["reset"])
+        self.assertEqual(data["task_ids"], [self.tasks[1].id])
+
+    def test_task_delete_does_not_load_solves(self):
+        """Решения удаляемой задачи удаляются без загрузки строк, отметка ставится одним UPDATE."""
+        users = User.objects.bulk_create(
+            User(username=f"user{i}", email=f"user{i}@example.com", password="x") for i in range(20)
+        )
+        User.solved_tasks.through.objects.bulk_create(
+            User.solved_tasks.through(user=user, task=self.tasks[0]) for user in users
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.tasks[0].delete()
+        stamps = [query for query in queries if query["sql"].startswith("UPDATE") and "solved_tasks_removed_at" in query["sql"]]
+        self.assertEqual(len(stamps), 1)
+        self.assertEqual(User.objects.filter(solved_tasks_removed_at__isnull=False).count(), 20)
+        self.assertFalse(User.solved_tasks.through.objects.filter(task_id=self.tasks[0].id).exists())
+
+    def test_pages_with_limit(self):
+        """Большой список отдаётся порциями с has_more."""
+        for minutes_ago, task in enumerate(reversed(self.tasks), 10):
+            self.solve(task, minutes_ago=minutes_ago)
+        pages = [solved_tasks_delta(self.user, limit=2)]
+        while pages[-1]["has_more"]:
+            pages.append(solved_tasks_delta(self.user, pages[-1]["cursor"], limit=2))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(
+            [task_id for page in pages for task_id in page["task_ids"]],
+            [task.id for task in self.tasks],
+        )
+
+    def test_invalid_cursor(self):
+        """Повреждённый курсор — 400."""
+        response = self.client.get(self.url, {"since": "не-курсор"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTest(TestCase):
+    """Тесты условных GET-запросов (ETag / Last-Modified)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.subject = Subject.objects.create(name="Математика")
+        self.topic = Topic.objects.create(name="Алгебра", subject=self.subject)
+        self.task = Task.objects.create(
+            name="Тестовая задача",
+            description="Условие",
+            answer="42",
+            topic=self.topic,
+            difficulty_level=Difficulty_Level.EASY,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("task", kwargs={"pk": self.task.id})
+
+    def test_task_not_modified_by_etag(self):
+        """Повторный запрос с If-None-Match возвращает 304 без тела."""
+        response = self.client.get(self.url)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_task_not_modified_by_last_modified(self):
+        """Запрос с If-Modified-Since возвращает 304, если задача не менялась."""
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_task_etag_changes_after_edit(self):
+        """После изменения задачи старый ETag не подходит."""
+        etag = self.client.get(self.url)["ETag"]
+        self.task.description = "Новое условие"
+        self.task.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["description"], "Новое условие")
+
+    def test_task_etag_changes_after_topic_rename(self):
+        """Переименование темы меняет ETag задачи."""
+        etag = self.client.get(self.url)["ETag"]
+        self.topic.name = "Геометрия"
+        self.topic.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["topic"], "Геометрия")
+
+    def test_task_etag_changes_after_solve(self):
+        """После решения задачи ответ с is_solved не отдаётся из кеша."""
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post(self.url, {"answer": "42"}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_solved"])
+
+    def test_task_etag_is_per_user(self):
+        """ETag задачи у разных пользователей различается."""
+        etag = self.client.get(self.url)["ETag"]
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_not_modified_skips_serialization(self):
+        """На 304 условие задачи не загружается из БД."""
+        etag = self.client.get(self.url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0]["sql"])
+
+    def test_missing_task_returns_404(self):
+        """Для несуществующей задачи валидаторы не мешают ответу 404."""
+        response = self.client.get(reverse("task", kwargs={"pk": 99999}), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tip_not_modified(self):
+        """Подсказка поддерживает If-None-Match."""
+        url = reverse("tip", kwargs={"pk": self.task.id})
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_subjects_and_topics_follow_catalog_version(self):
+        """Списки предметов и тем сбрасывают ETag при изменении каталога."""
+        for url in (reverse("subjects"), reverse("topics", kwargs={"subject_id": self.subject.id})):
+            etag = self.client.get(url)["ETag"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = self.client.get(reverse("subjects"))["ETag"]
+        Subject.objects.create(name="Физика")
+        response = self.client.get(reverse("subjects"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_tasks_list_etag_changes_after_solve(self):
+        """ETag списка задач учитывает решённые пользователем задачи."""
+        url = reverse("tasks")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.client.post(self.url, {"answer": "42"}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["results"][0]["is_solved"])
+
+
 class TipViewAPITest(TestCase):
     """Тесты для API подсказки (TipView)."""
 
@@ -686,6 +1776,41 @@ class SubjectStatisticsViewAPITest(TestCase):
         self.assertEqual(response.data[0]["tasks_solved"], 1)
         self.assertEqual(response.data[0]["percentage"], 50.0)
     
+    def test_statistics_after_correct_answer(self):
+        """Верный ответ через API увеличивает счётчик решённых задач предмета."""
+        task = self.subject.topics.first().tasks.first()
+        task.answer = "42"
+        task.save()
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse("task", kwargs={"pk": task.id}), {"answer": "42"}, format="json")
+        self.client.post(reverse("task", kwargs={"pk": task.id}), {"answer": "42"}, format="json")
+
+        response = self.client.get(reverse("statistic_subject"))
+        self.assertEqual(response.data[0]["tasks_total"], 2)
+        self.assertEqual(response.data[0]["tasks_solved"], 1)
+        self.assertEqual(response.data[0]["percentage"], 50.0)
+
+    def test_statistics_single_query(self):
+        """Статистика читается одной проверкой версии каталога независимо от числа предметов."""
+        for i in range(5):
+            subject = Subject.objects.create(name=f"Предмет {i}")
+            topic = Topic.objects.create(name="Тема", subject=subject)
+            Task.objects.create(name="Задача", topic=topic)
+        self.client.force_authenticate(user=self.user)
+        url = reverse("statistic_subject")
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 6)
+
+    def test_statistics_follow_removed_solves(self):
+        """Удаление решения уменьшает статистику."""
+        task = self.subject.topics.first().tasks.first()
+        self.user.solved_tasks.add(task)
+        self.user.solved_tasks.remove(task)
+        self.assertEqual(count_solved_by_subject(User.objects.get(pk=self.user.pk))[self.subject.id], 0)
+
     def test_00_if_no_tasks(self):
         Subject.objects.filter().delete()
         Topic.objects.filter().delete()
@@ -703,3 +1828,69 @@ class SubjectStatisticsViewAPITest(TestCase):
         self.assertEqual(response.data[0]["tasks_total"], 0)
         self.assertEqual(response.data[0]["tasks_solved"], 0)
         self.assertEqual(response.data[0]["percentage"], 0.0)
+
+
+class CatalogViewAPITest(TestCase):
+    """Тесты для API каталога (CatalogView)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.math = Subject.objects.create(name="Математика")
+        self.algebra = Topic.objects.create(name="Алгебра", subject=self.math)
+        self.geometry = Topic.objects.create(name="Геометрия", subject=self.math)
+        Subject.objects.create(name="Физика")
+        for level in (Difficulty_Level.EASY, Difficulty_Level.EASY, Difficulty_Level.HARD):
+            Task.objects.create(name="Задача", answer="1", topic=self.algebra, difficulty_level=level)
+
+    def test_catalog_requires_authentication(self):
+        """Каталог доступен только авторизованным."""
+        response = self.client.get(reverse("catalog"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_catalog_tree(self):
+        """Каталог содержит предметы, темы и количество задач по уровням сложности."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("catalog"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([subject["name"] for subject in response.data], ["Математика", "Физика"])
+
+        math = response.data[0]
+        self.assertEqual(math["tasks_total"], 3)
+        self.assertEqual(math["difficulty"], {"Easy": 2, "Medium": 0, "Hard": 1})
+        self.assertEqual([topic["name"] for topic in math["topics"]], ["Алгебра", "Геометрия"])
+        self.assertEqual(math["topics"][0]["tasks_total"], 3)
+        self.assertEqual(math["topics"][1]["tasks_total"], 0)
+        self.assertEqual(response.data[1]["topics"], [])
+
+    def test_catalog_is_cached_until_catalog_changes(self):
+        """Повторный запрос читает только версию каталога; изменение задач сбрасывает кеш."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("catalog")
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        Task.objects.create(name="Новая", answer="1", topic=self.geometry, difficulty_level=Difficulty_Level.MEDIUM)
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]["tasks_total"], 4)
+        self.assertEqual(response.data[0]["topics"][1]["difficulty"]["Medium"], 1)
+
+    def test_cache_survives_repeated_version_counter(self):
+        """Кеш каталога не путает повторившийся счётчик версии (например, после отката) с прежним каталогом."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("catalog")
+        self.client.get(url)
+
+        version = CatalogVersion.objects.get()
+        Subject.objects.filter(name="Физика").delete()
+        CatalogVersion.objects.filter(pk=version.pk).update(
+            version=version.version, updated_at=version.updated_at + timedelta(seconds=1)
+        )
+        response = self.client.get(url)
+        self.assertEqual([subject["name"] for subject in response.data], ["Математика"])
@@ -6,7 +6,10 @@ urlpatterns = [
     path("tasks/", views.TasksView.as_view(), name="tasks"),
     path("tasks/<int:pk>/", views.TaskView.as_view(), name="task"),
     path("tasks/<int:pk>/tip/", views.TipView.as_view(), name="tip"),
+    path("answers/batch/", views.BatchAnswerView.as_view(), name="answers_batch"),
+    path("solved/", views.SolvedTasksView.as_view(), name="solved"),
     path("subjects/", views.SubjectsView.as_view(), name="subjects"),
     path("subjects/<int:subject_id>/topics/", views.TopicsView.as_view(), name="topics"),
     path("statistic-subject/", views.SubjectStatisticView.as_view(), name="statistic_subject"),
+    path("catalog/", views.CatalogView.as_view(), name="catalog"),
 ]
\ No newline at end of file
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import hashlib
+import re
+from html import unescape
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+_SKIPPED_BLOCKS_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]*>')
+_WORD_RE = re.compile(r'\w+')
+
+EXCERPT_LENGTH = 200
+
+TASK_IMAGES_DIR = 'task_images'
+_DATA_IMAGE_RE = re.compile(
+    r'''(?P<quote>["'])data:image/(?P<type>png|jpe?g|gif|webp);base64,(?P<data>[A-Za-z0-9+/=\s]+)(?P=quote)''',
+    re.IGNORECASE,
+)
+_IMAGE_EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'jpg': 'jpg', 'gif': 'gif', 'webp': 'webp'}
+
+
+def html_to_text(html):
+    """Превращает HTML условия задачи (TinyMCE) в плоский текст с одиночными пробелами"""
+    if not html:
+        return ''
+    text = _SKIPPED_BLOCKS_RE.sub(' ', html)
+    text = _TAG_RE.sub(' ', text)
+    return ' '.join(unescape(text).split())
+
+
+def make_excerpt(html, length=EXCERPT_LENGTH):
+    """Плоский текст условия, обрезанный по границе слова до length символов"""
+    text = html_to_text(html)
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' .,;:') + '…'
+
+
+def normalize_text(text):
+    """Приводит текст к нижнему регистру и заменяет ё на е (не зависит от локали СУБД)"""
+    return (text or '').lower().replace('ё', 'е')
+
+
+def tokenize(text):
+    """Разбивает текст на нормализованные слова для поискового индекса"""
+    return _WORD_RE.findall(normalize_text(text))
+
+
+def has_inline_images(html):
+    return bool(html) and 'data:image/' in html
+
+
+def extract_inline_images(html, storage=None):
+    """
+    Выносит встроенные data:-изображения из HTML в файлы хранилища (MEDIA_ROOT)
+
+    Имя файла — sha256 содержимого, поэтому одинаковые картинки разных задач
+    хранятся один раз. Некорректный base64 остаётся в HTML как есть, SVG тоже:
+    отдельным файлом с нашего домена он мог бы выполнять скрипты.
+
+    Args:
+        storage: Хранилище файлов (по умолчанию default_storage)
+
+    Returns:
+        str: HTML со ссылками на файлы вместо data:-URI
+    """
+    if not has_inline_images(html):
+        return html
+    storage = storage or default_storage
+
+    def replace(match):
+        try:
+            content = base64.b64decode(''.join(match['data'].split()), validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+        digest = hashlib.sha256(content).hexdigest()
+        name = f"{TASK_IMAGES_DIR}/{digest[:2]}/{digest}.{_IMAGE_EXTENSIONS[match['type'].lower()]}"
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        return f"{match['quote']}{storage.url(name)}{match['quote']}"
+
+    return _DATA_IMAGE_RE.sub(replace, html)
@@ -1,31 +1,72 @@
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.db.models import Count, Q, F, ExpressionWrapper, FloatField
 from django.db.models.functions import Cast
+from django.views.static import serve
 
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.serializers import BooleanField
 from rest_framework.views import APIView, Response
-from rest_framework.pagination import PageNumberPagination
 
 from .models import Task, Subject, Topic
+from .utils import TASK_IMAGES_DIR
 from .serializers import (
-    TaskSerializer, CheckAnswerSerializer,
+    TaskSerializer, TaskListSerializer, CheckAnswerSerializer,
+    BatchAnswerSerializer, AnswerResultSerializer, SolvedDeltaSerializer,
     SubjectSerializer, TopicSerializer,
-    TipSerializer, SubjectStatisticSerializer
+    TipSerializer, SubjectStatisticSerializer,
+    CatalogSubjectSerializer
 )
+from .pagination import CatalogPagination
+from .services import (
+    get_catalog_stamp, get_catalog_tree, get_subject_statistics,
+    record_solve, record_solves, search_tasks, solved_tasks_delta,
+)
+from pentolymp.conditional import ConditionalGetMixin, latest, make_etag
 
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResponse, OpenApiParameter, OpenApiTypes, OpenApiExample
 
 
+class CatalogConditionalMixin(ConditionalGetMixin):
+    """
+    Валидаторы по версии каталога и строке запроса
+
+    Если ответ содержит is_solved или статистику пользователя (per_user),
+    в валидаторы входит время изменения его решённых задач.
+    """
+    per_user = False
+    catalog_stamp = None
+
+    def get_validators(self, request, *args, **kwargs):
+        self.catalog_stamp = get_catalog_stamp()
+        updated_at = self.catalog_stamp[1]
+        if not self.per_user:
+            return make_etag(*self.catalog_stamp, request.get_full_path()), updated_at
+        solved_at = request.user.solved_tasks_updated_at
+        return (
+            make_etag(*self.catalog_stamp, request.get_full_path(), request.user.pk, solved_at),
+            latest(updated_at, solved_at),
+        )
+
+
 @extend_schema_view(
     get=extend_schema(
         summary="Получение списка задач",
         description="Получение списка задач с возможностью фильтрации по имени и уровню сложности",
         parameters=[
+            OpenApiParameter(
+                name='q',
+                location=OpenApiParameter.QUERY,
+                description='поиск по названию, условию, теме и предмету; результаты упорядочены по релевантности',
+                required=False,
+                type=OpenApiTypes.STR
+            ),
             OpenApiParameter(
                 name='name',
                 location=OpenApiParameter.QUERY,
-                description='фильтр задач по имени',
+                description='фильтр задач по имени (устарел, работает как q)',
                 required=False,
                 type=OpenApiTypes.STR
             ),
@@ -44,6 +85,23 @@ from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResp
                 required=False,
                 type=OpenApiTypes.INT
             ),
+            OpenApiParameter(
+                name='ids',
+                location=OpenApiParameter.QUERY,
+                description=(
+                    'id задач через запятую (не больше 100): задачи с полным условием '
+                    'в порядке перечисления, без пагинации'
+                ),
+                required=False,
+                type=OpenApiTypes.STR
+            ),
+            OpenApiParameter(
+                name='full',
+                location=OpenApiParameter.QUERY,
+                description='1 — вернуть полное условие (description) вместо краткого (excerpt)',
+                required=False,
+                type=OpenApiTypes.BOOL
+            ),
             OpenApiParameter(
                 name="topic_id",
                 location=OpenApiParameter.QUERY,
@@ -60,22 +118,48 @@ from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResp
             )
         ],
         responses={
-            200: TaskSerializer(many=True),
+            200: TaskListSerializer(many=True),
             400: OpenApiResponse(description="Validation error")
         },
         tags=["Tasks"]
     ),
 )
-class TasksView(generics.ListAPIView):
+class TasksView(CatalogConditionalMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Task.objects.all()
-    serializer_class = TaskSerializer
-    pagination_class = PageNumberPagination
+    queryset = Task.objects.select_related('topic__subject')
+    serializer_class = TaskListSerializer
+    pagination_class = CatalogPagination
+    per_user = True
+    max_ids = 100
+
+    def get_requested_ids(self):
+        """id из параметра ids в порядке перечисления без повторов или None"""
+        raw = self.request.query_params.get('ids')
+        if raw is None:
+            return None
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+        except ValueError:
+            raise ValidationError({'ids': 'Ожидаются целые числа через запятую'})
+        if not ids or len(ids) > self.max_ids:
+            raise ValidationError({'ids': f'Нужно от 1 до {self.max_ids} id'})
+        return ids
+
+    def is_full(self):
+        return (
+            self.request.query_params.get('full') in ('1', 'true')
+            or self.request.query_params.get('ids') is not None
+        )
+
+    def get_serializer_class(self):
+        return TaskSerializer if self.is_full() else TaskListSerializer
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if not self.is_full():
+            queryset = queryset.defer('description')
         
-        name = self.request.query_params.get('name')
+        search_query = self.request.query_params.get('q') or self.request.query_params.get('name')
         difficulty_level = self.request.query_params.get('difficulty_level')
         topic_id = self.request.query_params.get('topic_id')
         subject_id = self.request.query_params.get('subject_id')
@@ -88,24 +172,42 @@ class TasksView(generics.ListAPIView):
             topic = get_object_or_404(Topic, pk=topic_id)
             queryset = queryset.filter(topic=topic)
 
-        if name:
-            queryset = queryset.filter(name__icontains=name)
-        
         if difficulty_level:
             queryset = queryset.filter(difficulty_level=difficulty_level)
 
+        ids = self.get_requested_ids()
+        if ids is not None:
+            return queryset.filter(id__in=ids)
+
+        if search_query:
+            return search_tasks(queryset, search_query)
+
         ordering = getattr(self.get_serializer_class(), "ordering", None)
         return queryset.order_by(*ordering) if ordering else queryset
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        ids = self.get_requested_ids()
+        if ids is not None:
+            tasks = queryset.in_bulk(ids)
+            tasks = [tasks[task_id] for task_id in ids if task_id in tasks]
+            serializer = self.get_serializer(tasks, many=True, context=self.get_solved_context(tasks))
+            return Response(serializer.data)
+
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True, context={'request': request})
+            serializer = self.get_serializer(page, many=True, context=self.get_solved_context(page))
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True, context={'request': request})
+        tasks = list(queryset)
+        serializer = self.get_serializer(tasks, many=True, context=self.get_solved_context(tasks))
         return Response(serializer.data)
 
+    def get_solved_context(self, tasks):
+        return {
+            'request': self.request,
+            'solved_ids': Task.get_solved_ids(self.request.user, tasks),
+        }
+
 
 @extend_schema_view(
     get=extend_schema(
@@ -136,23 +238,33 @@ class TasksView(generics.ListAPIView):
         tags=["Tasks"]
     )
 )
-class TaskView(APIView):
+class TaskView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TaskSerializer
 
+    def get_validators(self, request, pk):
+        stamps = (
+            Task.objects.filter(pk=pk)
+            .values_list('updated_at', 'topic__updated_at', 'topic__subject__updated_at')
+            .first()
+        )
+        if stamps is None:
+            raise Http404
+        solved_at = request.user.solved_tasks_updated_at
+        return make_etag('task', pk, *stamps, request.user.pk, solved_at), latest(*stamps, solved_at)
+
     def get(self, request, pk):
-        task = get_object_or_404(Task, pk=pk)
+        task = get_object_or_404(Task.objects.select_related('topic__subject'), pk=pk)
         serializer = self.serializer_class(task, context={'request': request})
         return Response(serializer.data)
     
     def post(self, request, pk):
-        task = get_object_or_404(Task, pk=pk)
+        task = get_object_or_404(Task.objects.only('id', *Task.ANSWER_FIELDS), pk=pk)
         serializer = CheckAnswerSerializer(data=request.data)
         if serializer.is_valid():
             is_correct = serializer.check(task, request.data['answer'])
             if is_correct:
-                request.user.solved_tasks.add(task)
-                request.user.save()
+                record_solve(request.user, task.id)
             return Response({
                 "is_correct": is_correct
             })
@@ -160,6 +272,93 @@ class TaskView(APIView):
             return Response(serializer.errors, status=400)
 
 
+@extend_schema_view(
+    post=extend_schema(
+        summary="Проверка нескольких ответов",
+        description=(
+            "Проверка до 100 ответов одним запросом. Верно решённые задачи "
+            "засчитываются, результаты возвращаются в порядке запроса"
+        ),
+        request=BatchAnswerSerializer(),
+        responses={
+            200: OpenApiResponse(
+                Response({"results": AnswerResultSerializer(many=True)}), examples=[
+                    OpenApiExample(name="Успешно", value={
+                        "results": [
+                            {"task_id": 1, "is_correct": True},
+                            {"task_id": 999, "is_correct": False, "error": "Задача не найдена"}
+                        ]
+                    })
+                ]
+            ),
+            400: OpenApiResponse(description="Validation error")
+        },
+        tags=["Tasks"]
+    )
+)
+class BatchAnswerView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BatchAnswerSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        items = serializer.validated_data['answers']
+        tasks = Task.objects.only('id', *Task.ANSWER_FIELDS).in_bulk({item['task_id'] for item in items})
+        results = []
+        solved_ids = []
+        for item in items:
+            task = tasks.get(item['task_id'])
+            if task is None:
+                results.append({"task_id": item['task_id'], "is_correct": False, "error": "Задача не найдена"})
+                continue
+            is_correct = task.check_answer(item['answer'])
+            if is_correct:
+                solved_ids.append(task.id)
+            results.append({"task_id": task.id, "is_correct": is_correct})
+
+        record_solves(request.user, solved_ids)
+        return Response({"results": results})
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Изменения решённых задач",
+        description=(
+            "id задач, решённых после курсора, и новый курсор. Без курсора (или если "
+            "решения удалялись) возвращается полный список с reset=true: клиент "
+            "заменяет свой набор. При has_more=true нужно запросить следующую "
+            "порцию с полученным курсором. Задачи последних секунд могут прийти повторно"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                location=OpenApiParameter.QUERY,
+                description='курсор из предыдущего ответа',
+                required=False,
+                type=OpenApiTypes.STR
+            ),
+        ],
+        responses={
+            200: SolvedDeltaSerializer,
+            400: OpenApiResponse(description="Некорректный курсор")
+        },
+        tags=["Tasks"]
+    )
+)
+class SolvedTasksView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            delta = solved_tasks_delta(request.user, request.query_params.get('since'))
+        except ValueError as error:
+            raise ValidationError({'since': str(error)})
+        return Response(SolvedDeltaSerializer(delta).data)
+
+
 @extend_schema_view(
     get=extend_schema(
         summary="Получение подсказки",
@@ -171,10 +370,16 @@ class TaskView(APIView):
         tags=["Tasks"]
     )
 )
-class TipView(APIView):
+class TipView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TipSerializer
 
+    def get_validators(self, request, pk):
+        updated_at = Task.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404
+        return make_etag('tip', pk, updated_at), updated_at
+
     def get(self, request, pk):
         task = get_object_or_404(Task, pk=pk)
         serializer = self.serializer_class(task, context={'request': request})
@@ -192,10 +397,10 @@ class TipView(APIView):
         tags=["Tasks"]
     )
 )
-class SubjectsView(generics.ListAPIView):
+class SubjectsView(CatalogConditionalMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = SubjectSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CatalogPagination
 
     def get_queryset(self):
         qs = Subject.objects.all()
@@ -224,10 +429,10 @@ class SubjectsView(generics.ListAPIView):
         tags=["Tasks"]
     )
 )
-class TopicsView(generics.ListAPIView):
+class TopicsView(CatalogConditionalMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TopicSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CatalogPagination
 
     def get_queryset(self):
         qs = Topic.objects.filter(subject=self.kwargs["subject_id"])
@@ -255,27 +460,46 @@ class TopicsView(generics.ListAPIView):
         tags=["Tasks"]
     )
 )
-class SubjectStatisticView(APIView):
+class SubjectStatisticView(CatalogConditionalMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    per_user = True
 
     def get(self, request):
-        user = request.user
-        subjects = Subject.objects.all().order_by('name')
-        subjects_with_stats = []
-        for subject in subjects:
-            all_tasks = subject.get_tasks()
-            solved_tasks = all_tasks.filter(user=user)
-            subject.tasks_total = all_tasks.count()
-            subject.tasks_solved = solved_tasks.count()
-            subject.percentage = (
-                round((subject.tasks_solved / subject.tasks_total * 100), 2)
-                if subject.tasks_total > 0 else 0.0
-            )
-            subjects_with_stats.append(subject)
-        
         serializer = SubjectStatisticSerializer(
-            subjects_with_stats, 
+            get_subject_statistics(request.user, self.catalog_stamp),
             many=True,
             context={'request': request}
         )
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Получение каталога",
+        description="Дерево предметов и тем с количеством задач по темам и уровням сложности",
+        responses={
+            200: CatalogSubjectSerializer(many=True),
+        },
+        tags=["Tasks"]
+    )
+)
+class CatalogView(CatalogConditionalMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_catalog_tree(self.catalog_stamp))
+
+
+def task_image(request, path):
+    """
+    Файл изображения из условия задачи (см. extract_inline_images) при DEBUG
+
+    В продакшене эти файлы отдаёт веб-сервер с теми же заголовками (см. README).
+    Имена файлов — хеши содержимого, поэтому ответ кешируется надолго; CSP
+    с sandbox не даёт файлу выполнять скрипты.
+    """
+    response = serve(request, f"{TASK_IMAGES_DIR}/{path}", document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Content-Security-Policy'] = "default-src 'none'; sandbox"
+    return response
@@ -1,6 +1,12 @@
 from django.contrib import admin
+from django.shortcuts import render, redirect
+from django.urls import path
+from django.contrib import messages
 
-from .models import User, Rating
+from tasks.services import mark_removed_solves
+from .forms import UserCsvImportForm
+from .models import User, Rating, Solve
+from .services import provision_users_csv
 
 
 class RatingInline(admin.StackedInline):
@@ -14,6 +20,8 @@ class UserView(admin.ModelAdmin):
     list_filter = ('is_staff', 'is_active', 'date_joined')
     search_fields = ('username', 'email')
     inlines = [RatingInline]
+    change_list_template = 'admin/users_user_change_list.html'
+    import_errors_shown = 20
     
     def get_rating_score(self, obj):
         try:
@@ -26,6 +34,80 @@ class UserView(admin.ModelAdmin):
         if not obj:
             return []
         return super().get_inline_instances(request, obj)
+    
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv), name='users_user_import_csv'),
+        ]
+        return custom_urls + urls
+    
+    def import_csv(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:users_user_changelist')
+        if request.method == 'POST':
+            form = UserCsvImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                csv_file = request.FILES['csv_file']
+                if not csv_file.name.endswith('.csv'):
+                    messages.error(request, 'Файл должен быть в формате CSV')
+                    return redirect(request.path)
+                
+                try:
+                    provisioner = provision_users_csv(csv_file)
+                    messages.success(
+                        request,
+                        f'Создано пользователей: {provisioner.created}, уже существуют: {provisioner.skipped}'
+                    )
+                    if provisioner.errors:
+                        shown = '; '.join(
+                            f'строка {line}: {message}'
+                            for line, message in provisioner.errors[:self.import_errors_shown]
+                        )
+                        more = len(provisioner.errors) - self.import_errors_shown
+                        if more > 0:
+                            shown += f' и ещё {more}'
+                        messages.warning(
+                            request, f'Не удалось создать {len(provisioner.errors)} пользователей: {shown}'
+                        )
+                except Exception as e:
+                    messages.error(request, f'Ошибка при обработке файла: {str(e)}')
+                
+                return redirect('admin:users_user_changelist')
+        else:
+            form = UserCsvImportForm()
+        
+        context = {
+            'form': form,
+            'opts': self.model._meta,
+            'title': 'Импорт пользователей из CSV',
+        }
+        return render(request, 'admin/users_user_import.html', context)
+
+
+admin.site.register(User, UserView)
+
+
+@admin.register(Solve)
+class SolveAdmin(admin.ModelAdmin):
+    list_display = ('user', 'task', 'source', 'solved_at')
+    list_filter = ('source', 'solved_at')
+    search_fields = ('user__username', 'task__name')
+    raw_id_fields = ('user', 'task')
+    list_select_related = ('user', 'task')
+
+    # Решения появляются только через проверку ответов (record_solves), которая
+    # ставит отметку solved_tasks_updated_at; здесь их можно только удалять
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
+    def delete_model(self, request, obj):
+        mark_removed_solves(Solve.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
 
-admin.site.register(User, UserView)
\ No newline at end of file
+    def delete_queryset(self, request, queryset):
+        mark_removed_solves(queryset)
+        super().delete_queryset(request, queryset)
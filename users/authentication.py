@@ -0,0 +1,202 @@
+"""
+Кеш аутентифицированных пользователей
+
+JWTAuthentication и JWTAuthMiddleware загружают пользователя на каждый запрос
+(и отдельным запросом — его рейтинг). Здесь снимок пользователя с рейтингом
+хранится в процессе по ключу (user_id, jti) с коротким TTL и вытеснением LRU;
+на каждый запрос из снимка собирается новый экземпляр User, поэтому запросы
+не делят изменяемое состояние.
+
+Сохранения User и Rating (и изменения решённых задач) после фиксации транзакции
+сбрасывают снимки пользователя в процессе и меняют метку поколения в общем кеше Django (Redis),
+который проверяется при каждом обращении к снимку, поэтому остальные воркеры
+видят сброс (в том числе is_active) со следующего запроса. С CACHE_LOCAL это
+верно только для одного процесса.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Rating, User
+
+USER_CACHE_SIZE = 4096
+USER_CACHE_TTL = 30
+
+_USER_FIELDS = [field.attname for field in User._meta.concrete_fields]
+_RATING_FIELDS = [field.attname for field in Rating._meta.concrete_fields]
+
+
+def _generation_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def _snapshot(user):
+    try:
+        rating = user.rating
+    except Rating.DoesNotExist:
+        rating = None
+    return (
+        tuple(getattr(user, name) for name in _USER_FIELDS),
+        rating and tuple(getattr(rating, name) for name in _RATING_FIELDS),
+    )
+
+
+def _restore(snapshot):
+    user_values, rating_values = snapshot
+    user = User.from_db(DEFAULT_DB_ALIAS, _USER_FIELDS, user_values)
+    rating = None
+    if rating_values is not None:
+        rating = Rating.from_db(DEFAULT_DB_ALIAS, _RATING_FIELDS, rating_values)
+        Rating.user.field.set_cached_value(rating, user)
+    User.rating.related.set_cached_value(user, rating)
+    return user
+
+
+class UserSnapshotCache:
+    """LRU-кеш снимков пользователей: (user_id, jti) → (срок, поколение, снимок)"""
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, jti):
+        """Новый экземпляр User из снимка или None, если снимка нет или он устарел"""
+        key, entry = self._lookup(user_id, jti)
+        if entry is None:
+            return None
+        return self._check(key, entry, cache.get(_generation_key(key[0])))
+
+    async def aget(self, user_id, jti):
+        """get() для асинхронного кода: метка поколения читается без блокировки цикла событий"""
+        key, entry = self._lookup(user_id, jti)
+        if entry is None:
+            return None
+        return self._check(key, entry, await cache.aget(_generation_key(key[0])))
+
+    def _lookup(self, user_id, jti):
+        key = (User._meta.pk.to_python(user_id), jti)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return key, None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return key, None
+            self._entries.move_to_end(key)
+        return key, entry
+
+    def _check(self, key, entry, generation):
+        if entry[1] != generation:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._drop(key)
+            return None
+        return _restore(entry[2])
+
+    def load(self, user_id, jti):
+        """Загружает пользователя с рейтингом из БД и запоминает снимок"""
+        user_id = User._meta.pk.to_python(user_id)
+        # Поколение читается до запроса: сброс во время загрузки не даст сохранить старые данные
+        generation = cache.get(_generation_key(user_id))
+        user = User.objects.select_related('rating').get(pk=user_id)
+        key = (user_id, jti)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, generation, _snapshot(user))
+            self._keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+        return user
+
+    def invalidate(self, user_ids):
+        """Сбрасывает снимки пользователей в этом процессе и в остальных через кеш Django"""
+        user_ids = {User._meta.pk.to_python(user_id) for user_id in user_ids}
+        if not user_ids:
+            return
+        with self._lock:
+            for user_id in user_ids:
+                for key in self._keys.pop(user_id, ()):
+                    self._entries.pop(key, None)
+        generation = uuid.uuid4().hex
+        cache.set_many({_generation_key(user_id): generation for user_id in user_ids}, self.ttl)
+
+    def _drop(self, key):
+        if self._entries.pop(key, None) is not None:
+            keys = self._keys.get(key[0])
+            keys.discard(key)
+            if not keys:
+                del self._keys[key[0]]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserSnapshotCache()
+
+
+def get_cached_user(user_id, jti):
+    """
+    Пользователь с загруженным рейтингом: из кеша или из БД
+
+    Raises:
+        User.DoesNotExist: Пользователя нет
+    """
+    return user_cache.get(user_id, jti) or user_cache.load(user_id, jti)
+
+
+def invalidate_users(user_ids):
+    """
+    Сбрасывает закешированные снимки пользователей после фиксации транзакции
+
+    До фиксации другой воркер прочитал бы ещё старую строку и закешировал её
+    с уже новым поколением на весь TTL.
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: user_cache.invalidate(user_ids))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, которая берёт пользователя из user_cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = get_cached_user(user_id, validated_token.get(api_settings.JTI_CLAIM))
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = 'users.authentication.CachedJWTAuthentication'
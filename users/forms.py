@@ -0,0 +1,11 @@
+from django import forms
+
+
+class UserCsvImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label='CSV файл',
+        help_text=(
+            'Выберите CSV файл со списком участников. Файл должен содержать колонки: username, email, password. '
+            'Пользователи с уже занятыми именем или email пропускаются'
+        )
+    )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.services import provision_users_csv
+
+
+class Command(BaseCommand):
+    help = "Регистрирует участников из CSV-файла (колонки username, email, password)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, help="Процессов для хеширования паролей (по умолчанию — число ядер)")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as csv_file:
+                provisioner = provision_users_csv(
+                    csv_file, batch_size=options['batch_size'], workers=options['workers']
+                )
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f"Не удалось прочитать файл: {error}")
+
+        for line, message in provisioner.errors:
+            self.stderr.write(f"строка {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано пользователей: {provisioner.created}, уже существуют: {provisioner.skipped}, "
+            f"ошибок: {len(provisioner.errors)}"
+        ))
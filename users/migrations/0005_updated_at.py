@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_alter_rating_options_alter_rating_matches_drawn"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rating",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="solved_tasks_updated_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Дата изменения решённых задач"
+            ),
+        ),
+    ]
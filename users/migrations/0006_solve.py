@@ -0,0 +1,147 @@
+# Generated by Django 6.0.1 on 2026-10-17 00:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+COPY_BATCH_SIZE = 5000
+
+
+def copy_solves(apps, schema_editor):
+    """
+    Переносит решения из прежней таблицы users_user_solved_tasks пачками по id
+
+    Время решений не хранилось, поэтому solved_at — дата регистрации
+    пользователя: старые решения не попадают в выборки «решено после».
+    """
+    User = apps.get_model("users", "User")
+    Solved = User.solved_tasks.through
+    Solve = apps.get_model("users", "Solve")
+    last_id = 0
+    while True:
+        rows = list(
+            Solved.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "user_id", "task_id")[:COPY_BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        joined = dict(
+            User.objects.filter(id__in={user_id for _, user_id, _ in rows}).values_list(
+                "id", "date_joined"
+            )
+        )
+        Solve.objects.bulk_create(
+            Solve(user_id=user_id, task_id=task_id, solved_at=joined[user_id])
+            for _, user_id, task_id in rows
+        )
+
+
+def copy_solves_back(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Solved = User.solved_tasks.through
+    Solve = apps.get_model("users", "Solve")
+    last_id = 0
+    while True:
+        rows = list(
+            Solve.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "user_id", "task_id")[:COPY_BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        Solved.objects.bulk_create(
+            Solved(user_id=user_id, task_id=task_id) for _, user_id, task_id in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_task_external_id"),
+        ("users", "0005_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Solve",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "solved_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Дата решения"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("practice", "Тренировка"), ("pvp", "PvP")],
+                        default="practice",
+                        max_length=20,
+                        verbose_name="Где решена",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="solves",
+                        to="tasks.task",
+                        verbose_name="Задача",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="solves",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Решение задачи",
+                "verbose_name_plural": "Решения задач",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="solve",
+            index=models.Index(
+                fields=["user", "solved_at"], name="users_solve_user_solved_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="solve",
+            constraint=models.UniqueConstraint(
+                fields=("user", "task"), name="users_solve_user_task_uniq"
+            ),
+        ),
+        migrations.RunPython(copy_solves, copy_solves_back),
+        migrations.RemoveField(
+            model_name="user",
+            name="solved_tasks",
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="solved_tasks",
+            field=models.ManyToManyField(
+                blank=True,
+                through="users.Solve",
+                to="tasks.task",
+                verbose_name="Решённые задачи",
+            ),
+        ),
+    ]
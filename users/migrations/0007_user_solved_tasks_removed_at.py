@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_solve"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="solved_tasks_removed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Дата удаления решённых задач"
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -25,21 +26,17 @@ class User(AbstractUser):
     
     solved_tasks = models.ManyToManyField(
         'tasks.Task',
+        through='Solve',
         verbose_name='Решённые задачи',
         blank=True
     )
+    solved_tasks_updated_at = models.DateTimeField('Дата изменения решённых задач', blank=True, null=True)
+    solved_tasks_removed_at = models.DateTimeField('Дата удаления решённых задач', blank=True, null=True)
     
     USERNAME_FIELD = 'username'
     
     def __str__(self):
         return self.email
-    
-    def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            Rating.objects.create(user=self)
 
 
 class Rating(models.Model):
@@ -49,6 +46,7 @@ class Rating(models.Model):
     matches_won = models.IntegerField('Побед', default=0)
     matches_lost = models.IntegerField('Поражений', default=0)
     matches_drawn = models.IntegerField('Ничьи', default=0)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
     
     def update_rating(self, opponent_rating, result, k_factor=32):
         """Обновление рейтинга по формуле Elo"""
@@ -81,4 +79,30 @@ class Rating(models.Model):
 
     class Meta:
         verbose_name = 'Рейтинг'
-        verbose_name_plural = 'Рейтинги'
\ No newline at end of file
+        verbose_name_plural = 'Рейтинги'
+
+
+class SolveSource(models.TextChoices):
+    PRACTICE = 'practice', 'Тренировка'
+    PVP = 'pvp', 'PvP'
+
+
+class Solve(models.Model):
+    """Решение задачи пользователем (промежуточная таблица User.solved_tasks)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='solves', verbose_name='Пользователь')
+    task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, related_name='solves', verbose_name='Задача')
+    solved_at = models.DateTimeField('Дата решения', default=timezone.now)
+    source = models.CharField('Где решена', max_length=20, choices=SolveSource.choices, default=SolveSource.PRACTICE)
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.task_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task'], name='users_solve_user_task_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'solved_at'], name='users_solve_user_solved_idx'),
+        ]
+        verbose_name = 'Решение задачи'
+        verbose_name_plural = 'Решения задач'
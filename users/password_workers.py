@@ -0,0 +1,30 @@
+"""
+Функции, выполняемые в процессах пула проверки паролей (users.services.hashing)
+
+Процессы запускаются через forkserver и импортируют этот модуль до настройки
+Django, поэтому он не должен импортировать модели (в отличие от пакета
+users.services); Django настраивает инициализатор процесса.
+"""
+import os
+
+
+def setup_worker(settings_module):
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+        django.setup()
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(password)
+
+
+def verify_password(password, encoded):
+    from django.contrib.auth.hashers import verify_password
+
+    return verify_password(password, encoded)
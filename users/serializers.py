@@ -1,26 +1,34 @@
 from django.contrib.auth.password_validation import validate_password
-from django.contrib.auth import authenticate
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from tasks.serializers import SubjectStatisticSerializer
 from .models import User
+from .services import PasswordPoolBusy, authenticate_user, get_rating as get_user_rating, send_login_failed
+
+
+class LoginUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Слишком много входов одновременно, повторите попытку"
+    default_code = 'login_unavailable'
+    # По нему обработчик исключений DRF ставит заголовок Retry-After
+    wait = 1
 
 
 class UserSerializer(serializers.ModelSerializer):
     rating = serializers.SerializerMethodField(method_name='get_rating')
 
     def get_rating(self, obj):
-        rating = obj.rating
-        if rating:
-            return {
-                'score': rating.score,
-                'matches_played': rating.matches_played,
-                'matches_won': rating.matches_won,
-                'matches_lost': rating.matches_lost,
-                'matches_drawn': rating.matches_drawn
-            }
-        return {}
+        rating = get_user_rating(obj)
+        return {
+            'score': rating.score,
+            'matches_played': rating.matches_played,
+            'matches_won': rating.matches_won,
+            'matches_lost': rating.matches_lost,
+            'matches_drawn': rating.matches_drawn
+        }
     
     class Meta:
         model = User
@@ -28,6 +36,15 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', "rating"]
 
 
+class ProfileSerializer(UserSerializer):
+    """Профиль с разделами expand (только для схемы ответа)"""
+    stats = SubjectStatisticSerializer(many=True, read_only=True, required=False)
+    rank = serializers.IntegerField(read_only=True, allow_null=True, required=False)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['stats', 'rank']
+
+
 class RefreshSerializer(serializers.Serializer):
     refresh = serializers.CharField()
     access = serializers.CharField(read_only=True)
@@ -78,21 +95,26 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
+        request = self.context.get('request')
         
         if email and password:
             try:
                 user = User.objects.get(email=email)
             except User.DoesNotExist:
+                send_login_failed(email, request)
                 raise serializers.ValidationError("Неверный логин или пароль!")
             
             if not user.is_active:
                 raise serializers.ValidationError("Аккаунт отключён! Обратитесь к админам:)")
 
-            auth_user = authenticate(username=user.username, password=password)
-            if not auth_user:
+            try:
+                user = authenticate_user(user, password, request)
+            except PasswordPoolBusy:
+                raise LoginUnavailable()
+            if user is None:
                 raise serializers.ValidationError("Неверный логин или пароль!")
         else:
             raise serializers.ValidationError("Must include 'email' and 'password'")
         
-        attrs['user'] = auth_user
+        attrs['user'] = user
         return attrs
\ No newline at end of file
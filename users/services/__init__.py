@@ -0,0 +1,27 @@
+from .hashing import (
+    PasswordPool, PasswordPoolBusy, authenticate_user, check_user_password, get_password_pool, hash_passwords,
+    send_login_failed,
+)
+from .provisioning import UserCsvProvisioner, provision_users_csv
+from .ratings import (
+    ensure_ratings, get_initial_rating, get_rank, get_rank_snapshot, get_rating, refresh_rank_snapshot
+)
+
+
+__all__ = [
+    'hash_passwords',
+    'PasswordPool',
+    'PasswordPoolBusy',
+    'get_password_pool',
+    'check_user_password',
+    'authenticate_user',
+    'send_login_failed',
+    'UserCsvProvisioner',
+    'provision_users_csv',
+    'get_initial_rating',
+    'get_rating',
+    'ensure_ratings',
+    'get_rank_snapshot',
+    'refresh_rank_snapshot',
+    'get_rank',
+]
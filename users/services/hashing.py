@@ -0,0 +1,216 @@
+"""
+Хеширование паролей в пуле процессов
+
+PBKDF2 считается сотни миллисекунд на пароль и держит GIL, поэтому пароли
+списка пользователей хешируются, а пароли при входе проверяются в отдельных
+процессах. Процессы запускаются через forkserver, а не fork: fork из
+многопоточного сервера (daphne, потоки apscheduler) может унаследовать чужую
+захваченную блокировку и зависнуть. Сами процессы выполняют функции из
+users.password_workers.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .. import password_workers
+
+# Меньше паролей быстрее захешировать на месте, чем запускать процессы
+MIN_POOL_PASSWORDS = 8
+
+
+def _start_pool(workers):
+    settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'pentolymp.settings')
+    return ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=password_workers.setup_worker,
+        initargs=(settings_module,),
+    )
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Хеши паролей (make_password) в исходном порядке
+
+    Args:
+        passwords: Пароли в открытом виде
+        workers: Число процессов; по умолчанию — число ядер
+    """
+    passwords = list(passwords)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < MIN_POOL_PASSWORDS:
+        return [password_workers.hash_password(password) for password in passwords]
+    workers = min(workers, len(passwords))
+    with _start_pool(workers) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(password_workers.hash_password, passwords, chunksize=chunksize))
+
+
+class PasswordPoolBusy(Exception):
+    """В пуле проверки паролей нет места или проверка не уложилась в срок"""
+
+
+class PasswordPool:
+    """
+    Ограниченный пул процессов для проверки паролей при входе
+
+    В пуле одновременно не больше max_pending проверок (выполняемых и ждущих);
+    следующая сразу получает PasswordPoolBusy, чтобы при наплыве входов сервер
+    быстро отвечал 503, а не копил очередь. Процессы запускаются при первой
+    проверке и перезапускаются после fork, падения пула и проверки, не
+    уложившейся в срок: зависший процесс иначе навсегда занял бы место в пуле.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=None):
+        self.workers = workers or settings.PASSWORD_POOL_WORKERS or os.cpu_count() or 1
+        self.max_pending = max_pending or settings.PASSWORD_POOL_QUEUE
+        self.timeout = timeout or settings.PASSWORD_POOL_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = _start_pool(self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, func, *args):
+        """Ставит func(*args) в пул; PasswordPoolBusy, если очередь заполнена"""
+        # Место возвращается в семафор, из которого взято, даже если пул уже сброшен
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BrokenProcessPool as error:
+            slots.release()
+            self.reset()
+            raise PasswordPoolBusy() from error
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def verify(self, password, encoded):
+        """
+        Проверка пароля (django.contrib.auth.hashers.verify_password) в пуле
+
+        Returns:
+            tuple: (пароль верен, хеш нужно обновить)
+
+        Raises:
+            PasswordPoolBusy: Очередь заполнена или проверка дольше self.timeout
+        """
+        future = self.submit(password_workers.verify_password, password, encoded)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError as error:
+            future.cancel()
+            self.reset(terminate=True)
+            raise PasswordPoolBusy() from error
+        except BrokenProcessPool as error:
+            self.reset()
+            raise PasswordPoolBusy() from error
+
+    def reset(self, terminate=False):
+        """
+        Останавливает пул; следующая проверка запустит новый
+
+        Args:
+            terminate: Завершить процессы, не дожидаясь текущих проверок (они
+                получат BrokenProcessPool); места в пуле выдаются заново
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if terminate:
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+        if executor is None or self._pid != os.getpid():
+            return
+        # ProcessPoolExecutor не умеет завершать процессы (terminate_workers есть только с Python 3.14)
+        processes = list((getattr(executor, '_processes', None) or {}).values()) if terminate else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+
+_password_pool = None
+_password_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    """Общий PasswordPool процесса с параметрами из настроек"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = PasswordPool()
+        return _password_pool
+
+
+def check_user_password(user, password):
+    """
+    Проверяет пароль уже загруженного пользователя в пуле процессов
+
+    Как user.check_password, но PBKDF2 считается не в потоке запроса;
+    устаревший хеш пересчитывается и сохраняется.
+
+    Raises:
+        PasswordPoolBusy: Пул перегружен
+    """
+    is_correct, must_update = get_password_pool().verify(password, user.password)
+    if is_correct and must_update:
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    return is_correct
+
+
+def send_login_failed(username, request=None):
+    """Сигнал user_login_failed с теми же (очищенными) данными, что отправляет authenticate()"""
+    from django.contrib.auth import user_login_failed
+
+    user_login_failed.send(
+        sender=__name__, credentials={'username': username, 'password': '********************'}, request=request
+    )
+
+
+def authenticate_user(user, password, request=None):
+    """
+    authenticate() для уже загруженного пользователя с проверкой пароля в пуле
+
+    Пароль проверяется один раз в пуле, затем пользователь должен пройти
+    user_can_authenticate одного из бэкендов на основе ModelBackend из
+    AUTHENTICATION_BACKENDS; его путь записывается в user.backend. Если таких
+    бэкендов нет, вызывается обычный authenticate(). При неудаче, как и
+    authenticate(), отправляет сигнал user_login_failed.
+
+    Returns:
+        User | None: Пользователь или None, если вход не удался
+
+    Raises:
+        PasswordPoolBusy: Пул перегружен
+    """
+    from django.contrib.auth import authenticate, get_backends
+    from django.contrib.auth.backends import ModelBackend
+
+    backends = [
+        (backend, path)
+        for backend, path in zip(get_backends(), settings.AUTHENTICATION_BACKENDS)
+        if isinstance(backend, ModelBackend)
+    ]
+    if not backends:
+        return authenticate(request, username=user.get_username(), password=password)
+
+    if check_user_password(user, password):
+        for backend, path in backends:
+            if backend.user_can_authenticate(user):
+                user.backend = path
+                return user
+    send_login_failed(user.get_username(), request)
+    return None
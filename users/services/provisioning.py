@@ -0,0 +1,115 @@
+import csv
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from tasks.services.importing import _decoded_lines
+from ..models import User
+from .hashing import hash_passwords
+
+USER_CSV_COLUMNS = ['username', 'email', 'password']
+
+
+class UserCsvProvisioner:
+    """
+    Массовая регистрация участников из CSV
+
+    Строки проверяются как при регистрации, пользователи с уже занятыми
+    именем или email пропускаются (проверка одним запросом на весь файл),
+    пароли хешируются в пуле процессов, пользователи создаются через
+    bulk_create пачками. Рейтинги появятся при первом матче (см. ensure_ratings).
+
+    Attributes:
+        created: Количество созданных пользователей
+        skipped: Строки с уже существующими именем или email
+        errors: Пары (номер строки, сообщение)
+    """
+
+    def __init__(self, batch_size=1000, workers=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def run(self, lines):
+        """
+        Args:
+            lines: Итератор строк CSV (bytes или str), например загруженный файл
+
+        Returns:
+            UserCsvProvisioner: self
+        """
+        reader = csv.DictReader(_decoded_lines(lines))
+        missing = [column for column in USER_CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            self.errors.append((1, f"Нет колонок: {', '.join(missing)}"))
+            return self
+
+        rows = []
+        usernames, emails = set(), set()
+        for row in reader:
+            try:
+                user, password = self.build_user(row)
+            except ValidationError as error:
+                self.errors.append((reader.line_num, '; '.join(error.messages)))
+                continue
+            if user.username in usernames or user.email in emails:
+                self.errors.append((reader.line_num, "Повтор имени пользователя или email в файле"))
+                continue
+            usernames.add(user.username)
+            emails.add(user.email)
+            rows.append((reader.line_num, user, password))
+
+        taken = set()
+        for username, email in User.objects.filter(Q(username__in=usernames) | Q(email__in=emails)).values_list(
+            'username', 'email'
+        ):
+            taken.update((('username', username), ('email', email)))
+        new_rows = [
+            (line, user, password)
+            for line, user, password in rows
+            if ('username', user.username) not in taken and ('email', user.email) not in taken
+        ]
+        self.skipped = len(rows) - len(new_rows)
+
+        hashes = hash_passwords([password for _, _, password in new_rows], workers=self.workers)
+        for (_, user, _), password in zip(new_rows, hashes):
+            user.password = password
+
+        for start in range(0, len(new_rows), self.batch_size):
+            self.flush([(line, user) for line, user, _ in new_rows[start:start + self.batch_size]])
+        return self
+
+    def build_user(self, row):
+        def value(column):
+            return (row.get(column) or '').strip()
+
+        user = User(
+            username=User.normalize_username(value('username')),
+            email=User.objects.normalize_email(value('email')),
+        )
+        user.full_clean(exclude=['password'], validate_unique=False, validate_constraints=False)
+        password = row.get('password') or ''
+        if not password:
+            raise ValidationError("Не указан пароль")
+        validate_password(password, user)
+        return user, password
+
+    def flush(self, batch):
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([user for _, user in batch])
+        except DatabaseError as error:
+            self.errors.extend((line, f"Ошибка БД при сохранении пачки: {error}") for line, _ in batch)
+            return
+        self.created += len(users)
+
+
+def provision_users_csv(lines, batch_size=1000, workers=None):
+    """Регистрирует пользователей из CSV (см. UserCsvProvisioner), возвращает итоги"""
+    return UserCsvProvisioner(batch_size=batch_size, workers=workers).run(lines)
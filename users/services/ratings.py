@@ -0,0 +1,145 @@
+"""
+Рейтинги пользователей
+
+Строка Rating появляется только при первом участии в PvP: до этого
+get_rating отдаёт несохранённый рейтинг с начальным значением из PvpSettings,
+ничего не записывая. Создание и блокировка строк идут одним путём —
+ensure_ratings, который вставляет недостающие строки пачкой.
+
+Место в таблице лидеров считается по снимку всех рейтингов процесса,
+который планировщик пересобирает раз в RANK_SNAPSHOT_MAX_AGE секунд.
+"""
+import threading
+import time
+from bisect import bisect_right
+
+from ..models import Rating
+
+RANK_SNAPSHOT_MAX_AGE = 60
+
+
+def get_initial_rating():
+    """Начальный рейтинг из активных настроек PvP"""
+    from pvp.models import PvpSettings
+
+    return (PvpSettings.objects.filter(is_active=True).first() or PvpSettings()).initial_rating
+
+
+def get_rating(user, initial_rating=None):
+    """
+    Рейтинг пользователя без записи в БД
+
+    Если строки ещё нет, возвращает несохранённый Rating с начальным
+    рейтингом. Результат кешируется в user.rating, как после select_related.
+
+    Args:
+        initial_rating: Уже известный начальный рейтинг (иначе читается из PvpSettings)
+    """
+    try:
+        return user.rating
+    except Rating.DoesNotExist:
+        if initial_rating is None:
+            initial_rating = get_initial_rating()
+        rating = Rating(user=user, score=initial_rating)
+        type(user).rating.related.set_cached_value(user, rating)
+        return rating
+
+
+def ensure_ratings(user_ids, initial_rating=None, lock=False):
+    """
+    Рейтинги пользователей с созданием недостающих строк: {user_id: Rating}
+
+    Недостающие строки вставляются одним bulk_create(ignore_conflicts=True),
+    поэтому параллельные вызовы для тех же пользователей не падают на
+    уникальности. Если все строки уже есть — один запрос.
+
+    Args:
+        initial_rating: Рейтинг новых строк (иначе читается из PvpSettings)
+        lock: Заблокировать строки (select_for_update) до конца транзакции
+    """
+    user_ids = set(user_ids)
+    ratings = Rating.objects.filter(user_id__in=user_ids)
+    if lock:
+        ratings = ratings.select_for_update()
+    found = {rating.user_id: rating for rating in ratings}
+    missing = user_ids - found.keys()
+    if missing:
+        if initial_rating is None:
+            initial_rating = get_initial_rating()
+        Rating.objects.bulk_create(
+            [Rating(user_id=user_id, score=initial_rating) for user_id in missing], ignore_conflicts=True
+        )
+        found.update((rating.user_id, rating) for rating in ratings.filter(user_id__in=missing))
+    return found
+
+
+class RankSnapshot:
+    """Рейтинги всех игроков по возрастанию: место по рейтингу за O(log n)"""
+
+    def __init__(self, scores):
+        self.scores = sorted(scores)
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def rank(self, score):
+        """Место игрока с рейтингом score: 1 + число игроков с рейтингом выше"""
+        return len(self.scores) - bisect_right(self.scores, score) + 1
+
+
+class RankSnapshotCache:
+    """
+    Последний снимок рейтингов процесса
+
+    Снимок строит задача планировщика (refresh_rank_snapshot) раз в max_age
+    секунд. Запрос строит его сам, только если снимка ещё нет или планировщик
+    не обновлял его дольше двух интервалов.
+    """
+
+    def __init__(self, max_age=RANK_SNAPSHOT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.built_at < time.time() - 2 * self.max_age:
+            return self.refresh()
+        return snapshot
+
+    def refresh(self):
+        snapshot = RankSnapshot(Rating.objects.values_list('score', flat=True).iterator())
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+
+rank_snapshots = RankSnapshotCache()
+
+
+def get_rank_snapshot():
+    """Текущий снимок рейтингов процесса"""
+    return rank_snapshots.get()
+
+
+def refresh_rank_snapshot():
+    """Пересобирает снимок рейтингов; выполняется планировщиком"""
+    rank_snapshots.refresh()
+
+
+def get_rank(user, snapshot=None):
+    """
+    Место пользователя в таблице лидеров или None, если он ещё не играл
+
+    Args:
+        snapshot: Уже полученный get_rank_snapshot()
+    """
+    rating = get_rating(user)
+    if rating.pk is None:
+        return None
+    return (snapshot or get_rank_snapshot()).rank(rating.score)
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_users
+from .models import Rating, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает снимок пользователя: изменения (в том числе is_active) действуют со следующего запроса"""
+    invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_cached_rating(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
@@ -1,10 +1,43 @@
-from django.test import TestCase
-from django.contrib.auth import get_user_model, authenticate
-
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model, authenticate, user_login_failed
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from pentolymp.middlewares.jwt_auth_middleware import get_user
+from users.authentication import CachedJWTAuthentication, UserSnapshotCache, user_cache
+from users.models import Rating, Solve, SolveSource
+from users.services import (
+    PasswordPool, PasswordPoolBusy, ensure_ratings, get_rank, get_rank_snapshot, get_rating, hash_passwords,
+    provision_users_csv, refresh_rank_snapshot,
+)
+from users.services.ratings import RANK_SNAPSHOT_MAX_AGE, RankSnapshot, rank_snapshots
 from users.serializers import (
     UserSerializer, RegisterSerializer,
     LoginSerializer
 )
+from pvp.models import PvpSettings
+from tasks.models import Difficulty_Level, Subject, Task, Topic
+from tasks.services import record_solve
+from tasks.services.bitmaps import solved_bitmaps, subject_bitmaps
+from tasks.services.catalog import catalog_tree
 
 User = get_user_model()
 
@@ -34,6 +67,69 @@ class UserModelTest(TestCase):
             )
 
 
+class SolveModelTest(TestCase):
+    """Тесты для модели Solve (решённые задачи)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        topic = Topic.objects.create(name='Алгебра', subject=Subject.objects.create(name='Математика'))
+        self.task = Task.objects.create(
+            name='Задача', description='Описание', answer='1', topic=topic, difficulty_level=Difficulty_Level.EASY
+        )
+
+    def test_record_solve_stores_time_and_source(self):
+        """record_solve сохраняет время и источник решения"""
+        before = timezone.now()
+        self.assertTrue(record_solve(self.user, self.task.id, SolveSource.PVP))
+        self.assertFalse(record_solve(self.user, self.task.id))
+        solve = Solve.objects.get(user=self.user, task=self.task)
+        self.assertEqual(solve.source, SolveSource.PVP)
+        self.assertGreaterEqual(solve.solved_at, before)
+        self.assertTrue(self.task.is_solved(self.user))
+
+    def test_add_uses_defaults(self):
+        """solved_tasks.add() создаёт решение из тренировки с текущим временем"""
+        self.user.solved_tasks.add(self.task)
+        solve = Solve.objects.get(user=self.user, task=self.task)
+        self.assertEqual(solve.source, SolveSource.PRACTICE)
+        self.assertIsNotNone(solve.solved_at)
+        self.assertEqual(list(self.user.solved_tasks.all()), [self.task])
+
+    def test_solve_is_unique(self):
+        """Задачу нельзя решить дважды"""
+        Solve.objects.create(user=self.user, task=self.task)
+        with self.assertRaises(IntegrityError):
+            Solve.objects.create(user=self.user, task=self.task)
+
+    def test_solved_since(self):
+        """Решения пользователя выбираются по времени (индекс user, solved_at)"""
+        index_names = {index.name for index in Solve._meta.indexes}
+        self.assertIn('users_solve_user_solved_idx', index_names)
+        Solve.objects.create(user=self.user, task=self.task, solved_at=timezone.now() - timedelta(days=3))
+        since = timezone.now() - timedelta(days=1)
+        self.assertFalse(self.user.solves.filter(solved_at__gte=since).exists())
+
+    def test_admin_is_delete_only(self):
+        """В админке решения нельзя добавить или изменить, удаление снимает задачу из решённых"""
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.force_login(admin)
+        record_solve(self.user, self.task.id)
+        solve = Solve.objects.get(user=self.user, task=self.task)
+        self.assertEqual(self.client.get(reverse('admin:users_solve_add')).status_code, 403)
+
+        response = self.client.post(reverse('admin:users_solve_changelist'), {
+            'action': 'delete_selected', '_selected_action': [solve.pk], 'post': 'yes',
+        })
+        self.assertRedirects(response, reverse('admin:users_solve_changelist'))
+        user = User.objects.get(pk=self.user.pk)
+        self.assertIsNotNone(user.solved_tasks_removed_at)
+        self.assertFalse(self.task.is_solved(user))
+
+
 class RegistrationTest(TestCase):
     """Тесты для регистрации пользователя"""
 
@@ -321,3 +417,418 @@ class LoginSerializerTest(TestCase):
             'email': 'test3@example.com'
         })
         self.assertFalse(serializer.is_valid())
+
+
+class UserViewConditionalTest(TestCase):
+    """Тесты условных запросов профиля"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_profile_not_modified(self):
+        """Повторный запрос профиля с If-None-Match возвращает 304"""
+        etag = self.client.get(reverse('profile'))['ETag']
+        response = self.client.get(reverse('profile'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_etag_changes_after_rating_update(self):
+        """Изменение рейтинга меняет ETag профиля"""
+        etag = self.client.get(reverse('profile'))['ETag']
+        ensure_ratings([self.user.id])[self.user.id].update_rating(1000, 'win')
+        # force_authenticate отдаёт тот же экземпляр, в нём закеширован рейтинг по умолчанию
+        self.user.refresh_from_db()
+        response = self.client.get(reverse('profile'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rating']['matches_won'], 1)
+
+
+class CachedAuthenticationTest(TestCase):
+    """Тесты кеша аутентифицированных пользователей"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        Rating.objects.create(user=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+        self.auth = CachedJWTAuthentication()
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return self.auth.authenticate(request)[0]
+
+    def test_second_request_without_queries(self):
+        """Повторный запрос с тем же токеном не обращается к БД, рейтинг загружен"""
+        with self.assertNumQueries(1):
+            first = self.authenticate()
+            self.assertEqual(first.rating.score, 1000)
+        with self.assertNumQueries(0):
+            second = self.authenticate()
+            self.assertEqual(second.username, 'testuser')
+            self.assertEqual(second.rating.score, 1000)
+        self.assertIsNot(first, second)
+
+    def test_deactivation_takes_effect_immediately(self):
+        """Отключённый пользователь не проходит аутентификацию со следующего запроса"""
+        self.authenticate()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_invalidation_waits_for_commit(self):
+        """До фиксации транзакции снимок не сбрасывается: иначе другой воркер закеширует старую строку"""
+        self.authenticate()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            self.assertTrue(self.authenticate().is_active)
+        for callback in callbacks:
+            callback()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_rating_save_invalidates(self):
+        """Сохранение рейтинга обновляет снимок"""
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.rating.update_rating(1000, 'win')
+        self.assertEqual(self.authenticate().rating.matches_won, 1)
+
+    def test_solve_invalidates(self):
+        """Новое решение обновляет отметку решённых задач в снимке"""
+        self.authenticate()
+        subject = Subject.objects.create(name='Математика')
+        topic = Topic.objects.create(name='Алгебра', subject=subject)
+        task = Task.objects.create(
+            name='Задача', description='Условие', answer='1',
+            topic=topic, difficulty_level=Difficulty_Level.EASY
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            record_solve(self.user, task.id)
+        self.assertIsNotNone(self.authenticate().solved_tasks_updated_at)
+
+    def test_invalidation_reaches_other_caches(self):
+        """Сброс виден кешам других процессов через метку поколения"""
+        other = UserSnapshotCache()
+        jti = AccessToken(self.token)['jti']
+        other.load(self.user.id, jti)
+        self.assertIsNotNone(other.get(self.user.id, jti))
+        user_cache.invalidate([self.user.id])
+        self.assertIsNone(other.get(self.user.id, jti))
+
+    def test_size_and_ttl_bounds(self):
+        """Старые снимки вытесняются, просроченные не возвращаются"""
+        cache = UserSnapshotCache(maxsize=1)
+        cache.load(self.user.id, 'a')
+        cache.load(self.user.id, 'b')
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(self.user.id, 'a'))
+        cache = UserSnapshotCache(ttl=-1)
+        cache.load(self.user.id, 'a')
+        self.assertIsNone(cache.get(self.user.id, 'a'))
+
+    def test_websocket_middleware(self):
+        """JWTAuthMiddleware берёт пользователя из кеша и не пускает отключённых"""
+        # Промах кеша уходит в database_sync_to_async, который закрывает соединение теста
+        jti = AccessToken(self.token)['jti']
+        user_cache.load(self.user.id, jti)
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(get_user)(self.token), self.user)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        user_cache.load(self.user.id, jti)
+        self.assertIsInstance(async_to_sync(get_user)(self.token), AnonymousUser)
+        self.assertIsInstance(async_to_sync(get_user)('bad-token'), AnonymousUser)
+
+
+class ProvisionUsersTest(TestCase):
+    """Тесты массовой регистрации участников из CSV"""
+
+    HEADER = "username,email,password\n"
+
+    def setUp(self):
+        PvpSettings.objects.create(name='olymp', initial_rating=1200, is_active=True)
+        User.objects.create_user(username='taken', email='taken@example.com', password='testpass123')
+
+    def test_provision(self):
+        """Пользователи создаются пачками, занятые имена и email пропускаются"""
+        lines = StringIO(
+            self.HEADER
+            + "ivanov,ivanov@example.com,Olymp-2026-a7\n"
+            + "petrova,petrova@example.com,Olymp-2026-k3\n"
+            + "taken,other@example.com,Olymp-2026-x1\n"
+            + "other,taken@example.com,Olymp-2026-x2\n"
+        )
+        # Проверка занятых, точка сохранения и вставка пользователей
+        with self.assertNumQueries(4):
+            provisioner = provision_users_csv(lines)
+        self.assertEqual((provisioner.created, provisioner.skipped, provisioner.errors), (2, 2, []))
+        user = User.objects.get(username='petrova')
+        self.assertTrue(user.check_password('Olymp-2026-k3'))
+        self.assertFalse(Rating.objects.filter(user=user).exists())
+        self.assertFalse(User.objects.filter(username='other').exists())
+
+    def test_invalid_rows(self):
+        """Ошибочные строки и повторы в файле попадают в ошибки с номерами строк"""
+        provisioner = provision_users_csv(StringIO(
+            self.HEADER
+            + "ivanov,ivanov@example.com,Olymp-2026-a7\n"
+            + "ivanov,ivanov2@example.com,Olymp-2026-a8\n"
+            + "bad,not-an-email,Olymp-2026-a9\n"
+            + "short,short@example.com,123\n"
+        ))
+        self.assertEqual(provisioner.created, 1)
+        self.assertEqual([line for line, _ in provisioner.errors], [3, 4, 5])
+
+    def test_hash_passwords_in_pool(self):
+        """Пароли хешируются в пуле процессов в исходном порядке"""
+        passwords = [f'password-{i}' for i in range(8)]
+        hashes = hash_passwords(passwords, workers=2)
+        self.assertTrue(all(check_password(password, hashed) for password, hashed in zip(passwords, hashes)))
+
+    def test_command(self):
+        """Команда provision_users печатает итоги"""
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as csv_file:
+            csv_file.write((self.HEADER + "ivanov,ivanov@example.com,Olymp-2026-a7\n").encode())
+        self.addCleanup(Path(csv_file.name).unlink)
+
+        out = StringIO()
+        call_command("provision_users", csv_file.name, "--workers", "1", stdout=out)
+        self.assertIn("Создано пользователей: 1, уже существуют: 0, ошибок: 0", out.getvalue())
+
+    def test_admin_upload(self):
+        """Загрузка списка в админке создаёт пользователей"""
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile(
+            'roster.csv', (self.HEADER + "ivanov,ivanov@example.com,Olymp-2026-a7\n").encode()
+        )
+        response = self.client.post(reverse('admin:users_user_import_csv'), {'csv_file': upload})
+        self.assertRedirects(response, reverse('admin:users_user_changelist'))
+        self.assertTrue(User.objects.filter(username='ivanov').exists())
+
+
+class BlockedUserBackend(ModelBackend):
+    """Бэкенд, запрещающий вход пользователю blocked"""
+
+    def user_can_authenticate(self, user):
+        return user.username != 'blocked' and super().user_can_authenticate(user)
+
+
+class LoginPoolTest(TestCase):
+    """Тесты входа с проверкой пароля в пуле процессов"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def test_single_user_lookup(self):
+        """Вход находит пользователя одним запросом и проверяет пароль у него же"""
+        serializer = LoginSerializer(data={'email': 'test@example.com', 'password': 'testpass123'})
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['user'], self.user)
+
+    def test_wrong_password(self):
+        """Неверный пароль отклоняется"""
+        response = self.client.post(reverse('login'), {'email': 'test@example.com', 'password': 'wrong-pass'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_failed_signal(self):
+        """Неверный пароль и неизвестный email отправляют user_login_failed с запросом"""
+        received = []
+
+        def handler(sender, credentials, request, **kwargs):
+            received.append((credentials, request))
+
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+        self.client.post(reverse('login'), {'email': 'test@example.com', 'password': 'wrong-pass'})
+        self.client.post(reverse('login'), {'email': 'nobody@example.com', 'password': 'wrong-pass'})
+
+        self.assertEqual([credentials['username'] for credentials, _ in received], ['testuser', 'nobody@example.com'])
+        self.assertNotIn('wrong-pass', [credentials['password'] for credentials, _ in received])
+        self.assertIsNotNone(received[0][1])
+
+    @override_settings(AUTHENTICATION_BACKENDS=['users.tests.BlockedUserBackend'])
+    def test_backend_user_can_authenticate(self):
+        """Вход учитывает user_can_authenticate бэкенда и запоминает его путь"""
+        User.objects.create_user(username='blocked', email='blocked@example.com', password='testpass123')
+        serializer = LoginSerializer(data={'email': 'blocked@example.com', 'password': 'testpass123'})
+        self.assertFalse(serializer.is_valid())
+
+        serializer = LoginSerializer(data={'email': 'test@example.com', 'password': 'testpass123'})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['user'].backend, 'users.tests.BlockedUserBackend')
+
+    def test_overloaded_pool_returns_503(self):
+        """Перегруженный пул отвечает 503 с Retry-After"""
+        with mock.patch('users.services.hashing.check_user_password', side_effect=PasswordPoolBusy):
+            response = self.client.post(reverse('login'), {'email': 'test@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_pool_rejects_over_queue_limit(self):
+        """Проверка сверх max_pending сразу получает PasswordPoolBusy"""
+        pool = PasswordPool(workers=1, max_pending=1)
+        self.addCleanup(pool.reset)
+        busy = pool.submit(time.sleep, 1)
+        with self.assertRaises(PasswordPoolBusy):
+            pool.verify('testpass123', self.user.password)
+        busy.result()
+        self.assertEqual(pool.verify('testpass123', self.user.password), (True, False))
+
+    def test_pool_restarts_after_timeout(self):
+        """Проверка, не уложившаяся в срок, перезапускает пул: зависший процесс не занимает место навсегда"""
+        pool = PasswordPool(workers=1, max_pending=2, timeout=5)
+        self.addCleanup(pool.reset, terminate=True)
+        hung = pool.submit(time.sleep, 60)
+        with self.assertRaises(PasswordPoolBusy):
+            pool.verify('testpass123', self.user.password)
+        self.assertEqual(pool.verify('testpass123', self.user.password), (True, False))
+        self.assertTrue(hung.done())
+
+
+class LazyRatingTest(TestCase):
+    """Тесты ленивого создания рейтингов"""
+
+    def setUp(self):
+        PvpSettings.objects.create(name='olymp', initial_rating=1200, is_active=True)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def test_new_user_has_no_rating_row(self):
+        """Регистрация не создаёт рейтинг, профиль показывает начальный из настроек PvP"""
+        self.assertFalse(Rating.objects.filter(user=self.user).exists())
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse('profile'))
+        self.assertEqual(response.data['rating']['score'], 1200)
+        self.assertFalse(Rating.objects.filter(user=self.user).exists())
+
+    def test_get_rating_is_cached(self):
+        """get_rating читает настройки один раз и ничего не записывает"""
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(2):
+            self.assertEqual(get_rating(user).score, 1200)
+            self.assertIs(get_rating(user), get_rating(user))
+        self.assertIsNone(get_rating(user).pk)
+
+    def test_ensure_ratings_bulk(self):
+        """ensure_ratings создаёт недостающие строки пачкой и не трогает существующие"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        Rating.objects.create(user=other, score=1500)
+        ratings = ensure_ratings([self.user.id, other.id])
+        self.assertEqual({user_id: rating.score for user_id, rating in ratings.items()}, {self.user.id: 1200, other.id: 1500})
+        self.assertTrue(all(rating.pk for rating in ratings.values()))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(ensure_ratings([self.user.id, other.id])), 2)
+
+
+class ProfileExpandTest(TestCase):
+    """Тесты профиля с expand=stats,rank"""
+
+    def setUp(self):
+        for cache in (rank_snapshots, catalog_tree, subject_bitmaps, solved_bitmaps):
+            cache.clear()
+        subject = Subject.objects.create(name='Математика')
+        topic = Topic.objects.create(name='Алгебра', subject=subject)
+        self.tasks = [
+            Task.objects.create(name=f'Задача {i}', topic=topic, answer='1', difficulty_level=Difficulty_Level.EASY)
+            for i in range(4)
+        ]
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        for score in (1500, 1100, 1300):
+            other = User.objects.create_user(username=f'user{score}', email=f'user{score}@example.com', password='x')
+            Rating.objects.create(user=other, score=score)
+        Rating.objects.create(user=self.user, score=1300)
+        record_solve(self.user, self.tasks[0].id)
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.select_related('rating').get(pk=self.user.pk))
+
+    def test_expand(self):
+        """expand добавляет статистику по предметам и место в таблице лидеров"""
+        response = self.client.get(reverse('profile'), {'expand': 'stats,rank'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'testuser')
+        self.assertEqual(response.data['stats'], [
+            {'name': 'Математика', 'tasks_solved': 1, 'tasks_total': 4, 'percentage': 25.0}
+        ])
+        # Выше только 1500; с равным рейтингом 1300 делим второе место
+        self.assertEqual(response.data['rank'], 2)
+
+    def test_no_expand(self):
+        """Без expand ответ прежний"""
+        response = self.client.get(reverse('profile'))
+        self.assertNotIn('stats', response.data)
+        self.assertNotIn('rank', response.data)
+
+    def test_rank_without_rating(self):
+        """Пользователь без сыгранных матчей не имеет места"""
+        newcomer = User.objects.create_user(username='newcomer', email='newcomer@example.com', password='x')
+        self.assertIsNone(get_rank(newcomer))
+
+    def test_rank_snapshot(self):
+        """Место — 1 + число игроков с рейтингом выше"""
+        snapshot = RankSnapshot([1200, 1000, 1200, 1400])
+        self.assertEqual([snapshot.rank(score) for score in (1500, 1400, 1200, 1000, 900)], [1, 1, 2, 4, 5])
+
+    def test_expand_queries(self):
+        """Тёплый профиль со всеми разделами стоит одной проверки версии каталога"""
+        url = reverse('profile')
+        self.client.get(url, {'expand': 'stats,rank'})
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'expand': 'stats,rank'})
+        self.assertEqual(response.data['rank'], 2)
+
+    def test_rank_snapshot_is_refreshed_by_scheduler(self):
+        """Запросы читают готовый снимок, новые рейтинги видны после refresh_rank_snapshot"""
+        self.assertEqual(get_rank(self.user), 2)
+        other = User.objects.create_user(username='user1400', email='user1400@example.com', password='x')
+        Rating.objects.create(user=other, score=1400)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_rank(self.user), 2)
+        refresh_rank_snapshot()
+        self.assertEqual(get_rank(self.user), 3)
+
+    def test_stale_rank_snapshot_is_rebuilt(self):
+        """Если планировщик не обновлял снимок, запрос пересобирает его сам"""
+        snapshot = get_rank_snapshot()
+        snapshot.built_at -= 3 * RANK_SNAPSHOT_MAX_AGE
+        self.assertIsNot(get_rank_snapshot(), snapshot)
+
+    def test_expand_etag(self):
+        """Новое решение меняет ETag профиля со статистикой"""
+        url = reverse('profile')
+        etag = self.client.get(url, {'expand': 'stats'})['ETag']
+        self.assertNotEqual(etag, self.client.get(url)['ETag'])
+        record_solve(self.user, self.tasks[1].id)
+        self.client.force_authenticate(user=User.objects.select_related('rating').get(pk=self.user.pk))
+        response = self.client.get(url, {'expand': 'stats'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats'][0]['tasks_solved'], 2)
+
+    def test_invalid_expand(self):
+        """Неизвестный раздел — ошибка валидации"""
+        response = self.client.get(reverse('profile'), {'expand': 'stats,friends'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
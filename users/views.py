@@ -1,13 +1,20 @@
-from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, extend_schema_view
+from drf_spectacular.utils import (
+    extend_schema, OpenApiResponse, OpenApiExample, extend_schema_view, OpenApiParameter, OpenApiTypes
+)
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from pentolymp.conditional import ConditionalGetMixin, make_etag
+from tasks.serializers import SubjectStatisticSerializer
+from tasks.services import get_catalog_stamp, get_subject_statistics
 from .models import User
 from .serializers import (
-    UserSerializer, RegisterSerializer, LoginSerializer, RefreshSerializer
+    UserSerializer, ProfileSerializer, RegisterSerializer, LoginSerializer, RefreshSerializer
 )
+from .services import get_rank, get_rank_snapshot, get_rating
 
 
 class RegisterView(generics.CreateAPIView):
@@ -50,13 +57,14 @@ class LoginView(APIView):
                     })
                 ]
             ),
-            400: OpenApiResponse(description="Validation error")
+            400: OpenApiResponse(description="Validation error"),
+            503: OpenApiResponse(description="Too many concurrent logins, retry after Retry-After seconds")
         },
         tags=["Auth"],
         auth=[]
     )
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
             refresh = RefreshToken.for_user(user)
@@ -99,9 +107,22 @@ class RefreshTokenView(APIView):
 @extend_schema_view(
     get=extend_schema(
         summary="Получение информации о пользователе",
-        description="Получение информации о пользователе",
+        description=(
+            "Получение информации о пользователе. С expand=stats добавляется статистика решённых задач "
+            "по предметам (как в statistic-subject/), с expand=rank — место в таблице лидеров "
+            "(null, если пользователь ещё не играл; обновляется раз в минуту)"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='expand',
+                location=OpenApiParameter.QUERY,
+                description='дополнительные разделы через запятую: stats, rank',
+                required=False,
+                type=OpenApiTypes.STR
+            ),
+        ],
         responses={
-            200: UserSerializer(),
+            200: ProfileSerializer(),
             400: OpenApiResponse(description="Validation error")
         },
         tags=["Auth"],
@@ -125,10 +146,46 @@ class RefreshTokenView(APIView):
         tags=["Auth"],
     )
 )
-class UserView(generics.RetrieveUpdateAPIView):
+class UserView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
 
+    expand_choices = ('stats', 'rank')
+    catalog_stamp = None
+    rank_snapshot = None
+
+    def get_expand(self):
+        expand = {value.strip() for value in self.request.query_params.get('expand', '').split(',') if value.strip()}
+        unknown = expand - set(self.expand_choices)
+        if unknown:
+            raise ValidationError({'expand': f"Неизвестные разделы: {', '.join(sorted(unknown))}"})
+        return expand
+
+    def get_validators(self, request):
+        user = request.user
+        # Рейтинг уже загружен вместе с пользователем при аутентификации
+        rating = get_rating(user)
+        parts = ['user', user.pk, user.email, user.username, rating.score, rating.updated_at]
+        expand = self.get_expand()
+        if 'stats' in expand:
+            self.catalog_stamp = get_catalog_stamp()
+            parts += ['stats', *self.catalog_stamp, user.solved_tasks_updated_at]
+        if 'rank' in expand:
+            self.rank_snapshot = get_rank_snapshot()
+            parts += ['rank', self.rank_snapshot.built_at]
+        return make_etag(*parts), None
+
     def get_object(self):
         return self.request.user
+
+    def retrieve(self, request, *args, **kwargs):
+        data = self.get_serializer(self.get_object()).data
+        expand = self.get_expand()
+        if 'stats' in expand:
+            data['stats'] = SubjectStatisticSerializer(
+                get_subject_statistics(request.user, self.catalog_stamp), many=True
+            ).data
+        if 'rank' in expand:
+            data['rank'] = get_rank(request.user, self.rank_snapshot)
+        return Response(data)